@@ -0,0 +1,348 @@
+# SQLite store of every launch dataset, normalized and indexed.
+#
+# Loads the SQL dataset (Spacex.csv), the API launches (dataset_part_2), the
+# geocoded launches (spacex_launch_geo) and the Wikipedia table
+# (spacex_web_scraped, as normalized by datacollection_part2.py; a raw scrape is
+# normalized on load) into one database:
+#
+#   sites      one row per launch pad (names from all sources normalized to one
+#              key, so "CCSFS SLC 40" and "CCAFS SLC-40" are the same pad) with
+#              its coordinates
+#   boosters   one row per core serial (B1049), with its version category and block
+#   launches   one row per launch of a source: date, site, booster, orbit and
+#              mission and landing outcomes, plus the landing class where known
+#   payloads   the payload of each launch: name, mass and customer
+#
+# launch_details is a view joining them with the column names of Spacex.csv
+# (Launch_Site, PAYLOAD_MASS__KG_, Landing_Outcome, ...), so the queries of
+# eda_sql.ipynb run unchanged against it. launches is indexed on site, date,
+# orbit and landing outcome.
+#
+# A source is loaded in one transaction with executemany bulk inserts and
+# replaces the previous load of the same source. The database runs in WAL mode,
+# so the dashboard and the EDA scripts can read while it is being refreshed.
+# AnalyticsStore.query() and the helpers below return DataFrames, so filtering
+# and aggregation happen in SQL instead of on whole CSV files.
+#
+# Usage:
+#   python analytics_store.py --load                      # all sources into my_data1.db
+#   python analytics_store.py --load api geo --db launches.db
+#   python analytics_store.py --sql "SELECT Launch_Site, COUNT(*) FROM launch_details GROUP BY Launch_Site"
+
+import re
+import sys
+import sqlite3
+import argparse
+import numpy as np
+import pandas as pd
+from artifacts import read_artifact
+from wiki_scrape import normalize_launch_frame
+
+DEFAULT_DB = 'my_data1.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sites (
+    site_id INTEGER PRIMARY KEY,
+    site_key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    area TEXT,
+    lat REAL,
+    lon REAL
+);
+CREATE TABLE IF NOT EXISTS boosters (
+    booster_id INTEGER PRIMARY KEY,
+    serial TEXT NOT NULL UNIQUE,
+    version TEXT,
+    block REAL
+);
+CREATE TABLE IF NOT EXISTS launches (
+    launch_id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    flight_number INTEGER,
+    date TEXT,
+    time TEXT,
+    site_id INTEGER REFERENCES sites (site_id),
+    booster_id INTEGER REFERENCES boosters (booster_id),
+    booster_version TEXT,
+    orbit TEXT,
+    mission_outcome TEXT,
+    landing_outcome TEXT,
+    landing_pad TEXT,
+    flights INTEGER,
+    reused INTEGER,
+    grid_fins INTEGER,
+    legs INTEGER,
+    class INTEGER
+);
+CREATE TABLE IF NOT EXISTS payloads (
+    payload_id INTEGER PRIMARY KEY,
+    launch_id INTEGER NOT NULL REFERENCES launches (launch_id) ON DELETE CASCADE,
+    name TEXT,
+    mass_kg REAL,
+    customer TEXT
+);
+CREATE INDEX IF NOT EXISTS launches_site ON launches (site_id);
+CREATE INDEX IF NOT EXISTS launches_date ON launches (date);
+CREATE INDEX IF NOT EXISTS launches_orbit ON launches (orbit);
+CREATE INDEX IF NOT EXISTS launches_landing_outcome ON launches (landing_outcome);
+CREATE INDEX IF NOT EXISTS launches_source ON launches (source);
+CREATE INDEX IF NOT EXISTS launches_booster ON launches (booster_id);
+CREATE INDEX IF NOT EXISTS payloads_launch ON payloads (launch_id);
+CREATE VIEW IF NOT EXISTS launch_details AS
+SELECT l.launch_id, l.source, l.flight_number AS Flight_Number, l.date AS Date, l.time AS "Time (UTC)",
+       l.booster_version AS Booster_Version, b.serial AS Serial, b.version AS Booster_Version_Category,
+       b.block AS Block, s.name AS Launch_Site, s.area AS Launch_Area, s.lat AS Lat, s.lon AS Long,
+       p.name AS Payload, p.mass_kg AS PAYLOAD_MASS__KG_, l.orbit AS Orbit, p.customer AS Customer,
+       l.mission_outcome AS Mission_Outcome, l.landing_outcome AS Landing_Outcome,
+       l.landing_pad AS Landing_Pad, l.class AS Class
+FROM launches l
+LEFT JOIN sites s ON s.site_id = l.site_id
+LEFT JOIN boosters b ON b.booster_id = l.booster_id
+LEFT JOIN payloads p ON p.launch_id = l.launch_id;
+"""
+
+LAUNCH_COLUMNS = ['flight_number', 'date', 'time', 'site', 'lat', 'lon', 'serial', 'version', 'block',
+                  'booster_version', 'orbit', 'mission_outcome', 'landing_outcome', 'landing_pad', 'flights',
+                  'reused', 'grid_fins', 'legs', 'class', 'payload', 'mass_kg', 'customer']
+
+
+# Key normalization, shared with reconcile.py
+
+# Launch areas: the Cape Canaveral pads were renamed from CCAFS to CCSFS in 2020
+AREA_ALIASES = {'CCSFS': 'CCAFS', 'CAPECANAVERAL': 'CCAFS', 'CAPE': 'CCAFS'}
+VERSION_PATTERN = re.compile(r'(v1\.[01]|FT|B[45])')
+SERIAL_PATTERN = re.compile(r'B(\d{4})')
+
+
+# Scraped cells carry footnote newlines and non-breaking spaces
+def clean_text(values):
+    return values.str.replace('\xa0', ' ', regex=False).str.strip()
+
+
+# Pad key: "CCSFS SLC 40", "CCAFS SLC-40" -> "CCAFSSLC40"
+def normalize_site(values):
+    keys = values.str.upper().str.replace(r'[^A-Z0-9]', '', regex=True)
+    for alias, area in AREA_ALIASES.items():
+        keys = keys.str.replace(f'^{alias}', area, regex=True)
+    return keys
+
+
+# Launch area (CCAFS, KSC, VAFB) of pad names and of the area-only names of the wiki table
+def site_area(values):
+    first = values.str.upper().str.replace(r'[^A-Z ]', ' ', regex=True).str.split().str[0].fillna('')
+    spaced = values.str.upper().str.replace(r'[^A-Z]', '', regex=True)
+    return first.where(~spaced.str.startswith('CAPECANAVERAL'), 'CAPECANAVERAL').replace(AREA_ALIASES)
+
+
+# Core serial "B1049" from serial columns and booster version strings ("F9 B5 B1049.4")
+def normalize_serial(values):
+    return ('B' + values.str.extract(SERIAL_PATTERN, expand=False)).astype(object).where(lambda s: s.notna(), None)
+
+
+# Booster version category (v1.0, v1.1, FT, B4, B5) of booster version strings
+def booster_category(values):
+    return values.str.replace(r'^F9\s*', '', regex=True).str.extract(VERSION_PATTERN, expand=False)
+
+
+# ISO dates (YYYY-MM-DD) from any of the date formats of the sources
+def normalize_date(values):
+    return pd.to_datetime(clean_text(values.astype(str)), format='mixed', errors='coerce').dt.strftime('%Y-%m-%d')
+
+
+# The scraped launch table with the columns of wiki_scrape.normalize_launch_frame(), as
+# datacollection_part2.py writes it; a raw scrape (spacex_web_scraped.csv) is normalized first
+def wiki_frame(df):
+    if 'Launch datetime' not in df.columns:
+        df = normalize_launch_frame(df)
+    return df.assign(**{'Launch datetime': pd.to_datetime(df['Launch datetime'], errors='coerce')})
+
+
+# Sources: each returns a frame with LAUNCH_COLUMNS
+
+def _sql_launches(directory):
+    df = read_artifact('Spacex', directory=directory)
+    return pd.DataFrame({'date': normalize_date(df['Date']), 'time': df['Time (UTC)'],
+                         'site': df['Launch_Site'], 'serial': normalize_serial(df['Booster_Version']),
+                         'version': booster_category(df['Booster_Version']),
+                         'booster_version': df['Booster_Version'], 'orbit': df['Orbit'],
+                         'mission_outcome': clean_text(df['Mission_Outcome']),
+                         'landing_outcome': clean_text(df['Landing_Outcome']), 'payload': df['Payload'],
+                         'mass_kg': df['PAYLOAD_MASS__KG_'], 'customer': df['Customer']})
+
+
+# Launches of a dataset_part_2 frame
+def api_launches(df):
+    block = df['Block']
+    return pd.DataFrame({'flight_number': df['FlightNumber'], 'date': normalize_date(df['Date']),
+                         'site': df['LaunchSite'], 'lat': df['Latitude'], 'lon': df['Longitude'],
+                         'serial': normalize_serial(df['Serial']),
+                         'version': np.where(block >= 4, 'B' + block.fillna(0).astype(int).astype(str), None),
+                         'block': block, 'booster_version': df['BoosterVersion'], 'orbit': df['Orbit'],
+                         'landing_outcome': df['Outcome'], 'landing_pad': df['LandingPad'],
+                         'flights': df['Flights'], 'reused': df['Reused'], 'grid_fins': df['GridFins'],
+                         'legs': df['Legs'], 'class': df['Class'], 'mass_kg': df['PayloadMass']})
+
+
+def _api_launches(directory):
+    return api_launches(read_artifact('dataset_part_2', directory=directory))
+
+
+def _geo_launches(directory):
+    df = read_artifact('spacex_launch_geo', directory=directory)
+    return pd.DataFrame({'flight_number': df['Flight Number'], 'date': normalize_date(df['Date']),
+                         'time': df['Time (UTC)'], 'site': df['Launch Site'], 'lat': df['Lat'], 'lon': df['Long'],
+                         'serial': normalize_serial(df['Booster Version']),
+                         'version': booster_category(df['Booster Version']),
+                         'booster_version': df['Booster Version'], 'orbit': df['Orbit'],
+                         'landing_outcome': clean_text(df['Landing Outcome']), 'class': df['class'],
+                         'payload': df['Payload'], 'mass_kg': df['Payload Mass (kg)'], 'customer': df['Customer']})
+
+
+def _wiki_launches(directory):
+    df = wiki_frame(read_artifact('spacex_web_scraped', directory=directory))
+    launched = df['Launch datetime']
+    return pd.DataFrame({'flight_number': df['Flight No.'], 'date': launched.dt.strftime('%Y-%m-%d'),
+                         'time': launched.dt.strftime('%H:%M:%S'), 'site': df['Launch site'].astype(object),
+                         'serial': df['Booster serial'].astype(object),
+                         'version': booster_category(df['Version Booster'].astype(object)),
+                         'booster_version': df['Version Booster'].astype(object),
+                         'orbit': df['Orbit'].astype(object), 'mission_outcome': df['Launch outcome'].astype(object),
+                         'landing_outcome': df['Booster landing'].astype(object),
+                         'payload': clean_text(df['Payload'].astype(object)), 'mass_kg': df['Payload mass (kg)'],
+                         'customer': clean_text(df['Customer'].astype(object))})
+
+
+# Loaded in this order: the first name a pad is seen under becomes its display name
+SOURCES = {'sql': _sql_launches, 'geo': _geo_launches, 'api': _api_launches, 'wiki': _wiki_launches}
+
+
+# Plain Python values for sqlite3: NaN -> None, numpy scalars -> int / float
+def _records(df):
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+class AnalyticsStore:
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Load (or reload) sources from the datasets in `directory`; returns the launches loaded per source
+    def load(self, sources=tuple(SOURCES), directory=None):
+        loaded = {}
+        for source in sources:
+            loaded[source] = self.load_frame(source, SOURCES[source](directory))
+        return loaded
+
+    # Replace the launches of a source with the rows of `df` (LAUNCH_COLUMNS; missing ones are NULL)
+    def load_frame(self, source, df):
+        df = df.reindex(columns=LAUNCH_COLUMNS).reset_index(drop=True)
+        with self.connection as connection:
+            connection.execute("DELETE FROM payloads WHERE launch_id IN "
+                               "(SELECT launch_id FROM launches WHERE source = ?)", (source,))
+            connection.execute("DELETE FROM launches WHERE source = ?", (source,))
+            site_ids = self._upsert_sites(connection, df)
+            booster_ids = self._upsert_boosters(connection, df)
+
+            first_id = connection.execute("SELECT COALESCE(MAX(launch_id), 0) + 1 FROM launches").fetchone()[0]
+            launch_ids = np.arange(first_id, first_id + len(df))
+            launches = pd.DataFrame({'launch_id': launch_ids, 'source': source,
+                                     'flight_number': df['flight_number'], 'date': df['date'], 'time': df['time'],
+                                     'site_id': normalize_site(df['site'].astype(str)).map(site_ids)
+                                     .where(df['site'].notna()),
+                                     'booster_id': df['serial'].map(booster_ids),
+                                     'booster_version': df['booster_version'], 'orbit': df['orbit'],
+                                     'mission_outcome': df['mission_outcome'],
+                                     'landing_outcome': df['landing_outcome'], 'landing_pad': df['landing_pad'],
+                                     'flights': df['flights'], 'reused': df['reused'],
+                                     'grid_fins': df['grid_fins'], 'legs': df['legs'], 'class': df['class']})
+            connection.executemany(f"INSERT INTO launches ({', '.join(launches.columns)}) "
+                                   f"VALUES ({', '.join('?' * len(launches.columns))})", _records(launches))
+            payloads = pd.DataFrame({'launch_id': launch_ids, 'name': df['payload'], 'mass_kg': df['mass_kg'],
+                                     'customer': df['customer']})
+            connection.executemany("INSERT INTO payloads (launch_id, name, mass_kg, customer) VALUES (?, ?, ?, ?)",
+                                   _records(payloads))
+        return len(df)
+
+    # Insert new pads, fill in missing coordinates; returns {site_key: site_id}
+    def _upsert_sites(self, connection, df):
+        sites = df[df['site'].notna()].assign(site_key=lambda d: normalize_site(d['site'].astype(str)),
+                                              area=lambda d: site_area(d['site'].astype(str)))
+        sites = sites.groupby('site_key', as_index=False, sort=False).agg(
+            name=('site', 'first'), area=('area', 'first'), lat=('lat', 'first'), lon=('lon', 'first'))
+        connection.executemany("INSERT INTO sites (site_key, name, area, lat, lon) VALUES (?, ?, ?, ?, ?) "
+                               "ON CONFLICT (site_key) DO UPDATE SET lat = COALESCE(sites.lat, excluded.lat), "
+                               "lon = COALESCE(sites.lon, excluded.lon)",
+                               _records(sites[['site_key', 'name', 'area', 'lat', 'lon']]))
+        return dict(connection.execute("SELECT site_key, site_id FROM sites").fetchall())
+
+    # Insert new cores, fill in missing versions and blocks; returns {serial: booster_id}
+    def _upsert_boosters(self, connection, df):
+        boosters = df[df['serial'].notna()].groupby('serial', as_index=False, sort=False).agg(
+            version=('version', 'first'), block=('block', 'first'))
+        connection.executemany("INSERT INTO boosters (serial, version, block) VALUES (?, ?, ?) "
+                               "ON CONFLICT (serial) DO UPDATE SET "
+                               "version = COALESCE(boosters.version, excluded.version), "
+                               "block = COALESCE(boosters.block, excluded.block)",
+                               _records(boosters[['serial', 'version', 'block']]))
+        return dict(connection.execute("SELECT serial, booster_id FROM boosters").fetchall())
+
+    def query(self, sql, params=()):
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    # Launches from launch_details, filtered in SQL; None means no filter
+    # `start` and `end` are inclusive ISO dates
+    def launches(self, site=None, orbit=None, landing_outcome=None, start=None, end=None, source=None,
+                 columns='*'):
+        filters = {'Launch_Site = ?': site, 'Orbit = ?': orbit, 'Landing_Outcome = ?': landing_outcome,
+                   'Date >= ?': start, 'Date <= ?': end, 'source = ?': source}
+        filters = {condition: value for condition, value in filters.items() if value is not None}
+        where = f" WHERE {' AND '.join(filters)}" if filters else ''
+        columns = columns if isinstance(columns, str) else ', '.join(f'"{column}"' for column in columns)
+        return self.query(f"SELECT {columns} FROM launch_details{where} ORDER BY Date", list(filters.values()))
+
+    # Launches, landing successes and success rate per value of `by`, for the launches of `source`
+    def success_rates(self, by='Launch_Site', source='api'):
+        return self.query(f'SELECT "{by}", COUNT(*) AS launches, SUM(Class) AS successes, AVG(Class) AS success_rate '
+                          f'FROM launch_details WHERE source = ? AND Class IS NOT NULL GROUP BY "{by}" '
+                          f'ORDER BY "{by}"', [source])
+
+    # Launches, landing successes and success rate per launch year, for the launches of `source`
+    def yearly_success_rates(self, source='api'):
+        return self.query("SELECT CAST(substr(Date, 1, 4) AS INTEGER) AS Year, COUNT(*) AS launches, "
+                          "SUM(Class) AS successes, AVG(Class) AS success_rate FROM launch_details "
+                          "WHERE source = ? AND Class IS NOT NULL AND Date IS NOT NULL GROUP BY Year ORDER BY Year",
+                          [source])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load the launch datasets into SQLite and query them")
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--load', nargs='*', choices=list(SOURCES), help="sources to (re)load (default: all)")
+    parser.add_argument('--datasets', default=None, help="directory of the datasets (default: artifact directory)")
+    parser.add_argument('--sql', help="query to run; the result is printed as CSV")
+    args = parser.parse_args(argv)
+
+    with AnalyticsStore(args.db) as store:
+        if args.load is not None:
+            for source, count in store.load(args.load or list(SOURCES), args.datasets).items():
+                print(f"{source}: {count} launches")
+        if args.sql:
+            store.query(args.sql).to_csv(sys.stdout, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# Typed storage for the datasets passed between the pipeline stages.
+#
+# Stages write their output with write_artifact() and read their input with
+# read_artifact() instead of going through CSV. Artifacts are stored as
+# compressed Parquet (or Arrow IPC / Feather v2) so dtypes - dates, booleans,
+# categoricals - survive the hop, and readers memory-map the file and load only
+# the columns they ask for. CSV stays available as an optional export and as a
+# fallback for reading the CSV datasets shipped in datasets/.
+#
+# Configuration (environment):
+#   SPACEX_ARTIFACT_FORMAT  parquet (default), arrow or csv
+#   SPACEX_ARTIFACT_DIR     directory holding the artifacts (default: current directory)
+#   SPACEX_EXPORT_CSV       set to 1 to also write <name>.csv next to every artifact
+
+import os
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow', 'csv': '.csv'}
+
+DEFAULT_FORMAT = os.environ.get('SPACEX_ARTIFACT_FORMAT', 'parquet' if pa is not None else 'csv')
+EXPORT_CSV = os.environ.get('SPACEX_EXPORT_CSV', '') not in ('', '0')
+
+
+def artifact_dir():
+    return os.environ.get('SPACEX_ARTIFACT_DIR', '.')
+
+
+def artifact_path(name, fmt=DEFAULT_FORMAT, directory=None):
+    return os.path.join(directory or artifact_dir(), name + EXTENSIONS[fmt])
+
+
+# All stored copies of an artifact: the configured format first, then the
+# other typed formats, CSV last
+def artifact_paths(name, directory=None):
+    formats = sorted(EXTENSIONS, key=lambda fmt: (fmt != DEFAULT_FORMAT, fmt == 'csv'))
+    paths = [(fmt, artifact_path(name, fmt, directory)) for fmt in formats]
+    return [(fmt, path) for fmt, path in paths if os.path.exists(path)]
+
+
+def artifact_exists(name, directory=None):
+    return bool(artifact_paths(name, directory))
+
+
+# Write a stage output; returns the path of the artifact
+def write_artifact(df, name, fmt=None, export_csv=None, directory=None):
+    fmt = fmt or DEFAULT_FORMAT
+    if fmt != 'csv' and pa is None:
+        raise ImportError(f"pyarrow is required to write {fmt} artifacts")
+    export_csv = EXPORT_CSV if export_csv is None else export_csv
+    path = artifact_path(name, fmt, directory)
+
+    if fmt == 'parquet':
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, compression='zstd')
+    elif fmt == 'arrow':
+        feather.write_feather(df.reset_index(drop=True), path, compression='zstd')
+    else:
+        df.to_csv(path, index=False)
+
+    if export_csv and fmt != 'csv':
+        df.to_csv(artifact_path(name, 'csv', directory), index=False)
+    return path
+
+
+# Read a stage input, optionally only some of its columns
+# The copy in the configured format is preferred; otherwise Parquet and Arrow
+# copies come before the CSV
+def read_artifact(name, columns=None, directory=None):
+    paths = artifact_paths(name, directory)
+    if not paths:
+        raise FileNotFoundError(f"No artifact named {name!r} in {directory or artifact_dir()}")
+    fmt, path = paths[0]
+
+    if fmt == 'parquet':
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    elif fmt == 'arrow':
+        table = feather.read_table(path, columns=columns, memory_map=True)
+    else:
+        return pd.read_csv(path, usecols=columns)
+    return table.to_pandas(date_as_object=False)
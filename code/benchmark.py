@@ -0,0 +1,399 @@
+# Time and memory benchmarks of every pipeline stage at growing data sizes.
+#
+# Stages:
+#   api_enrichment   enrich_launches() of datacollection_part1.py against a local stub API
+#   wiki_parse       launch table parse + normalization of datacollection_part2.py on the saved
+#                    fixture page, its launch rows repeated to the scaled size
+#   wrangling        eda_datawrangling.py (Class labeling)
+#   features         eda_visualization.py (plots and feature engineering)
+#   training         predictive_analytics.py (model searches, fold cache disabled)
+#   dash_callbacks   the pie and scatter callbacks of spacex-dash-app.py, figure JSON included
+#
+# Every stage runs on datasets scaled up from the ones in datasets/ (90 launches,
+# so --scales 10 100 means 900 and 9000 launches) - synthetic launches from
+# synthetic_data.py by default, or the shipped rows repeated with --data
+# replicate - in a separate process: the
+# reported time covers only the stage itself (imports and data preparation are
+# done before the clock starts). The peak RSS is that of the whole process; the
+# RSS reached by the setup is reported next to it.
+# Results are written to .benchmarks/<timestamp>.json and compared with a saved
+# baseline; a stage whose time or peak memory grew by more than the threshold is
+# reported as a regression and the run exits with status 1.
+#
+# Usage:
+#   python benchmark.py                                  # every stage at 10x and 100x
+#   python benchmark.py --stages wiki_parse dash_callbacks --scales 1 10
+#   python benchmark.py --save-baseline                  # record this run as the baseline
+#   python benchmark.py --threshold 1.5 --repeat 3
+
+import os
+import sys
+import ast
+import json
+import time
+import runpy
+import resource
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import importlib
+import importlib.util
+import subprocess
+import threading
+import numpy as np
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from artifacts import read_artifact, write_artifact
+import synthetic_data
+
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASETS_DIR = os.path.join(os.path.dirname(CODE_DIR), 'datasets')
+RESULTS_DIR = '.benchmarks'
+BASELINE_FILE = 'baseline.json'
+# The saved page the wiki_parse stage is grown from
+WIKI_FIXTURE = os.path.join(CODE_DIR, 'fixtures', 'wiki', '1002.html')
+LAUNCH_TABLES_MARK = 'LAUNCH-TABLES'
+
+DEFAULT_SCALES = [10, 100]
+DEFAULT_THRESHOLD = 1.25
+
+# Number of launches of the datasets the scales multiply
+BASE_ROWS = 90
+
+
+# Scaled datasets
+#
+# The stage inputs are BASE_ROWS * scale launches, either generated by
+# synthetic_data.py or the shipped datasets repeated `scale` times, with the
+# flight numbers renumbered so they stay unique.
+
+def replicate(df, scale, number_column):
+    scaled = pd.concat([df] * scale, ignore_index=True)
+    scaled[number_column] = np.arange(1, len(scaled) + 1)
+    return scaled
+
+
+def replicate_datasets(workdir, scale, seed=0):
+    for name in ('dataset_part_1', 'dataset_part_2'):
+        df = read_artifact(name, directory=DATASETS_DIR)
+        write_artifact(replicate(df, scale, 'FlightNumber'), name, directory=workdir)
+    dash = pd.read_csv(os.path.join(DATASETS_DIR, 'spacex_launch_dash.csv'), index_col=0)
+    replicate(dash, scale, 'Flight Number').to_csv(os.path.join(workdir, 'spacex_launch_dash.csv'))
+
+
+# Synthetic launches of synthetic_data.py, with realistic variety at any size
+def synthetic_datasets(workdir, scale, seed=0):
+    rows = BASE_ROWS * scale
+    templates = synthetic_data.load_templates(DATASETS_DIR)
+    for name in ('dataset_part_1', 'dataset_part_2'):
+        write_artifact(pd.concat(synthetic_data.generate(name, rows, seed, templates=templates)), name,
+                       directory=workdir)
+    synthetic_data.write_chunks(synthetic_data.generate('spacex_launch_dash', rows, seed, templates=templates),
+                                os.path.join(workdir, 'spacex_launch_dash.csv'), index=True)
+
+
+# Ways of building the stage inputs for a scale: fn(workdir, scale, seed)
+DATA_SOURCES = {'synthetic': synthetic_datasets, 'replicate': replicate_datasets}
+
+
+# Stage setups
+#
+# Each setup prepares whatever its stage needs in `workdir` and returns the
+# function to time. It runs inside the benchmark process, before the clock starts.
+
+def _stub_document(kind, resource_id):
+    number = int(resource_id.rsplit('-', 1)[-1])
+    if kind == 'rockets':
+        return {'name': 'Falcon 9'}
+    if kind == 'launchpads':
+        return {'name': ['CCSFS SLC 40', 'KSC LC 39A', 'VAFB SLC 4E'][number % 3],
+                'longitude': -80.57 - number % 3, 'latitude': 28.56 + number % 3}
+    if kind == 'payloads':
+        return {'mass_kg': float(500 + number * 37 % 15000), 'orbit': ['LEO', 'GTO', 'ISS', 'PO'][number % 4]}
+    return {'block': 1 + number % 5, 'reuse_count': number % 7, 'serial': f"B{1000 + number % 100}"}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        _, _, kind, resource_id = self.path.split('/')
+        body = json.dumps(_stub_document(kind, resource_id)).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def setup_api_enrichment(workdir, rows, seed=0):
+    from spacex_api import enrich_launches, make_session
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    server.daemon_threads = True
+    server.request_queue_size = 128
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v4"
+
+    # Launch rows shaped like the filtered static snapshot: one payload and one core each
+    # Rockets and launchpads are shared, payloads are unique and cores are reused a few times
+    data = pd.DataFrame({'flight_number': np.arange(1, rows + 1),
+                         'date_utc': pd.date_range('2010-06-04', periods=rows, freq='D').date,
+                         'rocket': ['rocket-0'] * rows,
+                         'launchpad': [f"launchpad-{i % 3}" for i in range(rows)],
+                         'payloads': [f"payload-{i}" for i in range(rows)],
+                         'cores': [{'core': f"core-{i // 3}", 'flight': 1 + i % 3, 'gridfins': True, 'reused': i % 3 > 0,
+                                    'legs': True, 'landpad': None, 'landing_success': True, 'landing_type': 'ASDS'}
+                                   for i in range(rows)]})
+    return lambda: enrich_launches(data, session=make_session(), base_url=base_url)
+
+
+# The saved page of the Wikipedia launch list (see test_wiki_batch.py) grown to `rows`
+# launch rows: its launch rows, description rows included, are repeated with new flight
+# numbers, `rows_per_table` to a launch table, and its other tables are kept
+def fixture_page(rows, rows_per_table=100, path=WIKI_FIXTURE):
+    from bs4 import BeautifulSoup
+    from wiki_scrape import LAUNCH_TABLE_CLASS
+
+    with open(path, encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+    tables = soup.find_all('table', LAUNCH_TABLE_CLASS)
+    opening = str(tables[0]).split('>', 1)[0] + '>'
+    header = str(tables[0].find('tr'))
+    launches = []
+    for table in tables:
+        for tr in table.find_all('tr'):
+            if tr.th and tr.th.get('scope') == 'row':
+                launches.append([tr])
+            elif launches and tr.td:
+                launches[-1].append(tr)
+
+    parts = []
+    for start in range(1, rows + 1, rows_per_table):
+        table = [opening, '<tbody>', header]
+        for flight in range(start, min(start + rows_per_table, rows + 1)):
+            launch = launches[(flight - 1) % len(launches)]
+            launch[0].th.string = str(flight)
+            table += [str(tr) for tr in launch]
+        parts.append(''.join(table + ['</tbody></table>']))
+    for table in tables[1:]:
+        table.decompose()
+    tables[0].replace_with(LAUNCH_TABLES_MARK)
+    return str(soup).replace(LAUNCH_TABLES_MARK, '\n'.join(parts))
+
+
+def setup_wiki_parse(workdir, rows, seed=0):
+    from wiki_scrape import launch_tables, launch_column_names, iter_launch_rows, build_launch_frame, \
+        normalize_launch_frame
+
+    html = fixture_page(rows)
+
+    def run():
+        tables = launch_tables(html)
+        launch_column_names(tables[0])
+        return normalize_launch_frame(build_launch_frame(iter_launch_rows(tables)))
+    return run
+
+
+# Import what a script imports, so the timed run does not pay for it
+def preload_imports(path):
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules = [node.module]
+        else:
+            continue
+        for module in modules:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass
+
+
+def script_runner(script, workdir, **env):
+    path = os.path.join(CODE_DIR, script)
+    os.environ.update(SPACEX_ARTIFACT_DIR=workdir, MPLBACKEND='Agg', **env)
+    os.chdir(workdir)
+    preload_imports(path)
+
+    def run():
+        runpy.run_path(path, run_name='__main__')
+        import matplotlib.pyplot as plt
+        plt.close('all')
+    return run
+
+
+def setup_wrangling(workdir, rows, seed=0):
+    return script_runner('eda_datawrangling.py', workdir)
+
+
+def setup_features(workdir, rows, seed=0):
+    return script_runner('eda_visualization.py', workdir)
+
+
+def setup_training(workdir, rows, seed=0):
+    from launch_encoder import LaunchEncoder
+
+    # The training input built the same way eda_visualization.py builds it
+    df = read_artifact('dataset_part_2', directory=workdir)
+    features = df[['FlightNumber', 'PayloadMass', 'Orbit', 'LaunchSite', 'Flights', 'GridFins', 'Reused', 'Legs',
+                   'LandingPad', 'Block', 'ReusedCount', 'Serial']]
+    encoder = LaunchEncoder().fit(features)
+    encoder.save(os.path.join(workdir, 'launch_encoder.json'))
+    write_artifact(encoder.transform_frame(features).drop(columns=encoder.unknown_names()), 'dataset_part_3',
+                   directory=workdir)
+    # A fresh fold cache, so every candidate is really fitted
+    return script_runner('predictive_analytics.py', workdir,
+                         SPACEX_MODEL_CACHE=tempfile.mkdtemp(prefix='model_cache_', dir=workdir))
+
+
+# Every site in the pie chart callback, and every site with a few payload ranges in the scatter callback
+def setup_dash_callbacks(workdir, rows, seed=0):
+    os.chdir(workdir)
+    spec = importlib.util.spec_from_file_location('spacex_dash_app', os.path.join(CODE_DIR, 'spacex-dash-app.py'))
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+
+    cube = app.launch_cube.get()
+    sites = ['ALL'] + cube.sites
+    low, high = int(cube.min_payload), int(cube.max_payload)
+    ranges = [[low, high], [low, (low + high) // 2], [(low + high) // 2, high], [2000, 6000]]
+
+    # The figure cache starts empty in every benchmark process, so each figure is built once
+    def run():
+        for site in sites:
+            json.dumps(app.get_pie_chart(site))
+            for payload_range in ranges:
+                json.dumps(app.get_scatter_chart(site, payload_range))
+    return run
+
+
+STAGES = {'api_enrichment': setup_api_enrichment,
+          'wiki_parse': setup_wiki_parse,
+          'wrangling': setup_wrangling,
+          'features': setup_features,
+          'training': setup_training,
+          'dash_callbacks': setup_dash_callbacks}
+
+
+# Runs in the child process: set up one stage, time it and print the result as JSON
+def run_child(stage, workdir, rows, seed):
+    run = STAGES[stage](workdir, rows, seed)
+    setup_rss = _peak_rss_mb()
+    start = time.perf_counter()
+    run()
+    print(json.dumps({'seconds': time.perf_counter() - start, 'peak_rss_mb': _peak_rss_mb(),
+                      'setup_rss_mb': setup_rss}))
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+# Run one stage in a fresh process; returns its time and peak RSS
+def measure(stage, workdir, rows, seed=0, env=None):
+    command = [sys.executable, os.path.abspath(__file__), '--child', stage, workdir, str(rows), str(seed)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                               env=dict(os.environ, **(env or {})))
+    stdout, stderr = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"{stage} failed:\n{stderr[-2000:]}")
+    return json.loads(stdout.strip().splitlines()[-1])
+
+
+def run_benchmarks(stages, scales, repeat=1, data='synthetic', seed=0, report=print):
+    results = {}
+    for scale in scales:
+        rows = BASE_ROWS * scale
+        workdir = tempfile.mkdtemp(prefix=f'bench_{scale}x_')
+        try:
+            DATA_SOURCES[data](workdir, scale, seed)
+            for stage in stages:
+                runs = [measure(stage, workdir, rows, seed) for _ in range(repeat)]
+                result = {'rows': rows,
+                          'seconds': min(run['seconds'] for run in runs),
+                          'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+                          'setup_rss_mb': max(run['setup_rss_mb'] for run in runs)}
+                results[f"{stage}@{scale}x"] = result
+                report(f"{stage:>16} {scale:>5}x {rows:>9} rows {result['seconds']:>9.3f}s "
+                       f"{result['peak_rss_mb']:>8.1f} MB peak ({result['setup_rss_mb']:.1f} MB after setup)")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+# Results that got slower or bigger than the baseline by more than `threshold`
+def regressions(results, baseline, threshold=DEFAULT_THRESHOLD):
+    found = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in ('seconds', 'peak_rss_mb'):
+            if previous[metric] > 0 and result[metric] / previous[metric] > threshold:
+                found.append((key, metric, previous[metric], result[metric]))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on scaled-up data")
+    parser.add_argument('--stages', nargs='+', default=list(STAGES), choices=list(STAGES))
+    parser.add_argument('--scales', nargs='+', type=int, default=DEFAULT_SCALES,
+                        help=f"multiples of the {BASE_ROWS} launches of the shipped datasets")
+    parser.add_argument('--repeat', type=int, default=1, help="runs per stage; the fastest one counts")
+    parser.add_argument('--data', default='synthetic', choices=list(DATA_SOURCES), help="how the scaled inputs are built")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--results-dir', default=RESULTS_DIR)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="ratio to the baseline above which a result is a regression")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.stages, args.scales, args.repeat, args.data, args.seed)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    run = {'created': datetime.datetime.now().isoformat(timespec='seconds'),
+           'python': platform.python_version(),
+           'machine': platform.machine(),
+           'cpus': os.cpu_count(),
+           'data': args.data,
+           'results': results}
+    path = os.path.join(args.results_dir, run['created'].replace(':', '') + '.json')
+    with open(path, 'w') as f:
+        json.dump(run, f, indent=1)
+    print(f"Results written to {path}")
+
+    baseline_path = os.path.join(args.results_dir, BASELINE_FILE)
+    if args.save_baseline:
+        shutil.copyfile(path, baseline_path)
+        print(f"Saved as baseline {baseline_path}")
+        return 0
+    if not os.path.exists(baseline_path):
+        print("No baseline yet; run with --save-baseline to record one")
+        return 0
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    found = regressions(results, baseline, args.threshold)
+    for key, metric, previous, current in found:
+        print(f"REGRESSION {key} {metric}: {previous:.3f} -> {current:.3f} ({current / previous:.2f}x)")
+    if not found:
+        print(f"No regressions against {baseline_path} (threshold {args.threshold:.2f}x)")
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        stage, workdir, rows, seed = sys.argv[2:6]
+        run_child(stage, workdir, int(rows), int(seed))
+    else:
+        sys.exit(main())
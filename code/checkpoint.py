@@ -0,0 +1,84 @@
+# High-water marks for incremental data collection.
+#
+# Each collection script keeps its own checkpoint file, so the scripts can run
+# side by side. The checkpoints remember how far each script got:
+#   api  - last SpaceX API flight_number / date_utc collected, plus the running
+#          PayloadMass sum and count and the rows whose mass was imputed, so the
+#          mean imputation stays consistent without refetching the history
+#   wiki - last `Flight No.` scraped from the Wikipedia launch tables
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHECKPOINT_DIR = os.environ.get('SPACEX_CHECKPOINT_DIR', '.checkpoints')
+
+
+def checkpoint_path(name, directory=DEFAULT_CHECKPOINT_DIR):
+    return os.path.join(directory, f"{name}.json")
+
+
+# Read a checkpoint, or None if the script has not completed a run yet
+def load_checkpoint(name, directory=DEFAULT_CHECKPOINT_DIR):
+    path = checkpoint_path(name, directory)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+# Write a checkpoint atomically so an interrupted run never leaves half a file
+def save_checkpoint(name, state, directory=DEFAULT_CHECKPOINT_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = checkpoint_path(name, directory)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+# Append newly collected launches to the Falcon 9 dataset of earlier runs
+# - Falcon 1 launches are dropped
+# - FlightNumber keeps counting from the last row of `previous`
+# - missing PayloadMass values are filled with the mean over all observed masses;
+#   rows imputed in earlier runs are updated to the new mean
+# With an empty `previous` and state this is the same as a full rebuild.
+# Returns the combined dataframe and the new api checkpoint state.
+def append_falcon9_launches(launch_df, previous=None, state=None):
+    state = dict(state or {})
+    previous = previous if previous is not None else pd.DataFrame(columns=launch_df.columns)
+
+    new_rows = launch_df[launch_df['BoosterVersion'] != 'Falcon 1'].copy()
+
+    # Reset FlightNumber to continue sequentially after the rows we already have
+    start = len(previous) + 1
+    new_rows['FlightNumber'] = list(range(start, start + new_rows.shape[0]))
+
+    # Update the running PayloadMass statistics with the newly observed masses
+    observed = new_rows['PayloadMass'].dropna()
+    mass_sum = state.get('payload_mass_sum', 0.0) + float(observed.sum())
+    mass_count = state.get('payload_mass_count', 0) + int(observed.shape[0])
+    payload_mass_mean = mass_sum / mass_count if mass_count else np.nan
+
+    imputed = list(state.get('imputed_flight_numbers', []))
+    imputed += new_rows.loc[new_rows['PayloadMass'].isna(), 'FlightNumber'].tolist()
+
+    if not len(new_rows):
+        combined = previous.copy()
+    elif not len(previous):
+        combined = new_rows
+    else:
+        combined = pd.concat([previous, new_rows], ignore_index=True)
+    combined = combined.reset_index(drop=True)
+    # An empty range() or concat with an empty frame gives a float64 FlightNumber
+    combined['FlightNumber'] = combined['FlightNumber'].astype('int64')
+    combined.loc[combined['FlightNumber'].isin(imputed), 'PayloadMass'] = payload_mass_mean
+
+    if len(launch_df):
+        state['flight_number'] = int(launch_df['FlightNumber'].max())
+        state['date_utc'] = str(launch_df['Date'].max())
+    state['payload_mass_sum'] = mass_sum
+    state['payload_mass_count'] = mass_count
+    state['imputed_flight_numbers'] = [int(n) for n in imputed]
+    return combined, state
@@ -0,0 +1,43 @@
+# Shared fixtures of the tests in this directory.
+#
+# WIKI_RECORDS are launch table rows as wiki_scrape.py extracts them from the
+# Wikipedia page, with the usual noise: garbled version strings
+# ("F9 v1.07B0003.18"), masses with units and separators, a payload mass of 0,
+# trailing newlines and non-breaking spaces.
+
+import copy
+import pytest
+from wiki_scrape import build_launch_frame, normalize_launch_frame
+
+WIKI_RECORDS = [
+    {'Flight No.': '1', 'Launch site': 'CCAFS', 'Payload': 'Dragon Spacecraft Qualification Unit',
+     'Payload mass': 0, 'Orbit': 'LEO', 'Customer': 'SpaceX', 'Launch outcome': 'Success\n',
+     'Version Booster': 'F9 v1.07B0003.18', 'Booster landing': 'Failure', 'Date': '4 June 2010', 'Time': '18:45'},
+    {'Flight No.': '2', 'Launch site': 'CCAFS', 'Payload': 'Dragon', 'Payload mass': '4,700 kg',
+     'Orbit': 'LEO', 'Customer': 'NASA', 'Launch outcome': 'Success\n', 'Version Booster': 'F9 v1.07B0004.18',
+     'Booster landing': 'No attempt\n', 'Date': '8 October 2012', 'Time': '00:35'},
+    {'Flight No.': '6', 'Launch site': 'VAFB', 'Payload': 'CASSIOPE', 'Payload mass': '500 kg',
+     'Orbit': 'Polar orbit', 'Customer': 'MDA', 'Launch outcome': 'Success\n', 'Version Booster': 'F9 v1.17B10038',
+     'Booster landing': 'Uncontrolled\xa0(ocean)', 'Date': '29 September 2013', 'Time': '16:00:00'},
+    {'Flight No.': '7', 'Launch site': 'CCAFS', 'Payload': 'SES-8', 'Payload mass': '3,170 kg', 'Orbit': 'GTO',
+     'Customer': 'SES', 'Launch outcome': 'Success\n', 'Version Booster': 'F9 v1.1',
+     'Booster landing': 'No attempt\n', 'Date': '3 December 2013', 'Time': '22:41'},
+    {'Flight No.': '8', 'Launch site': 'CCAFS', 'Payload': 'Thaicom 6', 'Payload mass': '3,325 kg', 'Orbit': 'GTO',
+     'Customer': 'Thaicom', 'Launch outcome': 'Success\n', 'Version Booster': 'F9 v1.1',
+     'Booster landing': 'No attempt\n', 'Date': '6 January 2014', 'Time': '22:06'},
+]
+
+
+@pytest.fixture
+def wiki_records():
+    return copy.deepcopy(WIKI_RECORDS)
+
+
+# Builds the scraped launch table of some records (all WIKI_RECORDS by default),
+# normalized as datacollection_part2.py stores it, or as the raw scrape with raw=True
+@pytest.fixture
+def launch_frame(wiki_records):
+    def build(records=None, raw=False):
+        df = build_launch_frame(wiki_records if records is None else records)
+        return df if raw else normalize_launch_frame(df)
+    return build
@@ -1,51 +1,14 @@
 # Import required libraries for web scraping and data manipulation
-import sys
+import os
+import logging
 import requests
-from bs4 import BeautifulSoup
-import re
-import unicodedata
-import pandas as pd
-
-# Helper functions to process HTML data
-
-# Function to return the date and time from the HTML table cells
-def date_time(table_cells):
-    return [date_time.strip() for date_time in list(table_cells.strings)][0:2]
-
-# Function to the return the booster version from the HTML table cells
-def booster_version(table_cells):
-    out = ''.join([booster_version for i, booster_version in enumerate(table_cells.strings) if i%2 == 0][0:-1])
-    return out
-
-# Function to return the landing status from the HTML table cells
-def landing_status(table_cells):
-    out = [i for i in table_cells.strings][0]
-    return out
-
-def get_mass(table_cells):
-    mass=unicodedata.normalize("NFKD", table_cells.text).strip()
-    if mass:
-        mass.find("kg")
-        new_mass = mass[0:mass.find("kg")+2]
-    else:
-        new_mass = 0
-    return new_mass
-
-def extra_column_from_header(row):
-    if(row.br):
-        row.br.extract()
-    if row.a:
-        row.a.extract()
-    if row.sup:
-        row.sup.extract()
-    
-    column_name = ' '.join(row.contents)
-    
-    # filter the digit and empty names
-    if not(column_name.strip().isdigit()):
-        column_name = column_name.strip()
-        return column_name
+from wiki_scrape import (launch_tables, launch_column_names, iter_launch_rows, build_launch_frame,
+                         normalize_launch_frame, concat_launch_frames)
+from checkpoint import load_checkpoint, save_checkpoint
+from artifacts import artifact_exists, read_artifact, write_artifact
 
+# Helper functions to process HTML data and the streaming launch table parser
+# live in wiki_scrape.py
 
 # Wikipedia page URL for Web Scraping
 static_url = "https://en.wikipedia.org/w/index.php?title=List_of_Falcon_9_and_Falcon_Heavy_launches&oldid=1027686922"
@@ -60,154 +23,46 @@ headers = {
 # assign the response to a object
 response = requests.get(static_url, headers=headers)
 
-# Use BeautifulSoup() to create a BeautifulSoup object from a response text content
-soup = BeautifulSoup(response.text, "html.parser")
-
-# Use soup.title attribute
-print(soup.title.string)
+# Set SPACEX_DEBUG=1 to log every parsed launch record
+logging.basicConfig(level=logging.DEBUG if os.environ.get('SPACEX_DEBUG') else logging.INFO)
 
-# Use the find_all function in the BeautifulSoup object, with element type `table`
-# Assign the result to a list called `html_tables`
-html_tables = soup.find_all('table')
+# Tokenize the page and build only the launch tables
+# (`wikitable plainrowheaders collapsible`); the rest of the page is never built into a tree
+launch_table_list = launch_tables(response.text)
 
-# Let's print the third table and check its content
-first_launch_table = html_tables[2]
-print(first_launch_table)
+# The first launch table holds the column headers
+first_launch_table = launch_table_list[0]
 
 # Iterate through the <th> elements and apply the provided extract_column_from_header() to extract column name one by one
-column_names = []
-
-# Apply find_all() function with `th` element on first_launch_table
-th_elements = first_launch_table.find_all('th')
-
-# Iterate each th element and apply the provided extract_column_from_header() to get a column name
-# Append the Non-empty column name (`if name is not None and len(name) > 0`) into a list called column_names
-for th in th_elements:
-    name = extra_column_from_header(th)
-    if name and len(name) > 0:
-        column_names.append(name)
-
+column_names = launch_column_names(first_launch_table)
 print(column_names)
 
-# Create a data frame by parsing the launch HTML tables
-
-# First we will create an empty dictionary with keys
-launch_dict = dict.fromkeys(column_names)
-
-# Remove irrelevant columns
-del launch_dict['Date and time ( )']
-
-# Initialize the launch_dict with each value to be an empty list
-launch_dict['Flight No.'] = []
-launch_dict['Launch site'] = []
-launch_dict['Payload'] = []
-launch_dict['Payload mass'] = []
-launch_dict['Orbit'] = []
-launch_dict['Customer'] = []
-launch_dict['Launch outcome'] = []
-# Add some new columns
-launch_dict['Version Booster'] = []
-launch_dict['Booster landing'] = []
-launch_dict['Date'] = []
-launch_dict['Time'] = []
-
-# Next, we just need to fill up the launch_dict with launch records extracted from table rows.
+# Next, we just need to fill up the launch dataframe with launch records extracted from table rows.
 # Usually, HTML tables in Wiki pages are likely to contain unexpected annotations 
 # and other types of noises, such as reference links B0004.1[8], missing values N/A [e],
 # inconsistent formatting, etc.
 
-# Parse all launch tables
-
-extracted_row = 0
-#Extract each table 
-for table_number,table in enumerate(soup.find_all('table',"wikitable plainrowheaders collapsible")):
-   # get table row 
-    for rows in table.find_all("tr"):
-        #check to see if first table heading is as number corresponding to launch a number 
-        if rows.th:
-            if rows.th.string:
-                flight_number=rows.th.string.strip()
-                flag=flight_number.isdigit()
-        else:
-            flag=False
-        #get table element 
-        row=rows.find_all('td')
-        #if it is number save cells in a dictonary 
-        if flag:
-            extracted_row += 1
-            # Flight Number value
-            # Append the flight_number into launch_dict with key `Flight No.`
-            launch_dict['Flight No.'].append(flight_number)
-            print(flight_number)
-            datatimelist=date_time(row[0])
-            
-            # Date value
-            # Append the date into launch_dict with key `Date`
-            date = datatimelist[0].strip(',')
-            launch_dict['Date'].append(date)
-            print(date)
-            
-            # Time value
-            # Append the time into launch_dict with key `Time`
-            time = datatimelist[1]
-            launch_dict['Time'].append(time)
-            print(time)
-              
-            # Booster version
-            # Append the bv into launch_dict with key `Version Booster`
-            bv=booster_version(row[1])
-            if not(bv):
-                bv=row[1].a.string
-            launch_dict['Version Booster'].append(bv)
-            print(bv)
-            
-            # Launch Site
-            # Append the bv into launch_dict with key `Launch Site`
-            launch_site = row[2].a.string
-            launch_dict['Launch site'].append(launch_site)
-            print(launch_site)
-            
-            # Payload
-            # Append the payload into launch_dict with key `Payload`
-            payload = row[3].a.string
-            launch_dict['Payload'].append(payload)
-            print(payload)
-            
-            # Payload Mass
-            # Append the payload_mass into launch_dict with key `Payload mass`
-            payload_mass = get_mass(row[4])
-            launch_dict['Payload mass'].append(payload_mass)
-            print(payload_mass)
-            
-            # Orbit
-            # Append the orbit into launch_dict with key `Orbit`
-            orbit = row[5].a.string
-            launch_dict['Orbit'].append(orbit)
-            print(orbit)
-            
-            # Customer
-            # Append the customer into launch_dict with key `Customer`
-            if row[6].a:
-                customer = row[6].a.string
-            else:
-                customer = row[6].string.strip()  # fallback if no <a> tag
-            launch_dict['Customer'].append(customer)
-            print(customer)
-            
-            # Launch outcome
-            # Append the launch_outcome into launch_dict with key `Launch outcome`
-            launch_outcome = list(row[7].strings)[0]
-            launch_dict['Launch outcome'].append(launch_outcome)
-            print(launch_outcome)
-            
-            # Booster landing
-            # Append the launch_outcome into launch_dict with key `Booster landing`
-            booster_landing = landing_status(row[8])
-            launch_dict['Booster landing'].append(booster_landing)
-            print(booster_landing)
-
-# Create a pandas data frame
-df= pd.DataFrame({ key:pd.Series(value) for key, value in launch_dict.items() })
-
-# Export the data to csv
-df.to_csv('spacex_web_scraped.csv', index=False)
\ No newline at end of file
+# Incremental mode: rows up to the last `Flight No.` scraped by an earlier run are skipped
+# and only the new launches are appended to OUTPUT_ARTIFACT. Set SPACEX_INCREMENTAL=1 to enable it.
+OUTPUT_ARTIFACT = 'spacex_web_scraped'
+checkpoint = load_checkpoint('wiki')
+INCREMENTAL = (os.environ.get('SPACEX_INCREMENTAL', '') not in ('', '0')
+               and checkpoint is not None and artifact_exists(OUTPUT_ARTIFACT))
+last_flight_no = checkpoint['flight_no'] if INCREMENTAL else 0
+
+# Parse all launch tables: the rows are generated one at a time straight into the dataframe
+df = build_launch_frame(iter_launch_rows(launch_table_list, after_flight_no=last_flight_no))
+
+# Normalize the scraped strings into typed columns: numeric payload mass in kg, one launch
+# timestamp, the booster serial split out of the version string and categorical
+# site/orbit/outcome/landing columns
+df = normalize_launch_frame(df)
+
+# Store the typed data, appending to the earlier rows in incremental mode
+if INCREMENTAL:
+    write_artifact(concat_launch_frames([read_artifact(OUTPUT_ARTIFACT), df]), OUTPUT_ARTIFACT)
+else:
+    write_artifact(df, OUTPUT_ARTIFACT)
+
+if len(df):
+    save_checkpoint('wiki', {'flight_no': int(df['Flight No.'].max())})
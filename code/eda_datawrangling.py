@@ -1,9 +1,9 @@
 # Import required libraries
-import pandas as pd
 import numpy as np
+from artifacts import read_artifact, write_artifact
 
 # Load the dataset
-df = pd.read_csv('dataset_part_1.csv')
+df = read_artifact('dataset_part_1')
 df.head(5)
 
 # Identify and calculate the percentage of the missing values in each attribute
@@ -38,5 +38,5 @@ df.head(5)
 # Determine the success rate
 df['Class'].mean()
 
-# Save as CSV
-df.to_csv("dataset_part_2.csv", index=False)
\ No newline at end of file
+# Save as a typed artifact (set SPACEX_EXPORT_CSV=1 to also write dataset_part_2.csv)
+write_artifact(df, 'dataset_part_2')
\ No newline at end of file
@@ -1,11 +1,23 @@
 # Import required libraries
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+from artifacts import read_artifact, write_artifact
+from launch_encoder import LaunchEncoder
+from analytics_store import AnalyticsStore, api_launches
 
 # Read SpaceX dataset part-2 into the pandas DataFrame
-df = pd.read_csv('dataset_part_2.csv')
+df = read_artifact('dataset_part_2')
+
+# Set SPACEX_ANALYTICS_DB to an analytics_store.py database to compute the success rates below
+# in SQL instead of grouping the DataFrame; its api source is reloaded from df first, so the
+# rates are never those of an older dataset_part_2
+ANALYTICS_DB = os.environ.get('SPACEX_ANALYTICS_DB')
+if ANALYTICS_DB:
+    with AnalyticsStore(ANALYTICS_DB) as store:
+        store.load_frame('api', api_launches(df))
 df.head(5)
 
 # Plot FlightNumber vs. PayloadMass
@@ -28,7 +40,11 @@ plt.show()
 
 # Visualize the relationship between success rate of each orbit type
 # Group and calculate mean success rate per orbit
-success_rate = df.groupby('Orbit')['Class'].mean().sort_values(ascending=False)
+if ANALYTICS_DB:
+    with AnalyticsStore(ANALYTICS_DB) as store:
+        success_rate = store.success_rates('Orbit').set_index('Orbit')['success_rate'].sort_values(ascending=False)
+else:
+    success_rate = df.groupby('Orbit')['Class'].mean().sort_values(ascending=False)
 
 # Create figure
 plt.figure(figsize=(10,6))
@@ -82,7 +98,11 @@ df.head()
 
 # Plot a line chart with x axis to be the extracted year and y axis to be the success rate
 # Calculate yearly average success rate
-yearly_success = df.groupby('Year', as_index=False)['Class'].mean()
+if ANALYTICS_DB:
+    with AnalyticsStore(ANALYTICS_DB) as store:
+        yearly_success = store.yearly_success_rates()[['Year', 'success_rate']].rename(columns={'success_rate': 'Class'})
+else:
+    yearly_success = df.groupby('Year', as_index=False)['Class'].mean()
 
 # Ensure 'Year' is numeric (sometimes extracted as string)
 yearly_success['Year'] = yearly_success['Year'].astype(int)
@@ -120,20 +140,17 @@ plt.show()
 features = df[['FlightNumber', 'PayloadMass', 'Orbit', 'LaunchSite', 'Flights', 'GridFins', 'Reused', 'Legs', 'LandingPad', 'Block', 'ReusedCount', 'Serial']]
 features.head()
 
-# Create dummy variables to categorical columns
-# Create dummy variables for categorical columns
-features_one_hot = pd.get_dummies(
-    features, 
-    columns=['Orbit', 'LaunchSite', 'LandingPad', 'Serial']
-)
+# One-hot encode the categorical columns with a fitted encoder instead of pd.get_dummies
+# Its vocabulary is saved next to the dataset, so training and prediction use the same columns;
+# values it has not seen go to an <column>_unknown bucket instead of adding columns
+# dataset_part_3 leaves out the unknown buckets, which are all 0 on the data the encoder was fitted on,
+# so its columns stay the ones pd.get_dummies produced
+encoder = LaunchEncoder().fit(features)
+encoder.save()
+features_one_hot = encoder.transform_frame(features).drop(columns=encoder.unknown_names())
 
 # Display the first few rows of the new dataframe
 features_one_hot.head()
 
-# Cast all columns to float64
-features_one_hot = features_one_hot.astype('float64')
-
-# Display the first few rows to verify
-features_one_hot.head()
-
-features_one_hot.to_csv('dataset_part_3.csv', index=False)
\ No newline at end of file
+# Save as a typed artifact (set SPACEX_EXPORT_CSV=1 to also write dataset_part_3.csv)
+write_artifact(features_one_hot, 'dataset_part_3')
\ No newline at end of file
@@ -0,0 +1,157 @@
+# Memoization of the dashboard figures.
+#
+# Every callback of spacex-dash-app.py is wrapped with FigureCache.memoize: the
+# figure built for a set of callback inputs is stored as Plotly JSON and served
+# from the cache the next time anyone asks for the same inputs, without running
+# px.pie / px.scatter again.
+#
+# Backends:
+#   MemoryBackend   LRU dictionary with a TTL, private to the process
+#   SQLiteBackend   a SQLite file shared by every worker process on the host
+#                   (WAL mode, so readers never wait for a writer)
+#
+# The key holds the version of the dataset (see launch_cube.WatchedCube), so a
+# refreshed CSV never serves figures of the old data; stale entries simply age
+# out. Slider ranges are widened to the slider step by quantize_range() before
+# they are looked up, so nearby requests share entries.
+#
+# The backend is chosen from the environment by cache_from_env():
+#   SPACEX_FIGURE_CACHE       path of a SQLite cache file (default: in-memory cache)
+#   SPACEX_FIGURE_CACHE_TTL   seconds an entry stays valid (default 3600)
+#   SPACEX_FIGURE_CACHE_SIZE  entries kept by the in-memory cache (default 1024)
+
+import os
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+
+DEFAULT_TTL = 3600
+DEFAULT_SIZE = 1024
+# SQLite backend: expired entries are deleted every PURGE_EVERY writes
+PURGE_EVERY = 256
+
+
+class MemoryBackend:
+
+    def __init__(self, maxsize=DEFAULT_SIZE, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.time() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class SQLiteBackend:
+
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.local = threading.local()
+        self.writes = 0
+        with self._connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS figures "
+                               "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS figures_expires ON figures (expires)")
+
+    # One connection per thread; sqlite3 connections cannot be shared between threads
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute("SELECT value FROM figures WHERE key = ? AND expires >= ?",
+                                         (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, value):
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO figures VALUES (?, ?, ?)", (key, value, now + self.ttl))
+            self.writes += 1
+            if self.writes % PURGE_EVERY == 0:
+                connection.execute("DELETE FROM figures WHERE expires < ?", (now,))
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM figures")
+
+
+class FigureCache:
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(name, version, args):
+        payload = json.dumps([name, version, args], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    # Cache the figure a callback returns, keyed by its arguments and version()
+    # The wrapped function returns the figure as a dict parsed from the cached JSON
+    def memoize(self, version=lambda: None):
+
+        def decorator(function):
+
+            @functools.wraps(function)
+            def wrapper(*args):
+                key = self.key(function.__qualname__, version(), args)
+                cached = self.backend.get(key)
+                if cached is None:
+                    self.misses += 1
+                    cached = function(*args).to_json()
+                    self.backend.put(key, cached)
+                else:
+                    self.hits += 1
+                return json.loads(cached)
+
+            return wrapper
+
+        return decorator
+
+
+# Widen a slider range to the slider grid origin + k * step, so it never loses points
+def quantize_range(low, high, step, origin=0):
+    return (origin + math.floor((low - origin) / step) * step,
+            origin + math.ceil((high - origin) / step) * step)
+
+
+def cache_from_env(environ=os.environ):
+    ttl = float(environ.get('SPACEX_FIGURE_CACHE_TTL', DEFAULT_TTL))
+    path = environ.get('SPACEX_FIGURE_CACHE')
+    if path:
+        return FigureCache(SQLiteBackend(path, ttl))
+    return FigureCache(MemoryBackend(int(environ.get('SPACEX_FIGURE_CACHE_SIZE', DEFAULT_SIZE)), ttl))
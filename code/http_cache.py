@@ -0,0 +1,194 @@
+# Persistent on-disk cache for the HTTP responses used by the data collection scripts.
+#
+# Responses are stored in a SQLite file keyed by URL. Each endpoint has its own
+# time-to-live; once an entry goes stale it is revalidated with ETag /
+# Last-Modified headers, so unchanged documents cost a 304 instead of a full
+# download. The file is kept under a size limit by evicting the least recently
+# used entries, and an offline mode serves only what is already cached.
+
+import os
+import json
+import hashlib
+import time
+import sqlite3
+import threading
+import requests
+
+DEFAULT_CACHE_PATH = os.environ.get('SPACEX_HTTP_CACHE', '.http_cache.sqlite')
+
+# Keep the cache file under 256 MB by default
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# Time-to-live per endpoint, matched against the URL in order (first match wins)
+DEFAULT_TTLS = [
+    ('/v4/launches', 6 * HOUR),
+    ('/v4/cores/', DAY),
+    ('/v4/rockets/', 7 * DAY),
+    ('/v4/launchpads/', 7 * DAY),
+    ('/v4/payloads/', 7 * DAY),
+    ('cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud', 30 * DAY),
+    # A Wikipedia oldid never changes; the current page does
+    ('wikipedia.org/w/index.php?title=List_of_Falcon_9_and_Falcon_Heavy_launches&oldid=', 365 * DAY),
+    ('wikipedia.org', DAY),
+]
+DEFAULT_TTL = HOUR
+
+
+# Raised in offline mode when a URL has never been cached
+class CacheMiss(requests.exceptions.RequestException):
+    pass
+
+
+# Minimal stand-in for requests.Response, built from a cache row
+class CachedResponse:
+    from_cache = True
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = 'utf-8'
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self, **kwargs):
+        return json.loads(self.content, **kwargs)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+# Drop-in replacement for the `get` and `post` of a requests.Session, backed by SQLite
+# Safe to share between the worker threads of the enrichment engine
+class CachedSession:
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, session=None, ttls=DEFAULT_TTLS,
+                 default_ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, offline=None):
+        if offline is None:
+            offline = os.environ.get('SPACEX_HTTP_OFFLINE', '') not in ('', '0')
+        self.session = session or requests.Session()
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.network_calls = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                                key TEXT PRIMARY KEY,
+                                url TEXT,
+                                status INTEGER,
+                                headers TEXT,
+                                body BLOB,
+                                etag TEXT,
+                                last_modified TEXT,
+                                fetched_at REAL,
+                                accessed_at REAL,
+                                size INTEGER)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+
+    # Time-to-live in seconds for a URL
+    def ttl_for(self, url):
+        for pattern, ttl in self.ttls:
+            if pattern in url:
+                return ttl
+        return self.default_ttl
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        url = requests.Request('GET', url, params=params).prepare().url
+        return self._request('GET', url, url, headers, kwargs)
+
+    # POST bodies are part of the key, so each distinct query is cached separately
+    def post(self, url, headers=None, **kwargs):
+        body = json.dumps(kwargs.get('json'), sort_keys=True) + str(kwargs.get('data'))
+        key = url + '#' + hashlib.sha256(body.encode()).hexdigest()
+        return self._request('POST', url, key, headers, kwargs)
+
+    def _request(self, method, url, key, headers, kwargs):
+        row = self._lookup(key)
+        now = time.time()
+
+        if row is not None and (self.offline or now - row['fetched_at'] < self.ttl_for(url)):
+            self._touch(key, now)
+            return self._response(row)
+        if self.offline:
+            raise CacheMiss(f"{url} is not cached and offline mode is enabled")
+
+        # Stale or missing: ask the server, revalidating when we have validators
+        headers = dict(headers or {})
+        if row is not None:
+            if row['etag']:
+                headers['If-None-Match'] = row['etag']
+            if row['last_modified']:
+                headers['If-Modified-Since'] = row['last_modified']
+        response = self.session.request(method, url, headers=headers, **kwargs)
+        with self._lock:
+            self.network_calls += 1
+
+        if response.status_code == 304 and row is not None:
+            with self._lock:
+                self._db.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                                 (now, now, key))
+                self._db.commit()
+            return self._response(row)
+
+        if response.status_code == 200:
+            self._store(key, url, response, now)
+        response.from_cache = False
+        return response
+
+    def _lookup(self, key):
+        with self._lock:
+            cursor = self._db.execute("""SELECT url, status, headers, body, etag, last_modified, fetched_at
+                                         FROM responses WHERE key = ?""", (key,))
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        names = ('url', 'status', 'headers', 'body', 'etag', 'last_modified', 'fetched_at')
+        return dict(zip(names, row))
+
+    def _touch(self, key, now):
+        with self._lock:
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+
+    def _store(self, key, url, response, now):
+        body = response.content
+        with self._lock:
+            self._db.execute("""INSERT OR REPLACE INTO responses
+                                (key, url, status, headers, body, etag, last_modified, fetched_at, accessed_at, size)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                             (key, url, response.status_code, json.dumps(dict(response.headers)), body,
+                              response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                              now, now, len(body)))
+            self._evict()
+            self._db.commit()
+
+    # Delete least recently used entries until the cache fits in max_bytes
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def _response(self, row):
+        return CachedResponse(row['url'], row['status'], json.loads(row['headers']), row['body'])
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,214 @@
+# Local HTTP service for landing-success predictions.
+#
+# Loads a saved landing model (see landing_model.py) once and answers:
+#
+#   POST /predict   a raw launch descriptor, or a list of them, with the
+#                   dataset_part_2 fields (PayloadMass, Orbit, LaunchSite, Block,
+#                   ReusedCount, Serial, ...); returns Class and LandingProbability
+#   GET  /metrics   request count, batch sizes and p50/p99 latency in ms
+#   GET  /healthz   model name and version
+#
+# Descriptors are one-hot encoded with the model's feature schema, the same
+# columns eda_visualization.py builds. Concurrent requests are not scored one by
+# one: a batching thread collects whatever arrived within a couple of
+# milliseconds and scores it with a single vectorized call.
+#
+# Usage:
+#   python inference_server.py --port 8000
+#   curl -d '{"FlightNumber": 91, "PayloadMass": 15600, "Orbit": "VLEO", ...}' localhost:8000/predict
+
+import json
+import time
+import queue
+import logging
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from landing_model import DEFAULT_MODEL_NAME, load_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT_MS = 2.0
+LATENCY_WINDOW = 10000
+
+
+# Coalesces concurrent scoring requests into batched model calls
+class MicroBatcher:
+
+    def __init__(self, model, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self.thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self.thread.start()
+
+    # Score a list of descriptors; blocks until its batch has been scored
+    def submit(self, records):
+        future = Future()
+        self.requests.put((records, future))
+        return future.result()
+
+    def _next_batch(self):
+        batch = [self.requests.get()]
+        size = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            try:
+                item = self.requests.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _score(self, records):
+        scored = self.model.score_frame(self.model.encode(pd.DataFrame.from_records(records)))
+        return scored.to_dict('records')
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            self.batch_sizes.append(sum(len(records) for records, _ in batch))
+            try:
+                results = self._score([record for records, _ in batch for record in records])
+            except Exception:
+                # One bad request must not fail the others: score them one by one
+                for records, future in batch:
+                    try:
+                        future.set_result(self._score(records))
+                    except Exception as error:
+                        future.set_exception(error)
+                continue
+            start = 0
+            for records, future in batch:
+                future.set_result(results[start:start + len(records)])
+                start += len(records)
+
+
+class LatencyStats:
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.latencies = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds, error=False):
+        with self.lock:
+            self.latencies.append(seconds * 1000)
+            self.count += 1
+            self.errors += error
+
+    def summary(self):
+        with self.lock:
+            latencies = np.array(self.latencies)
+            count, errors = self.count, self.errors
+        summary = {'requests': count, 'errors': errors}
+        if len(latencies):
+            summary.update({'p50_ms': float(np.percentile(latencies, 50)),
+                            'p99_ms': float(np.percentile(latencies, 99)),
+                            'max_ms': float(latencies.max())})
+        return summary
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def make_handler(batcher, stats):
+
+    class InferenceHandler(BaseHTTPRequestHandler):
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == '/healthz':
+                manifest = batcher.model.manifest
+                self._send(200, {'status': 'ok', 'model': manifest['name'], 'version': manifest['version']})
+            elif self.path == '/metrics':
+                sizes = list(batcher.batch_sizes)
+                self._send(200, dict(stats.summary(), batches=len(sizes),
+                                     mean_batch_size=float(np.mean(sizes)) if sizes else 0.0))
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send(404, {'error': 'not found'})
+                return
+            start = time.perf_counter()
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                records = body if isinstance(body, list) else [body]
+                predictions = batcher.submit(records)
+                predictions = [{key: _plain(value) for key, value in p.items()} for p in predictions]
+            except (ValueError, KeyError, TypeError) as error:
+                stats.record(time.perf_counter() - start, error=True)
+                self._send(400, {'error': str(error)})
+                return
+            except Exception as error:
+                # Model or encoder failures still get a response instead of a dropped connection
+                logger.exception("Prediction failed")
+                stats.record(time.perf_counter() - start, error=True)
+                self._send(500, {'error': f"{type(error).__name__}: {error}"})
+                return
+            stats.record(time.perf_counter() - start)
+            self._send(200, {'predictions': predictions if isinstance(body, list) else predictions[0],
+                             'version': batcher.model.manifest['version']})
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return InferenceHandler
+
+
+class InferenceServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Planning tools open many connections at once; the default backlog of 5 resets them
+    request_queue_size = 128
+
+
+def make_server(model, host='127.0.0.1', port=8000, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    batcher = MicroBatcher(model, max_batch, max_wait_ms)
+    return InferenceServer((host, port), make_handler(batcher, LatencyStats()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve landing-success predictions over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--name', default=DEFAULT_MODEL_NAME)
+    parser.add_argument('--version', type=int, default=None, help="model version (default: latest)")
+    parser.add_argument('--model-root', default=None, help="directory holding models/ (default: artifact directory)")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    model = load_model(args.name, args.version, args.model_root)
+    server = make_server(model, args.host, args.port, args.max_batch, args.max_wait_ms)
+    logger.info("Serving %s v%d on http://%s:%d", model.manifest['name'], model.manifest['version'],
+                args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+# Persisted landing classifier and batch prediction.
+#
+# predictive_analytics.py saves the fitted StandardScaler and the best model
+# as a versioned artifact:
+#
+#   models/landing_model/v0003/model.joblib    scaler + estimator
+#   models/landing_model/v0003/manifest.json   feature schema, parameters, scores
+#
+# The manifest lists the feature columns of dataset_part_3 in training order,
+# split into numeric columns and one-hot groups (Orbit_*, LaunchSite_*, ...).
+# load_model() reads an artifact once; the returned LandingModel scores whole
+# DataFrames with one vectorized call. Rows may leave out one-hot columns
+# (they count as 0), but missing numeric columns and columns the model was not
+# trained on are errors, so a schema change never goes unnoticed.
+#
+# Usage:
+#   python landing_model.py launches.csv --output predictions.csv
+#   python landing_model.py launches.parquet --version 2
+#   cat launches.jsonl | python landing_model.py - > predictions.jsonl
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import datetime
+import numpy as np
+import pandas as pd
+import joblib
+import sklearn
+from scipy import sparse
+from artifacts import artifact_dir
+from launch_encoder import CATEGORICAL_COLUMNS, LaunchEncoder
+
+DEFAULT_MODEL_NAME = 'landing_model'
+
+DEFAULT_BATCH_SIZE = 1024
+
+
+def model_dir(name=DEFAULT_MODEL_NAME, directory=None):
+    return os.path.join(directory or artifact_dir(), 'models', name)
+
+
+def model_versions(name=DEFAULT_MODEL_NAME, directory=None):
+    path = model_dir(name, directory)
+    if not os.path.isdir(path):
+        return []
+    return sorted(int(entry[1:]) for entry in os.listdir(path) if entry[0] == 'v' and entry[1:].isdigit())
+
+
+# Split the feature columns into numeric columns and one-hot groups
+def feature_schema(columns):
+    one_hot = {group: [] for group in CATEGORICAL_COLUMNS}
+    numeric = []
+    for column in columns:
+        group = column.split('_', 1)[0]
+        if '_' in column and group in one_hot:
+            one_hot[group].append(column)
+        else:
+            numeric.append(column)
+    return {'columns': list(columns), 'numeric': numeric,
+            'one_hot': {group: names for group, names in one_hot.items() if names}}
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+# Save a fitted scaler and estimator as the next version of a model
+# `search` is a SearchResult (or GridSearchCV) whose best_estimator_ is saved, and
+# `encoder` the LaunchEncoder that built the features, saved with its vocabulary
+# Returns the directory of the new version
+def save_model(search, scaler, feature_columns, name=DEFAULT_MODEL_NAME, directory=None, encoder=None,
+               **metadata):
+    versions = model_versions(name, directory)
+    version = (versions[-1] if versions else 0) + 1
+    path = os.path.join(model_dir(name, directory), f"v{version:04d}")
+    estimator = search.best_estimator_
+
+    manifest = {'name': name,
+                'version': version,
+                'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                'estimator': type(estimator).__name__,
+                'params': {key: _plain(value) for key, value in search.best_params_.items()},
+                'cv_score': float(search.best_score_),
+                'classes': [_plain(c) for c in estimator.classes_],
+                'features': feature_schema(feature_columns),
+                'sklearn_version': sklearn.__version__}
+    if encoder is not None:
+        manifest['encoder'] = encoder.to_dict()
+    manifest.update({key: _plain(value) for key, value in metadata.items()})
+
+    # Written next to the final directory and renamed, so readers never see a partial version
+    tmp_path = path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    joblib.dump({'scaler': scaler, 'estimator': estimator}, os.path.join(tmp_path, 'model.joblib'))
+    with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.rename(tmp_path, path)
+    return path
+
+
+class LandingModel:
+
+    def __init__(self, scaler, estimator, manifest):
+        self.scaler = scaler
+        self.estimator = estimator
+        self.manifest = manifest
+        self.columns = manifest['features']['columns']
+        self.numeric_columns = manifest['features']['numeric']
+        # Models saved before the encoder was stored get one rebuilt from their feature columns
+        self.encoder = LaunchEncoder.from_dict(manifest['encoder']) if 'encoder' in manifest \
+            else LaunchEncoder.from_feature_names(self.columns)
+        self.has_proba = hasattr(estimator, 'predict_proba')
+        # Column of predict_proba holding the probability of landing (Class 1)
+        self.landed_index = manifest['classes'].index(1) if 1 in manifest['classes'] else -1
+
+    # The feature matrix in training column order
+    # `frame` has the dataset_part_3 columns, or is the sparse matrix encode() returns
+    def features(self, frame):
+        if sparse.issparse(frame):
+            # Models trained on the dense dataset_part_3 have a centering scaler fitted on a DataFrame
+            if getattr(self.scaler, 'with_mean', False):
+                frame = pd.DataFrame(frame.toarray(), columns=self.columns)
+            return self.scaler.transform(frame)
+        missing = [column for column in self.numeric_columns if column not in frame.columns]
+        if missing:
+            raise ValueError(f"Missing feature columns {missing}")
+        unknown = [column for column in frame.columns if column not in self.columns]
+        if unknown:
+            raise ValueError(f"Columns the model was not trained on: {unknown}")
+        frame = frame.reindex(columns=self.columns, fill_value=0).astype('float64')
+        return self.scaler.transform(frame if hasattr(self.scaler, 'feature_names_in_') else frame.to_numpy())
+
+    # One-hot encode raw launch descriptors (the dataset_part_2 columns) like eda_visualization.py
+    # A category the model has not seen goes to its unknown bucket, or leaves its group at 0
+    # Returns a sparse matrix in training column order, which features() and score_frame() accept
+    def encode(self, raw):
+        return self.encoder.transform(raw)
+
+    def predict(self, frame):
+        return self.estimator.predict(self.features(frame))
+
+    # Probability of landing for every row
+    def predict_proba(self, frame):
+        if not self.has_proba:
+            raise AttributeError(f"{self.manifest['estimator']} does not predict probabilities")
+        return self.estimator.predict_proba(self.features(frame))[:, self.landed_index]
+
+    # Class and, when available, landing probability of every row
+    def score_frame(self, frame):
+        features = self.features(frame)
+        index = pd.RangeIndex(frame.shape[0]) if sparse.issparse(frame) else frame.index
+        scored = pd.DataFrame({'Class': self.estimator.predict(features)}, index=index)
+        if self.has_proba:
+            scored['LandingProbability'] = self.estimator.predict_proba(features)[:, self.landed_index]
+        return scored
+
+
+# Load a model version (the latest by default)
+def load_model(name=DEFAULT_MODEL_NAME, version=None, directory=None):
+    versions = model_versions(name, directory)
+    if not versions:
+        raise FileNotFoundError(f"No saved model named {name!r} in {model_dir(name, directory)}")
+    version = versions[-1] if version is None else version
+    path = os.path.join(model_dir(name, directory), f"v{version:04d}")
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    fitted = joblib.load(os.path.join(path, 'model.joblib'))
+    return LandingModel(fitted['scaler'], fitted['estimator'], manifest)
+
+
+# Score a stream of JSON lines in batches; yields one output line per input line
+def score_json_lines(model, lines, batch_size=DEFAULT_BATCH_SIZE):
+    batch = []
+    for line in lines:
+        if line.strip():
+            batch.append(json.loads(line))
+        if len(batch) == batch_size:
+            yield from _score_records(model, batch)
+            batch = []
+    if batch:
+        yield from _score_records(model, batch)
+
+
+def _score_records(model, records):
+    scored = model.score_frame(pd.DataFrame.from_records(records))
+    for record, prediction in zip(records, scored.to_dict('records')):
+        record.update({key: _plain(value) for key, value in prediction.items()})
+        yield json.dumps(record)
+
+
+def read_table(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    if path.endswith(('.arrow', '.feather')):
+        return pd.read_feather(path)
+    return pd.read_csv(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predict landing success with a saved model")
+    parser.add_argument('input', help="CSV, Parquet or Arrow file with dataset_part_3 columns, "
+                                      "or a JSON lines file ('-' for stdin)")
+    parser.add_argument('--output', help="output file (default: stdout)")
+    parser.add_argument('--name', default=DEFAULT_MODEL_NAME)
+    parser.add_argument('--version', type=int, default=None, help="model version (default: latest)")
+    parser.add_argument('--model-root', default=None, help="directory holding models/ (default: artifact directory)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    model = load_model(args.name, args.version, args.model_root)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        if args.input == '-' or args.input.endswith(('.jsonl', '.json')):
+            lines = sys.stdin if args.input == '-' else open(args.input)
+            try:
+                for line in score_json_lines(model, lines, args.batch_size):
+                    output.write(line + '\n')
+            finally:
+                if lines is not sys.stdin:
+                    lines.close()
+        else:
+            frame = read_table(args.input)
+            pd.concat([frame, model.score_frame(frame)], axis=1).to_csv(output, index=False)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+# Precomputed launch aggregates for the dashboard callbacks.
+#
+# spacex-dash-app.py answers every dropdown and slider event from a LaunchCube
+# instead of filtering and grouping the whole launch table:
+#
+#   success_counts          successful launches per site (the "ALL" pie)
+#   class_histogram(site)   launches per class at one site (the site pie)
+#   payload_frame(site, low, high)
+#                           launches of a site (or "ALL") with a payload mass in
+#                           [low, high] (the scatter), found by binary search in a
+#                           payload-sorted index of the site
+#
+#   site_counts             launches per site (the site dropdown)
+#   payload_quantiles       payload mass quantiles (the payload slider marks)
+#
+# The pies are dictionary lookups and a payload range costs O(log n) plus the
+# rows it returns. WatchedCube rebuilds the cube when the CSV file changes, so a
+# running dashboard picks up a refreshed dataset on the next event.
+#
+# read_shared() loads the CSV through an uncompressed Arrow copy that is memory-
+# mapped, not parsed: the columns stay backed by the mapped file, so the worker
+# processes of a WSGI server share one copy of the data through the page cache.
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+ALL_SITES = 'ALL'
+SITE_COLUMN = 'Launch Site'
+CLASS_COLUMN = 'class'
+PAYLOAD_COLUMN = 'Payload Mass (kg)'
+QUANTILES = (0.0, 0.25, 0.5, 0.75, 1.0)
+# Arrow copies of the CSV files (SPACEX_DASH_CACHE_DIR)
+DEFAULT_CACHE_DIR = '.dash_cache'
+
+
+class LaunchCube:
+
+    def __init__(self, df, version=None):
+        self.df = df.reset_index(drop=True)
+        # Identifies the data the cube was built from (see WatchedCube)
+        self.version = version
+        self.sites = sorted(self.df[SITE_COLUMN].unique())
+        self.site_counts = self.df[SITE_COLUMN].value_counts().reindex(self.sites)
+        self.success_counts = self.df.groupby(SITE_COLUMN)[CLASS_COLUMN].sum()
+        self.class_histograms = {site: counts.droplevel(0) for site, counts
+                                 in self.df.groupby([SITE_COLUMN, CLASS_COLUMN]).size().groupby(level=0)}
+
+        payload = self.df[PAYLOAD_COLUMN].to_numpy(dtype='float64')
+        order = np.argsort(payload, kind='stable')
+        codes = pd.Categorical(self.df[SITE_COLUMN], categories=self.sites).codes[order]
+        # site -> (sorted payload masses, row positions in that order)
+        self.payload_index = {ALL_SITES: (payload[order], order)}
+        for code, site in enumerate(self.sites):
+            rows = order[codes == code]
+            self.payload_index[site] = (payload[rows], rows)
+        self.min_payload = payload[order[0]] if len(order) else 0.0
+        self.max_payload = payload[order[-1]] if len(order) else 0.0
+        # Payload mass at each quantile of QUANTILES, from the sorted index
+        self.payload_quantiles = dict(zip(QUANTILES, np.quantile(payload[order], QUANTILES) if len(order)
+                                          else np.zeros(len(QUANTILES))))
+
+    # Launches per class at a site; empty for an unknown site
+    def class_histogram(self, site):
+        return self.class_histograms.get(site, pd.Series(dtype='int64'))
+
+    # Row positions of the launches of `site` with low <= payload <= high, in table order
+    def payload_rows(self, site, low, high):
+        payloads, rows = self.payload_index.get(site, (np.empty(0), np.empty(0, dtype='int64')))
+        start = np.searchsorted(payloads, low, side='left')
+        stop = np.searchsorted(payloads, high, side='right')
+        return np.sort(rows[start:stop])
+
+    def payload_frame(self, site, low, high):
+        return self.df.iloc[self.payload_rows(site, low, high)]
+
+
+def _file_version(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+# Read a CSV file as a DataFrame backed by a memory-mapped Arrow copy of it
+# The copy is (re)written when it is missing or was made from another version of the CSV
+def read_shared(path, cache_dir=None):
+    if pa is None:
+        return pd.read_csv(path)
+    cache_dir = cache_dir or os.environ.get('SPACEX_DASH_CACHE_DIR', DEFAULT_CACHE_DIR)
+    arrow_path = os.path.join(cache_dir, os.path.splitext(os.path.basename(path))[0] + '.arrow')
+    source = str(_file_version(path)).encode()
+    try:
+        with pa.memory_map(arrow_path) as source_file:
+            fresh = pa.ipc.open_file(source_file).schema.metadata.get(b'source') == source
+    except (OSError, pa.ArrowInvalid, AttributeError):
+        fresh = False
+    if not fresh:
+        table = pa.Table.from_pandas(pd.read_csv(path), preserve_index=False)
+        table = table.replace_schema_metadata(dict(table.schema.metadata or {}, source=source))
+        os.makedirs(cache_dir, exist_ok=True)
+        # Every process writes its own temporary file; the rename is atomic
+        tmp_path = f"{arrow_path}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, arrow_path)
+    table = pa.ipc.open_file(pa.memory_map(arrow_path)).read_all()
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+# A LaunchCube of a CSV file, rebuilt when the file is modified
+class WatchedCube:
+
+    def __init__(self, path, read=pd.read_csv):
+        self.path = path
+        self.read = read
+        self.lock = threading.Lock()
+        self.cube = None
+
+    # The cube of the current file contents; one stat() call when nothing changed
+    def get(self):
+        version = _file_version(self.path)
+        if self.cube is None or self.cube.version != version:
+            with self.lock:
+                if self.cube is None or self.cube.version != version:
+                    self.cube = LaunchCube(self.read(self.path), version)
+        return self.cube
@@ -0,0 +1,156 @@
+# Fitted one-hot encoding of the launch features.
+#
+# Replaces pd.get_dummies in the feature engineering. The categories of every
+# categorical column are learned once (fit) and saved with the dataset, so the
+# feature columns stay the same when new data arrives: a value the encoder has
+# not seen - a new core serial, say - goes to the `<column>_unknown` bucket
+# instead of adding a column. Missing values leave all columns of the group at 0,
+# as with get_dummies. With the bucket left out, the columns are exactly the
+# ones get_dummies produces on the training data, in the same order.
+#
+# transform() returns a scipy CSR matrix, so the one-hot block costs one entry
+# per row and column group instead of a dense float64 row; the scaler and the
+# models are trained and scored on it. transform_frame() is the dense view that
+# dataset_part_3 is written from. Input can be given in chunks: fit() and
+# transform_chunks() accept any iterable of DataFrames, such as
+# pd.read_csv(..., chunksize=...), so only one chunk is encoded at a time.
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from artifacts import artifact_dir
+
+NUMERIC_COLUMNS = ['FlightNumber', 'PayloadMass', 'Flights', 'GridFins', 'Reused', 'Legs', 'Block', 'ReusedCount']
+CATEGORICAL_COLUMNS = ['Orbit', 'LaunchSite', 'LandingPad', 'Serial']
+
+UNKNOWN_CATEGORY = 'unknown'
+DEFAULT_ENCODER_FILE = 'launch_encoder.json'
+
+
+def _chunks(data):
+    return [data] if isinstance(data, pd.DataFrame) else data
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class LaunchEncoder:
+
+    # Categories seen fewer than `min_frequency` times during fit also go to the unknown bucket
+    def __init__(self, numeric=NUMERIC_COLUMNS, categorical=CATEGORICAL_COLUMNS, unknown_bucket=True,
+                 min_frequency=1):
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self.unknown_bucket = unknown_bucket
+        self.min_frequency = min_frequency
+        self.counts = {column: pd.Series(dtype='int64') for column in self.categorical}
+        self.categories = None
+
+    # Count the categories of one more chunk; call fit() without data to freeze the vocabulary
+    def partial_fit(self, chunk):
+        for column in self.categorical:
+            self.counts[column] = self.counts[column].add(chunk[column].value_counts(), fill_value=0)
+        return self
+
+    # Learn the vocabulary from a DataFrame or an iterable of DataFrame chunks
+    def fit(self, data=()):
+        for chunk in _chunks(data):
+            self.partial_fit(chunk)
+        # Sorted like the categories of get_dummies
+        self.categories = {column: sorted(_plain(value) for value, count in counts.items()
+                                          if count >= self.min_frequency)
+                           for column, counts in self.counts.items()}
+        return self
+
+    def feature_names(self):
+        names = list(self.numeric)
+        for column, categories in self.categories.items():
+            names += [f"{column}_{category}" for category in categories]
+            if self.unknown_bucket:
+                names.append(f"{column}_{UNKNOWN_CATEGORY}")
+        return names
+
+    # The unknown buckets among feature_names()
+    def unknown_names(self):
+        return [f"{column}_{UNKNOWN_CATEGORY}" for column in self.categories] if self.unknown_bucket else []
+
+    # CSR matrix with one row per launch and the columns of feature_names()
+    def transform(self, df):
+        if self.categories is None:
+            raise ValueError("LaunchEncoder is not fitted")
+        missing = [column for column in self.numeric if column not in df.columns]
+        if missing:
+            raise ValueError(f"Missing launch fields {missing}")
+        # Every row has one entry per numeric column and at most one per categorical column,
+        # so the CSR arrays are built directly from an (n_rows, n_entries) layout
+        columns = [np.broadcast_to(np.arange(len(self.numeric)), (len(df), len(self.numeric)))]
+        data = [df[self.numeric].astype('float64').to_numpy()]
+        offset = len(self.numeric)
+        for column, categories in self.categories.items():
+            values = df[column] if column in df.columns else pd.Series(np.nan, index=df.index)
+            # -1 for missing values and categories not in the vocabulary
+            codes = pd.Index(categories).get_indexer(values).astype('int64')
+            if self.unknown_bucket:
+                codes = np.where((codes < 0) & values.notna().to_numpy(), len(categories), codes)
+            columns.append(np.where(codes >= 0, codes + offset, -1)[:, None])
+            data.append(np.ones((len(df), 1)))
+            offset += len(categories) + self.unknown_bucket
+        columns = np.hstack(columns)
+        data = np.hstack(data)
+        # Zeros and missing categories are not stored
+        keep = (columns >= 0) & (data != 0)
+        indptr = np.concatenate([[0], np.cumsum(keep.sum(axis=1))])
+        return sparse.csr_matrix((data[keep], columns[keep], indptr), shape=(len(df), offset))
+
+    # Dense float64 DataFrame, the layout of dataset_part_3
+    def transform_frame(self, df):
+        return pd.DataFrame(self.transform(df).toarray(), columns=self.feature_names(), index=df.index)
+
+    # One CSR matrix per chunk; sparse.vstack() joins them
+    def transform_chunks(self, chunks):
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+    def to_dict(self):
+        return {'numeric': self.numeric, 'categories': self.categories,
+                'unknown_bucket': self.unknown_bucket, 'min_frequency': self.min_frequency}
+
+    @classmethod
+    def from_dict(cls, state):
+        encoder = cls(state['numeric'], list(state['categories']), state['unknown_bucket'], state['min_frequency'])
+        encoder.categories = {column: list(categories) for column, categories in state['categories'].items()}
+        return encoder
+
+    # Rebuild an encoder from feature column names like "Orbit_GTO"
+    @classmethod
+    def from_feature_names(cls, names, categorical=CATEGORICAL_COLUMNS):
+        categories = {column: [] for column in categorical}
+        numeric = []
+        for name in names:
+            column, _, category = name.partition('_')
+            if category and column in categories:
+                categories[column].append(category)
+            else:
+                numeric.append(name)
+        categories = {column: values for column, values in categories.items() if values}
+        unknown_bucket = bool(categories) and all(values[-1] == UNKNOWN_CATEGORY for values in categories.values())
+        if unknown_bucket:
+            categories = {column: values[:-1] for column, values in categories.items()}
+        return cls.from_dict({'numeric': numeric, 'categories': categories,
+                              'unknown_bucket': unknown_bucket, 'min_frequency': 1})
+
+    def save(self, path=None):
+        path = path or os.path.join(artifact_dir(), DEFAULT_ENCODER_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        with open(path or os.path.join(artifact_dir(), DEFAULT_ENCODER_FILE)) as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,454 @@
+# Launch outcome layers for folium maps that stay small as the launch history grows.
+#
+# interactive.py used to add one folium.Marker per launch, each with its own
+# inlined JavaScript, so the HTML grew by about a kilobyte per launch. The
+# builders here take the launch table as column arrays instead:
+#
+#   site_outcome_layer     one circle per site with its launch and success counts,
+#                          aggregated on the server; size independent of the launches
+#   outcome_cluster_layer  a FastMarkerCluster fed by one JSON array of
+#                          [lat, lon, site, class] rows; markers are made in the browser
+#   outcome_geojson        the launches as a single GeoJSON FeatureCollection
+#   write_tiles            static z/x/y.geojson tiles of per-zoom aggregates, with
+#                          TiledGeoJSON to load only the tiles in view; the HTML has
+#                          no launch data at all
+#
+# On top of these, site_layer, outcome_layer and proximity_layer are cached layer
+# builders that compose_map() and launch_maps() assemble into maps (see Layer
+# builders below).
+#
+# Tiles aggregate the launches of each zoom level on a grid of CELLS_PER_TILE x
+# CELLS_PER_TILE cells per web-mercator tile: every cell with launches becomes one
+# point with its launch and success counts. Browsers will not fetch tiles from
+# file:// pages, so serve the map directory over HTTP (python -m http.server).
+#
+# Usage:
+#   python map_layers.py spacex_launch_geo.csv --mode sites --output launch_map.html
+#   python map_layers.py spacex_launch_geo.csv --mode tiles --output maps/launch_map.html --zooms 0 12
+#   python map_layers.py spacex_launch_geo.csv --by year --points proximity_points.csv --output maps/
+
+import os
+import json
+import shutil
+import argparse
+import numpy as np
+import pandas as pd
+import hashlib
+import functools
+from collections import OrderedDict
+import folium
+from folium.plugins import FastMarkerCluster, MousePosition
+from folium.features import DivIcon
+from jinja2 import Template
+from branca.element import MacroElement
+from proximity import layers_from_frame, nearest_features
+
+SITE_COLUMN = 'Launch Site'
+LAT_COLUMN = 'Lat'
+LON_COLUMN = 'Long'
+CLASS_COLUMN = 'Class'
+
+CELLS_PER_TILE = 8
+DEFAULT_ZOOMS = (0, 12)
+TILES_DIR = 'tiles'
+MODES = ['sites', 'cluster', 'geojson', 'tiles']
+
+
+# The launch columns, with the lowercase 'class' of some CSVs renamed
+def _launches(df):
+    if CLASS_COLUMN not in df.columns and 'class' in df.columns:
+        df = df.rename(columns={'class': CLASS_COLUMN})
+    return df[[SITE_COLUMN, LAT_COLUMN, LON_COLUMN, CLASS_COLUMN]]
+
+
+def _outcome_color(success_rate):
+    return np.where(np.asarray(success_rate) >= 0.5, 'green', 'red')
+
+
+# Launches, successes and success rate per site
+def site_outcomes(df):
+    df = _launches(df)
+    sites = df.groupby(SITE_COLUMN, as_index=False).agg(lat=(LAT_COLUMN, 'first'), lon=(LON_COLUMN, 'first'),
+                                                        launches=(CLASS_COLUMN, 'size'),
+                                                        successes=(CLASS_COLUMN, 'sum'))
+    sites['success_rate'] = sites['successes'] / sites['launches']
+    return sites
+
+
+# `df` holds launches, or the per-site rows of site_outcomes() with aggregated=True
+def site_outcome_layer(df, name='Launch outcomes', aggregated=False):
+    sites = df if aggregated else site_outcomes(df)
+    layer = folium.FeatureGroup(name=name)
+    for site, lat, lon, launches, successes, color in zip(sites[SITE_COLUMN], sites['lat'], sites['lon'],
+                                                          sites['launches'], sites['successes'],
+                                                          _outcome_color(sites['success_rate'])):
+        folium.CircleMarker(location=[lat, lon], radius=float(6 + 2 * np.sqrt(launches)), color=color,
+                            fill=True, fill_opacity=0.6,
+                            popup=f"{site}: {successes} of {launches} launches successful").add_to(layer)
+    return layer
+
+
+# Builds each marker in the browser from a [lat, lon, site, class] row
+CLUSTER_CALLBACK = """
+function (row) {
+    var icon = L.AwesomeMarkers.icon({markerColor: row[3] == 1 ? 'green' : 'red', icon: 'info-sign',
+                                      prefix: 'glyphicon'});
+    return L.marker(new L.LatLng(row[0], row[1]), {icon: icon})
+        .bindPopup(row[2] + ' - ' + (row[3] == 1 ? 'Success' : 'Failure'));
+}
+"""
+
+
+def _cluster_rows(df):
+    return list(zip(df[LAT_COLUMN].round(6).tolist(), df[LON_COLUMN].round(6).tolist(),
+                    df[SITE_COLUMN].tolist(), df[CLASS_COLUMN].astype(int).tolist()))
+
+
+def outcome_cluster_layer(df, name='Launches'):
+    return FastMarkerCluster(_cluster_rows(_launches(df)), callback=CLUSTER_CALLBACK, name=name)
+
+
+# FeatureCollection of points with `properties` columns; GeoJSON positions are [lon, lat]
+def _feature_collection(lat, lon, properties):
+    columns = list(properties)
+    values = zip(*(properties[column].tolist() for column in columns))
+    return {'type': 'FeatureCollection',
+            'features': [{'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [x, y]},
+                          'properties': dict(zip(columns, row))}
+                         for x, y, row in zip(np.round(lon, 6).tolist(), np.round(lat, 6).tolist(), values)]}
+
+
+def outcome_geojson(df):
+    df = _launches(df)
+    return _feature_collection(df[LAT_COLUMN].to_numpy(), df[LON_COLUMN].to_numpy(),
+                               {'site': df[SITE_COLUMN], 'class': df[CLASS_COLUMN].astype(int)})
+
+
+# Tiles
+
+# Web-mercator tile coordinates (fractional) of points at a zoom level
+def tile_coordinates(lat, lon, zoom):
+    lat = np.radians(np.clip(np.asarray(lat, dtype='float64'), -85.05112878, 85.05112878))
+    n = 2.0 ** zoom
+    x = (np.asarray(lon, dtype='float64') + 180.0) / 360.0 * n
+    y = (1.0 - np.log(np.tan(lat) + 1 / np.cos(lat)) / np.pi) / 2.0 * n
+    return np.clip(x, 0, n - 1e-9), np.clip(y, 0, n - 1e-9)
+
+
+# Launches aggregated on a grid of `cells` x `cells` cells per tile at a zoom level:
+# one row per cell with launches, with its tile, mean position and counts
+def zoom_aggregates(df, zoom, cells=CELLS_PER_TILE):
+    df = _launches(df)
+    x, y = tile_coordinates(df[LAT_COLUMN], df[LON_COLUMN], zoom)
+    grid = pd.DataFrame({'x': x.astype('int64'), 'y': y.astype('int64'),
+                         'cx': (x * cells).astype('int64'), 'cy': (y * cells).astype('int64'),
+                         'lat': df[LAT_COLUMN].to_numpy(), 'lon': df[LON_COLUMN].to_numpy(),
+                         'class': df[CLASS_COLUMN].to_numpy(), 'site': df[SITE_COLUMN].to_numpy()})
+    cells = grid.groupby(['x', 'y', 'cx', 'cy'], sort=False).agg(lat=('lat', 'mean'), lon=('lon', 'mean'),
+                                                                 launches=('class', 'size'),
+                                                                 successes=('class', 'sum'),
+                                                                 sites=('site', 'nunique'),
+                                                                 site=('site', 'first'))
+    return cells.reset_index()
+
+
+# Write z/x/y.geojson tiles for every zoom level in [min_zoom, max_zoom]; returns the number of tiles
+def write_tiles(df, directory, zooms=DEFAULT_ZOOMS):
+    written = 0
+    for zoom in range(zooms[0], zooms[1] + 1):
+        # Tiles of an earlier run may cover places without launches now
+        shutil.rmtree(os.path.join(directory, str(zoom)), ignore_errors=True)
+        cells = zoom_aggregates(df, zoom)
+        # A cell spanning several sites is labelled by its launch count only
+        cells['site'] = cells['site'].where(cells['sites'] == 1, '')
+        for (x, y), tile in cells.groupby(['x', 'y'], sort=False):
+            path = os.path.join(directory, str(zoom), str(x), f"{y}.geojson")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            collection = _feature_collection(tile['lat'].to_numpy(), tile['lon'].to_numpy(),
+                                             tile[['site', 'launches', 'successes']])
+            with open(path, 'w') as f:
+                json.dump(collection, f, separators=(',', ':'))
+            written += 1
+    return written
+
+
+# Leaflet layer that loads the GeoJSON tile of every visible z/x/y and draws its aggregates
+# A missing tile (no launches there) is skipped
+class TiledGeoJSON(MacroElement):
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function () {
+                var features = {};
+                var url = {{ this.url|tojson }};
+                var key = function (coords) { return coords.z + '/' + coords.x + '/' + coords.y; };
+                var TileLayer = L.GridLayer.extend({
+                    createTile: function (coords, done) {
+                        var tile = document.createElement('div');
+                        var self = this;
+                        fetch(url.replace('{z}', coords.z).replace('{x}', coords.x).replace('{y}', coords.y))
+                            .then(function (response) { return response.ok ? response.json() : null; })
+                            .then(function (data) {
+                                // Skip tiles scrolled out of view while they were loading
+                                if (data && self._map && self._tiles[self._tileCoordsToKey(coords)]) {
+                                    features[key(coords)] = L.geoJSON(data, {
+                                        pointToLayer: function (feature, latlng) {
+                                            var p = feature.properties;
+                                            return L.circleMarker(latlng, {
+                                                radius: 6 + 2 * Math.sqrt(p.launches), fillOpacity: 0.6,
+                                                color: p.successes >= p.launches / 2 ? 'green' : 'red'
+                                            }).bindPopup((p.site ? p.site + ': ' : '') + p.successes + ' of ' +
+                                                         p.launches + ' launches successful');
+                                        }
+                                    }).addTo(self._map);
+                                }
+                                done(null, tile);
+                            })
+                            .catch(function () { done(null, tile); });
+                        return tile;
+                    }
+                });
+                var layer = new TileLayer({minZoom: {{ this.min_zoom }}, maxZoom: {{ this.max_zoom }},
+                                           maxNativeZoom: {{ this.max_zoom }}});
+                layer.on('tileunload', function (e) {
+                    var tile = features[key(e.coords)];
+                    if (tile) {
+                        tile.remove();
+                        delete features[key(e.coords)];
+                    }
+                });
+                layer.addTo({{ this._parent.get_name() }});
+                return layer;
+            })();
+        {% endmacro %}
+        """)
+
+    def __init__(self, url, min_zoom=DEFAULT_ZOOMS[0], max_zoom=DEFAULT_ZOOMS[1]):
+        super().__init__()
+        self._name = 'TiledGeoJSON'
+        self.url = url
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+
+
+# Layer builders
+#
+# site_layer, outcome_layer and proximity_layer return a Layer: the data of the
+# layer, computed from the DataFrame columns in one pass, and a function that
+# turns it into a folium element. A folium element belongs to a single map, so
+# every map gets fresh elements from Layer.element(), while the data is cached
+# by a hash of the builder's inputs: building the maps of a report per site or
+# per year reuses every layer whose input did not change.
+
+# Cached layers, least recently used first
+LAYER_CACHE = OrderedDict()
+LAYER_CACHE_SIZE = 256
+
+# Line and label styles of the proximity layers, by feature kind
+PROXIMITY_STYLES = {
+    'coastline': {'color': 'blue', 'weight': 2.5, 'opacity': 1, 'label_color': '#d35400', 'font_size': 12,
+                  'label': '', 'format': '{:10.2f} KM'},
+    'city': {'color': 'green', 'weight': 2, 'opacity': 0.8, 'label_color': '#27ae60', 'font_size': 11,
+             'label': 'City: ', 'format': '{:.2f} KM'},
+    'railway': {'color': 'purple', 'weight': 2, 'opacity': 0.8, 'label_color': '#8e44ad', 'font_size': 11,
+                'label': 'Railway: ', 'format': '{:.2f} KM'},
+    'highway': {'color': 'orange', 'weight': 2, 'opacity': 0.8, 'label_color': '#e67e22', 'font_size': 11,
+                'label': 'Highway: ', 'format': '{:.2f} KM'},
+}
+DEFAULT_PROXIMITY_STYLE = {'color': 'gray', 'weight': 2, 'opacity': 0.8, 'label_color': '#7f8c8d', 'font_size': 11,
+                           'label': '', 'format': '{:.2f} KM'}
+
+
+class Layer:
+
+    def __init__(self, name, render, data=None):
+        self.name = name
+        self.render = render
+        # What the layer shows, for reporting (e.g. the distances of a proximity layer)
+        self.data = data
+
+    # A new folium element showing the layer
+    def element(self):
+        return self.render()
+
+
+# Content hash of a DataFrame's columns and values (not its index)
+def frame_hash(df):
+    digest = hashlib.sha1(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _cache_key(value):
+    if isinstance(value, pd.DataFrame):
+        return 'frame', frame_hash(value)
+    return repr(value)
+
+
+# Cache the Layer a builder returns, keyed by the builder and its arguments
+def cached_layer(builder):
+
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        key = (builder.__name__, tuple(_cache_key(value) for value in args),
+               tuple(sorted((name, _cache_key(value)) for name, value in kwargs.items())))
+        layer = LAYER_CACHE.get(key)
+        if layer is None:
+            layer = LAYER_CACHE[key] = builder(*args, **kwargs)
+            while len(LAYER_CACHE) > LAYER_CACHE_SIZE:
+                LAYER_CACHE.popitem(last=False)
+        else:
+            LAYER_CACHE.move_to_end(key)
+        return layer
+
+    return wrapper
+
+
+def _label_icon(text, color, font_size=12):
+    return DivIcon(icon_size=(20, 20), icon_anchor=(0, 0),
+                   html=f'<div style="font-size: {font_size}px; color:{color};"><b>{text}</b></div>')
+
+
+# A circle and a name label at every site (rows with Launch Site, Lat and Long)
+@cached_layer
+def site_layer(df, color='#000000', label_color='#d35400', radius=1000, name='Launch sites'):
+    sites = df.groupby(SITE_COLUMN, as_index=False, sort=False)[[LAT_COLUMN, LON_COLUMN]].first()
+    rows = list(zip(sites[SITE_COLUMN].tolist(), sites[LAT_COLUMN].tolist(), sites[LON_COLUMN].tolist()))
+
+    def render():
+        group = folium.FeatureGroup(name=name)
+        for site, lat, lon in rows:
+            folium.Circle(location=[lat, lon], radius=radius, color=color, fill=True) \
+                .add_child(folium.Popup(site)).add_to(group)
+            folium.Marker(location=[lat, lon], icon=_label_icon(site, label_color)).add_to(group)
+        return group
+
+    return Layer(name, render, sites)
+
+
+# Launch outcomes in one of MODES
+# In 'tiles' mode the tiles are written to tiles_dir and loaded from tiles_url
+@cached_layer
+def outcome_layer(df, mode='cluster', tiles_dir=TILES_DIR, tiles_url=None, zooms=DEFAULT_ZOOMS,
+                  name='Launch outcomes'):
+    df = _launches(df)
+    if mode == 'sites':
+        sites = site_outcomes(df)
+        return Layer(name, lambda: site_outcome_layer(sites, name=name, aggregated=True), sites)
+    if mode == 'cluster':
+        rows = _cluster_rows(df)
+        return Layer(name, lambda: FastMarkerCluster(rows, callback=CLUSTER_CALLBACK, name=name))
+    if mode == 'geojson':
+        collection = outcome_geojson(df)
+        return Layer(name, lambda: folium.GeoJson(collection, name=name,
+                                                  popup=folium.GeoJsonPopup(fields=['site', 'class'])))
+    if mode == 'tiles':
+        write_tiles(df, tiles_dir, zooms)
+        url = tiles_url or TILES_DIR + '/{z}/{x}/{y}.geojson'
+        return Layer(name, lambda: TiledGeoJSON(url, *zooms))
+    raise ValueError(f"Unknown map mode {mode!r}, expected one of {MODES}")
+
+
+# A line from every site to its nearest feature of one kind, labelled with the distance
+# `points` holds the features (kind, name, lat, lon), as read by proximity.load_layers
+@cached_layer
+def proximity_layer(sites, points, kind, name=None):
+    name = name or f"Nearest {kind}"
+    style = PROXIMITY_STYLES.get(kind, DEFAULT_PROXIMITY_STYLE)
+    sites = sites.drop_duplicates(SITE_COLUMN)
+    nearest = nearest_features(sites, layers_from_frame(points[points['kind'] == kind]))
+    rows = list(zip(nearest['site_lat'].tolist(), nearest['site_lon'].tolist(), nearest['lat'].tolist(),
+                    nearest['lon'].tolist(), nearest['distance_km'].tolist()))
+
+    def render():
+        group = folium.FeatureGroup(name=name)
+        for site_lat, site_lon, lat, lon, distance in rows:
+            folium.PolyLine(locations=[[site_lat, site_lon], [lat, lon]], color=style['color'],
+                            weight=style['weight'], opacity=style['opacity']).add_to(group)
+            label = style['label'] + style['format'].format(distance)
+            folium.Marker([lat, lon], icon=_label_icon(label, style['label_color'], style['font_size'])).add_to(group)
+        return group
+
+    return Layer(name, render, nearest)
+
+
+# A map showing `layers`, with the mouse position in the top right corner
+def compose_map(layers, location, zoom_start=5, mouse_position=True):
+    site_map = folium.Map(location=location, zoom_start=zoom_start)
+    for layer in layers:
+        site_map.add_child(layer.element())
+    if mouse_position:
+        formatter = "function(num) {return L.Util.formatNum(num, 5);};"
+        MousePosition(position='topright', separator=' Long: ', empty_string='NaN', lng_first=False,
+                      num_digits=20, prefix='Lat:', lat_formatter=formatter, lng_formatter=formatter).add_to(site_map)
+    return site_map
+
+
+def _center(df):
+    return [float(df[LAT_COLUMN].mean()), float(df[LON_COLUMN].mean())]
+
+
+# A map of the launch outcomes in one of MODES
+def build_map(df, mode='sites', tiles_dir=TILES_DIR, tiles_url=None, zooms=DEFAULT_ZOOMS, location=None,
+              zoom_start=5):
+    df = _launches(df)
+    layer = outcome_layer(df, mode, tiles_dir, tiles_url, tuple(zooms))
+    return compose_map([layer], location or _center(df), zoom_start, mouse_position=False)
+
+
+# Launch maps (sites, outcomes and the nearest feature of every kind in `points`),
+# one per value of `by` - a column of df, or 'year' - or a single map for None
+# Layers whose input is the same for several maps (the sites, their proximity
+# lines) are built once
+# In 'tiles' mode the tiles of each map go to tiles_dir/<value>, next to the map files
+def launch_maps(df, points=None, by=None, mode='cluster', zoom_start=5, tiles_dir=TILES_DIR):
+    if by is None:
+        groups = [(None, df)]
+    elif by == 'year' and by not in df.columns:
+        groups = df.groupby(pd.to_datetime(df['Date']).dt.year)
+    else:
+        groups = df.groupby(by)
+    maps = {}
+    for key, group in groups:
+        sites = group[[SITE_COLUMN, LAT_COLUMN, LON_COLUMN]].drop_duplicates(SITE_COLUMN) \
+            .sort_values(SITE_COLUMN).reset_index(drop=True)
+        tiles = [] if key is None else [str(key)]
+        layers = [site_layer(sites), outcome_layer(group, mode, os.path.join(tiles_dir, *tiles),
+                                                   '/'.join([TILES_DIR] + tiles + ['{z}/{x}/{y}.geojson']))]
+        if points is not None:
+            layers += [proximity_layer(sites, points, kind) for kind in points['kind'].unique()]
+        maps[key] = compose_map(layers, _center(sites), zoom_start)
+    return maps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render launch outcomes on a map")
+    parser.add_argument('launches', help="CSV with Launch Site, Lat, Long and class columns")
+    parser.add_argument('--mode', default='sites', choices=MODES)
+    parser.add_argument('--output', default='launch_map.html')
+    parser.add_argument('--zooms', nargs=2, type=int, default=list(DEFAULT_ZOOMS), metavar=('MIN', 'MAX'),
+                        help="zoom levels of the tiles")
+    parser.add_argument('--by', help="one map per value of this column, or 'year'; --output is then a directory")
+    parser.add_argument('--points', help="CSV of nearby features (kind, name, lat, lon) to draw with --by")
+    args = parser.parse_args(argv)
+
+    if args.by:
+        points = pd.read_csv(args.points) if args.points else None
+        os.makedirs(args.output, exist_ok=True)
+        maps = launch_maps(pd.read_csv(args.launches), points, args.by, args.mode,
+                           tiles_dir=os.path.join(args.output, TILES_DIR))
+        for key, site_map in maps.items():
+            path = os.path.join(args.output, f"{key}.html")
+            site_map.save(path)
+            print(path)
+        return
+
+    # Tiles go next to the HTML file, which loads them by relative URL
+    tiles_dir = os.path.join(os.path.dirname(os.path.abspath(args.output)), TILES_DIR)
+    site_map = build_map(pd.read_csv(args.launches), args.mode, tiles_dir, zooms=tuple(args.zooms))
+    site_map.save(args.output)
+    print(args.output)
+
+
+if __name__ == '__main__':
+    main()
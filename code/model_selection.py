@@ -0,0 +1,417 @@
+# Cross-validated hyperparameter search for several models at once.
+#
+# Works like running one GridSearchCV per model, with three differences:
+#   - the candidates of all models go through one shared worker pool
+#   - duplicate parameter sets in a grid are evaluated once
+#   - the fold scores of every candidate are cached on disk, keyed by a hash
+#     of the training data, the estimator and the parameters. An interrupted
+#     search resumes where it stopped, and after a grid change only the new
+#     candidates are fitted.
+# Candidates are ranked the same way as GridSearchCV (mean fold score, first
+# best candidate in grid order wins), so the selected parameters are the same.
+#
+# Which candidates get evaluated, and on how many folds, is up to a search
+# strategy:
+#   grid      every candidate on every fold (the default, same as GridSearchCV)
+#   halving   successive halving with the CV folds as resource: all candidates
+#             are scored on a few folds, and only the best 1/factor of them
+#             move on to more folds, so hopeless candidates stop early
+#   random    candidates drawn at random until n_iter or a time budget is reached
+#   bayes     sequential model-based search (TPE) over the grid values, needs optuna
+# Strategies work in ask/tell rounds, so several models still share the pool.
+
+import os
+import copy
+import json
+import math
+import time
+import hashlib
+import warnings
+import numpy as np
+from scipy import sparse
+from dataclasses import dataclass
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.model_selection import ParameterGrid, check_cv
+
+try:
+    import optuna
+except ImportError:
+    optuna = None
+
+DEFAULT_CACHE_DIR = os.environ.get('SPACEX_MODEL_CACHE', '.model_cache')
+
+
+@dataclass
+class SearchSpec:
+    name: str
+    estimator: object
+    param_grid: dict
+
+
+# Plain Python value for numpy scalars, so parameters can be hashed and stored as JSON
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _canonical(params):
+    return json.dumps({key: _plain(value) for key, value in params.items()}, sort_keys=True, default=repr)
+
+
+# Parameter sets of a grid in GridSearchCV order, without duplicates
+def candidate_params(param_grid):
+    unique = {}
+    for params in ParameterGrid(param_grid):
+        unique.setdefault(_canonical(params), params)
+    return list(unique.values())
+
+
+def data_hash(X, y):
+    digest = hashlib.sha256()
+    arrays = [X]
+    if sparse.issparse(X):
+        # Hashed through its CSR arrays
+        digest.update(str(X.shape).encode())
+        arrays = [X.indptr, X.indices, X.data]
+    for array in [np.ascontiguousarray(array) for array in arrays + [y]]:
+        digest.update(str((array.shape, array.dtype)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+# Fold scores stored as one small JSON file per candidate, {fold index: score}
+class FoldCache:
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, context, estimator, params):
+        estimator_id = type(estimator).__name__ + _canonical(estimator.get_params(deep=False))
+        return hashlib.sha256((context + estimator_id + _canonical(params)).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as f:
+                return {int(fold): score for fold, score in json.load(f)['scores'].items()}
+        except FileNotFoundError:
+            return {}
+
+    def put(self, key, scores):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'scores': {str(fold): score for fold, score in sorted(scores.items())}}, f)
+        os.replace(tmp_path, path)
+
+
+# Fit and score one parameter set on the given folds; returns {fold index: score}
+# A failing fit scores NaN, like GridSearchCV's default error_score
+def evaluate_candidate(estimator, params, X, y, splits, folds):
+    scores = {}
+    for fold in folds:
+        train, test = splits[fold]
+        model = clone(estimator).set_params(**params)
+        try:
+            model.fit(X[train], y[train])
+            scores[fold] = float(model.score(X[test], y[test]))
+        except Exception as error:
+            warnings.warn(f"Fit failed for {type(estimator).__name__} {params}: {error}")
+            scores[fold] = float('nan')
+    return scores
+
+
+def _mean(scores, folds):
+    mean = np.mean([scores[fold] for fold in folds])
+    return -np.inf if np.isnan(mean) else mean
+
+
+# Search strategies
+#
+# start() receives the candidates and the number of folds, ask() returns the
+# next batch of (candidate index, fold indices) to score - an empty batch ends
+# the search - and tell() receives all known fold scores of a candidate after
+# each batch. finalists() lists the candidates fully evaluated for ranking.
+
+class GridStrategy:
+
+    def start(self, candidates, n_folds):
+        self.candidates = candidates
+        self.n_folds = n_folds
+        self.done = False
+
+    def ask(self):
+        if self.done:
+            return []
+        self.done = True
+        return [(index, range(self.n_folds)) for index in range(len(self.candidates))]
+
+    def tell(self, index, scores):
+        pass
+
+    def finalists(self):
+        return list(range(len(self.candidates)))
+
+
+class HalvingStrategy:
+
+    def __init__(self, factor=3, min_folds=2):
+        self.factor = factor
+        self.min_folds = min_folds
+
+    def start(self, candidates, n_folds):
+        self.n_folds = n_folds
+        self.folds = 0
+        self.survivors = list(range(len(candidates)))
+        self.scores = {}
+
+    def ask(self):
+        if self.folds == self.n_folds:
+            return []
+        if self.folds:
+            # Keep the best 1/factor of the candidates scored on the folds so far
+            keep = max(1, math.ceil(len(self.survivors) / self.factor))
+            ranked = sorted(self.survivors, key=lambda index: -_mean(self.scores[index], range(self.folds)))
+            self.survivors = sorted(ranked[:keep])
+        # Folds scored in the previous rungs are reused; a single survivor goes straight to all folds
+        previous = self.folds
+        self.folds = self.n_folds if len(self.survivors) == 1 else \
+            min(self.n_folds, max(self.min_folds, previous * self.factor))
+        return [(index, range(previous, self.folds)) for index in self.survivors]
+
+    def tell(self, index, scores):
+        self.scores[index] = scores
+
+    def finalists(self):
+        return self.survivors
+
+
+class RandomStrategy:
+
+    def __init__(self, n_iter=60, time_budget=None, batch_size=None, random_state=0):
+        self.n_iter = n_iter
+        self.time_budget = time_budget
+        self.batch_size = batch_size or os.cpu_count() or 1
+        self.random_state = random_state
+
+    def start(self, candidates, n_folds):
+        self.n_folds = n_folds
+        self.order = list(np.random.default_rng(self.random_state).permutation(len(candidates)))
+        if self.n_iter is not None:
+            self.order = self.order[:self.n_iter]
+        self.evaluated = []
+        self.started = None
+
+    def ask(self):
+        self.started = self.started or time.perf_counter()
+        # The first batch always runs, so even a zero budget leaves a candidate to pick
+        out_of_time = self.time_budget is not None and time.perf_counter() - self.started >= self.time_budget
+        if self.evaluated and out_of_time:
+            return []
+        batch = self.order[len(self.evaluated):len(self.evaluated) + self.batch_size]
+        self.evaluated += batch
+        return [(int(index), range(self.n_folds)) for index in batch]
+
+    def tell(self, index, scores):
+        pass
+
+    def finalists(self):
+        return sorted(int(index) for index in self.evaluated)
+
+
+# Tree-structured Parzen estimator over the values of each grid parameter
+# Suggestions that are not a candidate of the grid are told as failed
+class BayesianStrategy:
+
+    def __init__(self, n_trials=50, time_budget=None, batch_size=None, random_state=0):
+        if optuna is None:
+            raise ImportError("optuna is required for the Bayesian search strategy")
+        self.n_trials = n_trials
+        self.time_budget = time_budget
+        self.batch_size = batch_size or os.cpu_count() or 1
+        self.random_state = random_state
+
+    def start(self, candidates, n_folds):
+        self.n_folds = n_folds
+        self.index = {_canonical(params): i for i, params in enumerate(candidates)}
+        self.choices = {}
+        for params in candidates:
+            for key, value in params.items():
+                choices = self.choices.setdefault(key, [])
+                if _plain(value) not in choices:
+                    choices.append(_plain(value))
+        optuna.logging.set_verbosity(optuna.logging.WARNING)
+        self.study = optuna.create_study(direction='maximize',
+                                         sampler=optuna.samplers.TPESampler(seed=self.random_state))
+        self.trials = {}
+        self.evaluated = set()
+        self.n_asked = 0
+        self.started = None
+
+    def ask(self):
+        self.started = self.started or time.perf_counter()
+        # The first batch always runs, so even a zero budget leaves a candidate to pick
+        out_of_time = self.time_budget is not None and time.perf_counter() - self.started >= self.time_budget
+        if self.evaluated and out_of_time:
+            return []
+        batch = {}
+        while self.n_asked < min(self.n_trials, len(self.index)) and len(batch) < self.batch_size:
+            trial = self.study.ask()
+            self.n_asked += 1
+            params = {key: trial.suggest_categorical(key, choices) for key, choices in self.choices.items()}
+            index = self.index.get(_canonical(params))
+            if index is None:
+                self.study.tell(trial, state=optuna.trial.TrialState.FAIL)
+                continue
+            self.trials.setdefault(index, []).append(trial)
+            batch[index] = range(self.n_folds)
+        self.evaluated.update(batch)
+        return list(batch.items())
+
+    def tell(self, index, scores):
+        value = _mean(scores, range(self.n_folds))
+        for trial in self.trials.pop(index, []):
+            if np.isfinite(value):
+                self.study.tell(trial, value)
+            else:
+                self.study.tell(trial, state=optuna.trial.TrialState.FAIL)
+
+    def finalists(self):
+        return sorted(self.evaluated)
+
+
+STRATEGIES = {'grid': GridStrategy, 'halving': HalvingStrategy, 'random': RandomStrategy,
+              'bayes': BayesianStrategy}
+
+
+# Budget argument of the strategies that stop after a number of candidates
+BUDGET_ARGUMENTS = {'random': 'n_iter', 'bayes': 'n_trials'}
+
+
+# `n_iter` (candidates or trials per model) and `time_budget` (seconds per model) bound
+# the random and bayes strategies; the grid and halving strategies have no budget
+def make_strategy(strategy, n_iter=None, time_budget=None):
+    if strategy is None:
+        return GridStrategy()
+    if isinstance(strategy, str):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown search strategy {strategy!r}, expected one of {sorted(STRATEGIES)}")
+        budget = {}
+        if strategy in BUDGET_ARGUMENTS:
+            if n_iter is not None:
+                budget[BUDGET_ARGUMENTS[strategy]] = n_iter
+            if time_budget is not None:
+                budget['time_budget'] = time_budget
+        return STRATEGIES[strategy](**budget)
+    return copy.deepcopy(strategy)
+
+
+# Outcome of the search for one model, with the reporting interface of GridSearchCV
+class SearchResult:
+
+    def __init__(self, name, estimator, candidates, fold_scores, n_fits=None):
+        self.name = name
+        self.estimator = estimator
+        if not candidates:
+            raise ValueError(f"No candidate of the {name} search was evaluated; raise its search budget "
+                             f"(SPACEX_SEARCH_ITERATIONS, SPACEX_SEARCH_TIME_BUDGET)")
+        scores = np.array(fold_scores, dtype=float)
+        self.cv_results_ = {'params': candidates,
+                            'mean_test_score': scores.mean(axis=1),
+                            'std_test_score': scores.std(axis=1),
+                            'n_folds': scores.shape[1]}
+        # Same choice as GridSearchCV: highest mean score, first one in grid order on ties
+        means = np.where(np.isnan(self.cv_results_['mean_test_score']), -np.inf, self.cv_results_['mean_test_score'])
+        self.best_index_ = int(np.argmax(means))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(self.cv_results_['mean_test_score'][self.best_index_])
+        self.n_fits_ = scores.size if n_fits is None else n_fits
+        self.best_estimator_ = None
+
+    def refit(self, X, y):
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def score(self, X, y):
+        return self.best_estimator_.score(X, y)
+
+
+# Run the searches of all specs over one shared worker pool
+# `strategy` is a name from STRATEGIES or a strategy instance (copied for every spec)
+# Returns {spec.name: SearchResult}, each refitted on the full training data
+def run_searches(specs, X, y, cv=10, n_jobs=-1, cache_dir=DEFAULT_CACHE_DIR, refit=True, verbose=0,
+                 strategy=None):
+    # Sparse features (LaunchEncoder.transform) are kept sparse, as CSR for row indexing
+    X = X.tocsr() if sparse.issparse(X) else np.asarray(X)
+    y = np.asarray(y)
+    cache = FoldCache(cache_dir)
+
+    searches = {}
+    for spec in specs:
+        splitter = check_cv(cv, y, classifier=is_classifier(spec.estimator))
+        splits = list(splitter.split(X, y))
+        # Everything the fold scores depend on besides the estimator and its parameters
+        context = data_hash(X, y) + repr(splitter) + repr([test.tolist() for _, test in splits])
+        candidates = candidate_params(spec.param_grid)
+        keys = [cache.key(context, spec.estimator, params) for params in candidates]
+        search_strategy = make_strategy(strategy)
+        search_strategy.start(candidates, len(splits))
+        searches[spec.name] = {'spec': spec, 'splits': splits, 'candidates': candidates, 'keys': keys,
+                               'strategy': search_strategy, 'scores': {}, 'n_fits': 0}
+
+    # The workers are kept for all rounds
+    with Parallel(n_jobs=n_jobs, return_as='generator', verbose=verbose) as parallel:
+        active = list(searches.values())
+        while active:
+            # One round: the next batch of every unfinished search, minus the fold scores already known
+            asked, pending = [], {}
+            for search in list(active):
+                batch = search['strategy'].ask()
+                if not batch:
+                    active.remove(search)
+                    continue
+                for index, folds in batch:
+                    key = search['keys'][index]
+                    scores = search['scores'].setdefault(index, cache.get(key))
+                    missing = [fold for fold in folds if fold not in scores]
+                    search['n_fits'] += len(folds)
+                    asked.append((search, index))
+                    if missing:
+                        # The same candidate can appear twice if two specs share an estimator and grid
+                        targets, missing_folds = pending.setdefault(key, ([], set()))
+                        targets.append((search, index))
+                        missing_folds.update(missing)
+
+            if pending:
+                outputs = parallel(delayed(evaluate_candidate)(targets[0][0]['spec'].estimator,
+                                                               targets[0][0]['candidates'][targets[0][1]],
+                                                               X, y, targets[0][0]['splits'], sorted(folds))
+                                   for targets, folds in pending.values())
+                # Scores are stored as they arrive, so an interrupted search loses at most the running candidates
+                for (key, (targets, _)), new_scores in zip(pending.items(), outputs):
+                    for search, index in targets:
+                        search['scores'][index].update(new_scores)
+                    cache.put(key, targets[0][0]['scores'][targets[0][1]])
+                # The pool only takes the next round once the output generator is released
+                del outputs
+
+            for search, index in asked:
+                search['strategy'].tell(index, search['scores'][index])
+
+    results = {}
+    for name, search in searches.items():
+        finalists = search['strategy'].finalists()
+        n_folds = len(search['splits'])
+        result = SearchResult(name, search['spec'].estimator,
+                              [search['candidates'][index] for index in finalists],
+                              [[search['scores'][index][fold] for fold in range(n_folds)] for index in finalists],
+                              n_fits=search['n_fits'])
+        results[name] = result.refit(X, y) if refit else result
+    return results
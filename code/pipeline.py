@@ -0,0 +1,290 @@
+# Pipeline runner for the project scripts.
+#
+# Each stage declares the artifacts it reads and writes (see artifacts.py).
+# A stage is skipped when the hash of its inputs, parameters and code matches
+# the one recorded by its last successful run and its outputs are unchanged
+# since then; otherwise it re-runs, and so does everything depending on what it
+# produced. Stages whose inputs are ready run in parallel, so the API
+# collection and the Wikipedia scrape run side by side.
+#
+# File hashes are cached by (size, mtime), so a no-op rebuild only stats files.
+#
+# The collection stages need network access (the SpaceX API and Wikipedia).
+# Their outputs ship in datasets/, so on first use they are taken as they are and
+# only the downstream stages run; --force collect_api collect_wiki fetches them
+# again.
+#
+# Usage:
+#   python pipeline.py                      # bring every stage up to date
+#   python pipeline.py train --dry-run      # show what `train` would run
+#   python pipeline.py --force collect_api  # re-collect (network), then rebuild what changed
+#   python pipeline.py --workdir ../datasets
+
+import os
+import sys
+import ast
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from artifacts import artifact_paths
+
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = '.pipeline'
+
+# Parameters every stage depends on
+COMMON_PARAMS = ['SPACEX_ARTIFACT_FORMAT']
+
+
+@dataclass
+class Stage:
+    name: str
+    script: str
+    # Artifact names (see artifacts.py), or plain file names such as launch_encoder.json
+    inputs: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+    # Environment variables that change what the stage produces
+    params: list = field(default_factory=list)
+    # Outputs ship with the repository (datasets/): on first use they are taken as
+    # up to date instead of being produced again, which for the collection stages
+    # would need network access. --force re-runs the stage.
+    seeded: bool = False
+
+
+STAGES = [
+    Stage('collect_api', 'datacollection_part1.py', outputs=['dataset_part_1'],
+          params=['SPACEX_COLLECTION_MODE', 'SPACEX_CUTOFF_DATE', 'SPACEX_INCREMENTAL'], seeded=True),
+    Stage('collect_wiki', 'datacollection_part2.py', outputs=['spacex_web_scraped'],
+          params=['SPACEX_INCREMENTAL'], seeded=True),
+    Stage('reconcile', 'reconcile.py', inputs=['dataset_part_1', 'spacex_web_scraped'],
+          outputs=['launches_reconciled']),
+    Stage('wrangle', 'eda_datawrangling.py', inputs=['dataset_part_1'], outputs=['dataset_part_2']),
+    Stage('features', 'eda_visualization.py', inputs=['dataset_part_2'],
+          outputs=['dataset_part_3', 'launch_encoder.json']),
+    Stage('train', 'predictive_analytics.py', inputs=['dataset_part_2', 'launch_encoder.json'],
+          params=['SPACEX_SEARCH_STRATEGY', 'SPACEX_SEARCH_ITERATIONS', 'SPACEX_SEARCH_TIME_BUDGET']),
+]
+
+
+# Hashes of files, cached by size and modification time
+class FileHashes:
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def __call__(self, path):
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        cached = self.cache.get(path)
+        if cached and cached[:2] == signature:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        self.cache[path] = signature + [digest.hexdigest()]
+        return digest.hexdigest()
+
+
+# The script plus every module of this directory it imports, directly or not
+def code_files(script, seen=None):
+    seen = seen if seen is not None else set()
+    path = os.path.join(CODE_DIR, script)
+    if path in seen or not os.path.exists(path):
+        return seen
+    seen.add(path)
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules = [node.module]
+        else:
+            continue
+        for module in modules:
+            code_files(module.split('.')[0] + '.py', seen)
+    return seen
+
+
+# Path of the artifact a stage reads or writes, whatever its format
+# None when it does not exist
+def artifact_file(name, workdir):
+    if os.path.splitext(name)[1]:
+        path = os.path.join(workdir, name)
+        return path if os.path.exists(path) else None
+    paths = artifact_paths(name, workdir)
+    return paths[0][1] if paths else None
+
+
+class Pipeline:
+
+    def __init__(self, stages=STAGES, workdir='.'):
+        self.stages = {stage.name: stage for stage in stages}
+        self.workdir = os.path.abspath(workdir)
+        self.state_path = os.path.join(self.workdir, STATE_DIR, 'state.json')
+        self.state = {'stages': {}, 'files': {}}
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        self.file_hash = FileHashes(self.state['files'])
+        self._code_files = {}
+
+        producers = {output: stage.name for stage in stages for output in stage.outputs}
+        self.dependencies = {stage.name: {producers[i] for i in stage.inputs if i in producers}
+                             for stage in stages}
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    # Hash of everything that determines a stage's outputs
+    # None when an input artifact does not exist yet
+    def stage_key(self, stage):
+        digest = hashlib.sha256()
+        if stage.script not in self._code_files:
+            self._code_files[stage.script] = sorted(code_files(stage.script))
+        for path in self._code_files[stage.script]:
+            digest.update(os.path.basename(path).encode() + self.file_hash(path).encode())
+        for name in sorted(stage.params + COMMON_PARAMS):
+            digest.update(f"{name}={os.environ.get(name, '')}".encode())
+        for name in stage.inputs:
+            path = artifact_file(name, self.workdir)
+            if path is None:
+                return None
+            digest.update(name.encode() + self.file_hash(path).encode())
+        return digest.hexdigest()
+
+    def output_hashes(self, stage):
+        hashes = {}
+        for name in stage.outputs:
+            path = artifact_file(name, self.workdir)
+            hashes[name] = self.file_hash(path) if path else None
+        return hashes
+
+    def is_up_to_date(self, stage):
+        recorded = self.state['stages'].get(stage.name)
+        if recorded is None:
+            return stage.seeded and None not in self.output_hashes(stage).values()
+        outputs = self.output_hashes(stage)
+        return (None not in outputs.values()
+                and recorded['key'] == self.stage_key(stage)
+                and recorded['outputs'] == outputs)
+
+    # The requested stages plus everything they depend on
+    def closure(self, targets):
+        selected = set()
+        pending = list(targets or self.stages)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage {name!r}")
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.dependencies[name])
+        return selected
+
+    def run_stage(self, stage):
+        env = dict(os.environ,
+                   SPACEX_ARTIFACT_DIR=self.workdir,
+                   MPLBACKEND=os.environ.get('MPLBACKEND', 'Agg'),
+                   PYTHONPATH=os.pathsep.join(filter(None, [CODE_DIR, os.environ.get('PYTHONPATH')])))
+        log_path = os.path.join(self.workdir, STATE_DIR, f"{stage.name}.log")
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        start = time.perf_counter()
+        with open(log_path, 'w') as log:
+            result = subprocess.run([sys.executable, os.path.join(CODE_DIR, stage.script)],
+                                    cwd=self.workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            raise RuntimeError(f"{stage.name} failed with exit code {result.returncode}, see {log_path}")
+        return time.perf_counter() - start
+
+    # Bring the targets up to date; returns {stage: 'skipped' | 'ran' | 'failed' | 'blocked'}
+    def run(self, targets=None, force=(), max_workers=None, dry_run=False, report=print):
+        selected = self.closure(targets)
+        status = {}
+        changed = set()
+        running = {}
+
+        def ready(name):
+            return name not in status and name not in running.values() and \
+                all(status.get(dep) in ('skipped', 'ran') for dep in self.dependencies[name] & selected)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while len(status) < len(selected):
+                for name in sorted(selected):
+                    if name in status or name in running.values():
+                        continue
+                    if any(status.get(dep) in ('failed', 'blocked') for dep in self.dependencies[name]):
+                        status[name] = 'blocked'
+                        report(f"[blocked] {name}")
+                        continue
+                    if not ready(name):
+                        continue
+                    stage = self.stages[name]
+                    stale = (name in force or self.dependencies[name] & changed
+                             or not self.is_up_to_date(stage))
+                    if not stale:
+                        status[name] = 'skipped'
+                        report(f"[up to date] {name}")
+                        if name not in self.state['stages']:
+                            # Seeded outputs are recorded, so later code or parameter changes re-run the stage
+                            self.state['stages'][name] = {'key': self.stage_key(stage),
+                                                          'outputs': self.output_hashes(stage)}
+                    elif dry_run:
+                        status[name] = 'ran'
+                        changed.add(name)
+                        report(f"[would run] {name}")
+                    else:
+                        report(f"[running] {name}")
+                        running[executor.submit(self.run_stage, stage)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    stage = self.stages[name]
+                    try:
+                        elapsed = future.result()
+                    except Exception as error:
+                        status[name] = 'failed'
+                        report(f"[failed] {name}: {error}")
+                        continue
+                    previous = self.state['stages'].get(name, {}).get('outputs')
+                    outputs = self.output_hashes(stage)
+                    self.state['stages'][name] = {'key': self.stage_key(stage), 'outputs': outputs}
+                    self.save_state()
+                    status[name] = 'ran'
+                    # Dependents only need to re-run if the outputs actually changed
+                    if outputs != previous or not stage.outputs:
+                        changed.add(name)
+                    report(f"[done] {name} in {elapsed:.1f}s")
+
+        if not dry_run:
+            self.save_state()
+        return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the SpaceX pipeline stages that are out of date")
+    parser.add_argument('targets', nargs='*', help=f"stages to bring up to date (default: all of {[s.name for s in STAGES]})")
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE', help="re-run these stages even if up to date")
+    parser.add_argument('--workdir', default='.', help="directory holding the stage artifacts")
+    parser.add_argument('--workers', type=int, default=None, help="maximum number of stages running at once")
+    parser.add_argument('--dry-run', action='store_true', help="only report what would run")
+    args = parser.parse_args(argv)
+
+    status = Pipeline(workdir=args.workdir).run(args.targets, force=set(args.force),
+                                                max_workers=args.workers, dry_run=args.dry_run)
+    return 1 if {'failed', 'blocked'} & set(status.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,18 @@
 # Import the required libraries
-import pandas as pd
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn import preprocessing
 from sklearn.model_selection import train_test_split
-from sklearn.model_selection import GridSearchCV
 from sklearn.linear_model import LogisticRegression
 from sklearn.svm import SVC
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.neighbors import KNeighborsClassifier
+from artifacts import read_artifact
+from model_selection import SearchSpec, make_strategy, run_searches
+from landing_model import save_model
+from launch_encoder import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS, LaunchEncoder
 
 # Create a function to plot the confusion matrix
 def plot_confusion_matrix(x,y,predict):
@@ -25,31 +28,80 @@ def plot_confusion_matrix(x,y,predict):
     plt.show()
 
 
-# Load the dataset
-data = pd.read_csv("dataset_part_2.csv")
+# Load the dataset: the Class label and the launch fields the encoder reads from dataset_part_2
+data = read_artifact('dataset_part_2', columns=NUMERIC_COLUMNS + CATEGORICAL_COLUMNS + ['Class'])
 data.head()
 
-X = pd.read_csv("dataset_part_3.csv")
-X.head()
+# The encoder eda_visualization.py saved with dataset_part_3; when that file is missing,
+# it is fitted again on the same rows, which gives the same vocabulary
+try:
+    encoder = LaunchEncoder.load()
+except FileNotFoundError:
+    encoder = LaunchEncoder().fit(data)
+feature_columns = encoder.feature_names()
+
+# The one-hot features as a sparse CSR matrix (the columns of dataset_part_3 plus the unknown buckets)
+X = encoder.transform(data)
 
 # Create a NumPy array from the column Class in data
 Y = data['Class'].to_numpy()
 
 # Standardize the data in X then reassign it to the variable X
-transform = preprocessing.StandardScaler()
+# Centering would densify the one-hot block, so the features are only scaled
+transform = preprocessing.StandardScaler(with_mean=False)
 X = transform.fit_transform(X) # Very important otherwise data doesn't converge, and coefficients become unstable
 
 # Split the data into training and testing data
 X_train, X_test, Y_train, Y_test = train_test_split(X,Y,test_size=0.2, random_state = 2)
 Y_test.shape # 18 test samples available
 
-# Create a logistic regression object and GridSearchCV object
+# Hyperparameter grids of the four models
+# Logistic regression
 parameters1 ={"C":[0.01,0.1,1],'penalty':['l2'], 'solver':['lbfgs']}# l1 lasso l2 ridge
 lr=LogisticRegression(max_iter=1000)
-logreg_cv = GridSearchCV(estimator=lr, param_grid=parameters1, cv = 10)
-logreg_cv.fit(X_train, Y_train)
 
-# Output
+# Support vector machine
+parameters2 = {'kernel':('linear', 'rbf','poly', 'sigmoid'),
+              'C': np.logspace(-3, 3, 5),
+              'gamma':np.logspace(-3, 3, 5)}
+svm = SVC()
+
+# Decision Tree
+parameters3 = {
+    'criterion': ['gini', 'entropy'],
+    'splitter': ['best', 'random'],
+    'max_depth': [4, 6, 8, 10],                # fewer, meaningful depths
+    'max_features': ['sqrt', 'log2', None],    # 'auto' removed
+    'min_samples_leaf': [1, 2, 4],
+    'min_samples_split': [2, 5, 10]
+}
+tree = DecisionTreeClassifier(random_state=42)
+
+# K-Nearest Neighbors
+# ball_tree and kd_tree do not take sparse input (they fall back to brute force)
+parameters4 = {'n_neighbors': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+              'algorithm': ['auto', 'brute'],
+              'p': [1,2]}
+KNN = KNeighborsClassifier()
+
+# Run the 10-fold cross-validated searches of all models over one worker pool
+# Fold scores are cached in .model_cache, so a re-run only fits new or changed candidates
+# SPACEX_SEARCH_STRATEGY picks the search: grid (exhaustive, default), halving, random or bayes
+# SPACEX_SEARCH_ITERATIONS (candidates per model) and SPACEX_SEARCH_TIME_BUDGET (seconds per model)
+# bound the random and bayes searches; by default 60 random candidates or 50 Bayesian trials
+search_iterations = os.environ.get('SPACEX_SEARCH_ITERATIONS')
+search_time_budget = os.environ.get('SPACEX_SEARCH_TIME_BUDGET')
+search_strategy = make_strategy(os.environ.get('SPACEX_SEARCH_STRATEGY', 'grid'),
+                                n_iter=int(search_iterations) if search_iterations else None,
+                                time_budget=float(search_time_budget) if search_time_budget else None)
+searches = run_searches([SearchSpec('logreg', lr, parameters1),
+                         SearchSpec('svm', svm, parameters2),
+                         SearchSpec('tree', tree, parameters3),
+                         SearchSpec('knn', KNN, parameters4)],
+                        X_train, Y_train, cv=10, strategy=search_strategy)
+logreg_cv, svm_cv, tree_cv, knn_cv = (searches[name] for name in ('logreg', 'svm', 'tree', 'knn'))
+
+# Logistic regression output
 print("tuned hpyerparameters :(best parameters) ",logreg_cv.best_params_)
 print("accuracy :",logreg_cv.best_score_)
 
@@ -60,15 +112,7 @@ logreg_cv.score(X_test,Y_test)
 yhat=logreg_cv.predict(X_test)
 plot_confusion_matrix(logreg_cv, Y_test,yhat)
 
-# Support vector machine
-parameters2 = {'kernel':('linear', 'rbf','poly','rbf', 'sigmoid'),
-              'C': np.logspace(-3, 3, 5),
-              'gamma':np.logspace(-3, 3, 5)}
-svm = SVC()
-svm_cv = GridSearchCV(estimator=svm, param_grid=parameters2, cv = 10)
-svm_cv.fit(X_train, Y_train)
-
-#Output
+# Support vector machine output
 print("tuned hpyerparameters :(best parameters) ",svm_cv.best_params_)
 print("accuracy :",svm_cv.best_score_)
 
@@ -79,20 +123,7 @@ svm_cv.score(X_test,Y_test)
 yhat=svm_cv.predict(X_test)
 plot_confusion_matrix(svm_cv, Y_test,yhat)
 
-# Decision Tree
-parameters3 = {
-    'criterion': ['gini', 'entropy'],
-    'splitter': ['best', 'random'],
-    'max_depth': [4, 6, 8, 10],                # fewer, meaningful depths
-    'max_features': ['sqrt', 'log2', None],    # 'auto' removed
-    'min_samples_leaf': [1, 2, 4],
-    'min_samples_split': [2, 5, 10]
-}
-tree = DecisionTreeClassifier(random_state=42)
-tree_cv = GridSearchCV(estimator=tree, param_grid=parameters3, cv = 10)
-tree_cv.fit(X_train, Y_train)
-
-# Output
+# Decision Tree output
 print("tuned hpyerparameters :(best parameters) ",tree_cv.best_params_)
 print("accuracy :",tree_cv.best_score_)
 
@@ -103,20 +134,19 @@ tree_cv.score(X_test,Y_test)
 yhat = tree_cv.predict(X_test)
 plot_confusion_matrix(tree_cv, Y_test, yhat)
 
-# K-Nearest Neighbors
-parameters4 = {'n_neighbors': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
-              'algorithm': ['auto', 'ball_tree', 'kd_tree', 'brute'],
-              'p': [1,2]}
-
-KNN = KNeighborsClassifier()
-
-knn_cv = GridSearchCV(estimator=KNN, param_grid=parameters4, cv = 10)
-knn_cv.fit(X_train, Y_train)
-
+# K-Nearest Neighbors output
 print("tuned hpyerparameters :(best parameters) ",knn_cv.best_params_)
 print("accuracy :",knn_cv.best_score_)
 
 knn_cv.score(X_test, Y_test)
 
 yhat = knn_cv.predict(X_test)
-plot_confusion_matrix(knn_cv, Y_test,yhat)
\ No newline at end of file
+plot_confusion_matrix(knn_cv, Y_test,yhat)
+
+# Save the scaler, the encoder and the model with the best cross-validation accuracy for landing_model.py
+best_name = max(searches, key=lambda name: searches[name].best_score_)
+model_path = save_model(searches[best_name], transform, feature_columns, encoder=encoder,
+                        model=best_name,
+                        test_score=float(searches[best_name].score(X_test, Y_test)),
+                        training_rows=X_train.shape[0])
+print("saved", best_name, "model to", model_path)
@@ -0,0 +1,161 @@
+# Distances from launch sites to nearby features (coastline, railways, roads, towns).
+#
+# Features are point layers: every point of a layer is one feature vertex, so a
+# coastline or a road is given by the vertices of its line. Layers are read from
+#
+#   CSV       columns kind, name, lat, lon (one layer per kind), such as
+#             datasets/proximity_points.csv
+#   GeoJSON   a FeatureCollection of Point, MultiPoint, LineString,
+#             MultiLineString, Polygon or MultiPolygon features; the layer is the
+#             feature's "kind" property or else the file name, the feature name
+#             its "name" property
+#
+# Each layer keeps a BallTree over its points in radians with the haversine
+# metric, so the nearest feature of every site, or all features within a radius,
+# come from one vectorized query however many sites and vertices there are.
+#
+# Usage:
+#   python proximity.py spacex_launch_geo.csv --layers proximity_points.csv coastline.geojson
+#   python proximity.py candidate_pads.csv --layers roads.geojson --radius 5
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+# Approximate radius of the earth in km
+EARTH_RADIUS_KM = 6373.0
+
+
+# Great-circle distance in km; arguments in degrees, broadcast against each other
+def haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype='float64')) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+class PointLayer:
+
+    def __init__(self, kind, lat, lon, names=None):
+        self.kind = kind
+        self.lat = np.asarray(lat, dtype='float64')
+        self.lon = np.asarray(lon, dtype='float64')
+        self.names = np.asarray(names if names is not None else [kind] * len(self.lat), dtype=object)
+        self.tree = BallTree(np.radians(np.column_stack([self.lat, self.lon])), metric='haversine')
+
+    def __len__(self):
+        return len(self.lat)
+
+    # Distances (km) and point indices of the k nearest points of every query point
+    def nearest(self, lat, lon, k=1):
+        distances, indices = self.tree.query(_radians(lat, lon), k=min(k, len(self)))
+        return distances * EARTH_RADIUS_KM, indices
+
+    # Point indices and distances (km) within radius_km of every query point, nearest first
+    def within(self, lat, lon, radius_km):
+        indices, distances = self.tree.query_radius(_radians(lat, lon), r=radius_km / EARTH_RADIUS_KM,
+                                                    return_distance=True, sort_results=True)
+        return indices, [d * EARTH_RADIUS_KM for d in distances]
+
+
+def _radians(lat, lon):
+    return np.radians(np.column_stack([np.atleast_1d(lat), np.atleast_1d(lon)]).astype('float64'))
+
+
+# Point layers
+
+def layers_from_frame(df):
+    return {kind: PointLayer(kind, group['lat'], group['lon'], group['name'])
+            for kind, group in df.groupby('kind', sort=False)}
+
+
+# [lon, lat] positions of any geometry type, at any nesting depth
+def _positions(coordinates):
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return [coordinates[:2]]
+    return [position for part in coordinates for position in _positions(part)]
+
+
+def read_geojson(path):
+    with open(path) as f:
+        collection = json.load(f)
+    default_kind = os.path.splitext(os.path.basename(path))[0]
+    frames = []
+    for feature in collection.get('features', []):
+        if not feature.get('geometry'):
+            continue
+        properties = feature.get('properties') or {}
+        points = np.asarray(_positions(feature['geometry']['coordinates']), dtype='float64').reshape(-1, 2)
+        frames.append(pd.DataFrame({'kind': properties.get('kind', default_kind),
+                                    'name': properties.get('name', default_kind),
+                                    'lat': points[:, 1], 'lon': points[:, 0]}))
+    return pd.concat(frames, ignore_index=True) if frames else \
+        pd.DataFrame(columns=['kind', 'name', 'lat', 'lon'])
+
+
+# Read point layers from CSV and GeoJSON files; layers of the same kind are merged
+def load_layers(*paths):
+    frames = [read_geojson(path) if path.endswith(('.geojson', '.json')) else pd.read_csv(path) for path in paths]
+    return layers_from_frame(pd.concat(frames, ignore_index=True))
+
+
+# Queries
+
+# Nearest feature of every layer for every site: one row per site and layer
+# `sites` has the columns site_column, lat_column and lon_column
+def nearest_features(sites, layers, site_column='Launch Site', lat_column='Lat', lon_column='Long'):
+    frames = []
+    for kind, layer in layers.items():
+        distances, indices = layer.nearest(sites[lat_column], sites[lon_column])
+        nearest = indices[:, 0]
+        frames.append(pd.DataFrame({'site': sites[site_column].to_numpy(),
+                                    'site_lat': sites[lat_column].to_numpy(),
+                                    'site_lon': sites[lon_column].to_numpy(),
+                                    'kind': kind,
+                                    'name': layer.names[nearest],
+                                    'lat': layer.lat[nearest],
+                                    'lon': layer.lon[nearest],
+                                    'distance_km': distances[:, 0]}))
+    return pd.concat(frames, ignore_index=True)
+
+
+# All features of a layer within radius_km of every site: one row per site and feature point
+def features_within(sites, layer, radius_km, site_column='Launch Site', lat_column='Lat', lon_column='Long'):
+    indices, distances = layer.within(sites[lat_column], sites[lon_column], radius_km)
+    counts = np.array([len(i) for i in indices])
+    points = np.concatenate(indices).astype('int64') if len(indices) else np.empty(0, dtype='int64')
+    return pd.DataFrame({'site': np.repeat(sites[site_column].to_numpy(), counts),
+                         'kind': layer.kind,
+                         'name': layer.names[points],
+                         'lat': layer.lat[points],
+                         'lon': layer.lon[points],
+                         'distance_km': np.concatenate(distances) if len(distances) else np.empty(0)})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nearest features of launch sites or candidate pad locations")
+    parser.add_argument('sites', help="CSV with a site name and Lat / Long columns")
+    parser.add_argument('--layers', nargs='+', required=True, help="CSV or GeoJSON point layers")
+    parser.add_argument('--radius', type=float, default=None, help="list every feature within this many km")
+    parser.add_argument('--site-column', default='Launch Site')
+    parser.add_argument('--lat-column', default='Lat')
+    parser.add_argument('--lon-column', default='Long')
+    parser.add_argument('--output', help="output CSV (default: stdout)")
+    args = parser.parse_args(argv)
+
+    columns = [args.site_column, args.lat_column, args.lon_column]
+    sites = pd.read_csv(args.sites, usecols=columns).drop_duplicates(args.site_column)
+    layers = load_layers(*args.layers)
+    if args.radius is None:
+        result = nearest_features(sites, layers, *columns)
+    else:
+        result = pd.concat([features_within(sites, layer, args.radius, *columns) for layer in layers.values()],
+                           ignore_index=True)
+    result.to_csv(args.output or sys.stdout, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+# Record linkage between the API launches and the Wikipedia launch table.
+#
+# dataset_part_1 (SpaceX API) and spacex_web_scraped (Wikipedia, with the columns
+# of wiki_scrape.normalize_launch_frame(); a raw scrape is normalized first) are
+# collected independently: their flight numbers do not line up, the API gives core
+# serials where the wiki gives garbled version strings ("F9 v1.07B0003.18"), and the wiki
+# names launch areas ("CCAFS", "Cape Canaveral") where the API names pads
+# ("CCSFS SLC 40"). Both sides are reduced to the keys of analytics_store.py
+# (ISO date, launch area, core serial) and matched in passes, each a hash join
+# of the rows still unmatched:
+#
+#   serial      same date, area and core serial
+#   site        same date and area
+#   booster     same date and core serial (renamed or misattributed sites)
+#   fuzzy       nearest date within --tolerance days at the same area
+#               (merge_asof on the date-sorted rows, by area)
+#
+# A row is matched at most once: within a pass, candidate pairs are ranked by
+# date distance and each side keeps its best pair. Every pass is a sort or a
+# hash join, so the cost stays near-linear in the number of rows, however many
+# revisions of the scrape are reconciled.
+#
+# The result has one row per launch: matched pairs, then launches found on one
+# side only. Fields are taken from the API where it has them, and each field the
+# two sources disagree on is flagged (date_conflict, serial_conflict,
+# orbit_conflict, mass_conflict, landing_conflict; conflicts counts them).
+#
+# Usage:
+#   python reconcile.py                                   # writes the launches_reconciled artifact
+#   python reconcile.py --tolerance 3 --output reconciled.csv
+#   python reconcile.py --api dataset_part_1.csv --wiki spacex_web_scraped.csv --output -
+
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from artifacts import read_artifact, write_artifact
+from analytics_store import normalize_date, normalize_serial, site_area, wiki_frame
+
+# Passes of exact matching: (match name, key columns)
+PASSES = [('serial', ['date', 'area', 'serial']),
+          ('site', ['date', 'area']),
+          ('booster', ['date', 'serial'])]
+FUZZY_MATCH = 'fuzzy'
+# Days between the API and wiki dates of a fuzzy match (UTC vs. local launch dates)
+DEFAULT_TOLERANCE = 2
+# Relative payload mass difference that counts as a conflict
+MASS_TOLERANCE = 0.05
+
+# Orbits the sources name differently: the API separates ISS and Starlink (VLEO)
+# launches, which the wiki lists as LEO
+ORBIT_FAMILIES = {'ISS': 'LEO', 'VLEO': 'LEO', 'LEO(ISS)': 'LEO', 'POLAR': 'PO', 'POLARORBIT': 'PO',
+                  'POLARLEO': 'PO', 'SUBORBITAL': 'SO'}
+# Landing outcomes as 1 (landed), 0 (lost) or missing (no attempt)
+API_LANDINGS = {'True': 1.0, 'False': 0.0}
+WIKI_LANDINGS = {'Success': 1.0, 'Controlled': 1.0, 'Failure': 0.0, 'Uncontrolled': 0.0}
+
+
+def normalize_orbit(values):
+    keys = values.str.upper().str.replace(r'[^A-Z0-9()]', '', regex=True)
+    return keys.replace(ORBIT_FAMILIES)
+
+
+# Keys and compared fields of each source, one row per launch
+
+def api_keys(df):
+    return pd.DataFrame({'row': np.arange(len(df)),
+                         'date': pd.to_datetime(normalize_date(df['Date'])),
+                         'area': site_area(df['LaunchSite'].astype(str)).to_numpy(dtype=object),
+                         'serial': normalize_serial(df['Serial'].astype(str)),
+                         'site': df['LaunchSite'].to_numpy(),
+                         'flight_number': df['FlightNumber'].to_numpy(),
+                         'orbit': df['Orbit'].to_numpy(),
+                         'mass_kg': pd.to_numeric(df['PayloadMass'], errors='coerce').to_numpy(),
+                         'landing': df['Outcome'].str.split().str[0].map(API_LANDINGS).to_numpy(),
+                         'landing_outcome': df['Outcome'].to_numpy()})
+
+
+# `df` is the scraped table as datacollection_part2.py writes it, or a raw scrape
+def wiki_keys(df):
+    df = wiki_frame(df)
+    site = df['Launch site'].astype(object)
+    landing = df['Booster landing'].astype(object)
+    return pd.DataFrame({'row': np.arange(len(df)),
+                         'date': df['Launch datetime'].dt.normalize().to_numpy(),
+                         'area': site_area(site.astype(str)).to_numpy(dtype=object),
+                         'serial': df['Booster serial'].astype(object).where(df['Booster serial'].notna(), None)
+                         .to_numpy(),
+                         'site': site.to_numpy(),
+                         'flight_number': df['Flight No.'].to_numpy(),
+                         'orbit': df['Orbit'].astype(object).to_numpy(),
+                         'mass_kg': df['Payload mass (kg)'].to_numpy(dtype='float64', na_value=np.nan),
+                         'landing': landing.str.split().str[0].map(WIKI_LANDINGS).to_numpy(),
+                         'landing_outcome': landing.to_numpy()})
+
+
+# Keep each row of either side in at most one pair, preferring the closest dates
+def _one_to_one(pairs):
+    pairs = pairs.assign(distance=(pairs['date_api'] - pairs['date_wiki']).abs())
+    pairs = pairs.sort_values(['distance', 'row_api', 'row_wiki'], kind='stable')
+    return pairs.drop_duplicates('row_api').drop_duplicates('row_wiki')
+
+
+# Pairs (row_api, row_wiki, match) of the rows equal on every key column
+def _exact_pairs(api, wiki, keys, match):
+    pairs = api.dropna(subset=keys).merge(wiki.dropna(subset=keys), on=keys, suffixes=('_api', '_wiki'))
+    if 'date' in keys:
+        pairs['date_api'] = pairs['date_wiki'] = pairs['date']
+    return _one_to_one(pairs)[['row_api', 'row_wiki']].assign(match=match)
+
+
+# Pairs of the rows at the same area whose dates are closest, within `tolerance` days
+def _fuzzy_pairs(api, wiki, tolerance):
+    api = api.dropna(subset=['date', 'area']).sort_values('date', kind='stable')
+    wiki = wiki.dropna(subset=['date', 'area']).sort_values('date', kind='stable')
+    pairs = pd.merge_asof(api[['row', 'date', 'area']],
+                          wiki[['row', 'date', 'area']].rename(columns={'date': 'date_wiki'}),
+                          left_on='date', right_on='date_wiki', by='area', suffixes=('_api', '_wiki'),
+                          direction='nearest', tolerance=pd.Timedelta(days=tolerance))
+    pairs = pairs.dropna(subset=['row_wiki']).rename(columns={'date': 'date_api'})
+    pairs['row_wiki'] = pairs['row_wiki'].astype('int64')
+    return _one_to_one(pairs)[['row_api', 'row_wiki']].assign(match=FUZZY_MATCH)
+
+
+# (row_api, row_wiki, match) of every matched pair, by pass
+def link(api, wiki, tolerance=DEFAULT_TOLERANCE):
+    matched = []
+    for match, keys in PASSES:
+        pairs = _exact_pairs(api, wiki, keys, match)
+        matched.append(pairs)
+        api = api[~api['row'].isin(pairs['row_api'])]
+        wiki = wiki[~wiki['row'].isin(pairs['row_wiki'])]
+    if tolerance is not None:
+        matched.append(_fuzzy_pairs(api, wiki, tolerance))
+    return pd.concat(matched, ignore_index=True)
+
+
+# One row per launch: fields of both sources side by side, merged fields and conflict flags
+def reconcile(api_df, wiki_df, tolerance=DEFAULT_TOLERANCE):
+    api = api_keys(api_df)
+    wiki = wiki_keys(wiki_df)
+    pairs = link(api, wiki, tolerance)
+
+    api_only = api.loc[~api['row'].isin(pairs['row_api']), ['row']].rename(columns={'row': 'row_api'})
+    wiki_only = wiki.loc[~wiki['row'].isin(pairs['row_wiki']), ['row']].rename(columns={'row': 'row_wiki'})
+    rows = pd.concat([pairs, api_only.assign(match='api_only'), wiki_only.assign(match='wiki_only')],
+                     ignore_index=True)
+    rows['row_api'] = rows['row_api'].astype('Int64')
+    rows['row_wiki'] = rows['row_wiki'].astype('Int64')
+
+    fields = ['date', 'area', 'serial', 'site', 'flight_number', 'orbit', 'mass_kg', 'landing', 'landing_outcome']
+    api_side = rows[['row_api']].merge(api, left_on='row_api', right_on='row', how='left')[fields]
+    wiki_side = rows[['row_wiki']].merge(wiki, left_on='row_wiki', right_on='row', how='left')[fields]
+
+    result = pd.DataFrame({'match': rows['match'], 'api_row': rows['row_api'], 'wiki_row': rows['row_wiki']})
+    for field in fields:
+        result[field] = api_side[field].combine_first(wiki_side[field])
+    for field in ('date', 'site', 'serial', 'flight_number', 'orbit', 'mass_kg', 'landing_outcome'):
+        result[f'{field}_api'] = api_side[field]
+        result[f'{field}_wiki'] = wiki_side[field]
+    result['date'] = pd.to_datetime(result['date'])
+
+    both = rows['row_api'].notna() & rows['row_wiki'].notna()
+    api_mass = pd.to_numeric(api_side['mass_kg'])
+    wiki_mass = pd.to_numeric(wiki_side['mass_kg'])
+    flags = {
+        'date_conflict': pd.to_datetime(api_side['date']) != pd.to_datetime(wiki_side['date']),
+        'serial_conflict': api_side['serial'].notna() & wiki_side['serial'].notna()
+                           & (api_side['serial'] != wiki_side['serial']),
+        'orbit_conflict': normalize_orbit(api_side['orbit'].astype(str))
+                          != normalize_orbit(wiki_side['orbit'].astype(str)),
+        # Wiki masses of 0 are unknown masses, not empty launches
+        'mass_conflict': (wiki_mass > 0) & ((api_mass - wiki_mass).abs() > MASS_TOLERANCE * wiki_mass),
+        'landing_conflict': pd.to_numeric(api_side['landing']).notna() & pd.to_numeric(wiki_side['landing']).notna()
+                            & (pd.to_numeric(api_side['landing']) != pd.to_numeric(wiki_side['landing'])),
+    }
+    for name, flag in flags.items():
+        result[name] = (flag & both).astype(bool)
+    result['conflicts'] = result[list(flags)].sum(axis=1)
+    result = result.drop(columns=['landing'])
+    return result.sort_values(['date', 'match'], kind='stable', na_position='last').reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Link the API launches to the Wikipedia launch table")
+    parser.add_argument('--api', help="API launches CSV (default: the dataset_part_1 artifact)")
+    parser.add_argument('--wiki', help="scraped launches CSV (default: the spacex_web_scraped artifact)")
+    parser.add_argument('--tolerance', type=int, default=DEFAULT_TOLERANCE,
+                        help="days between the dates of a fuzzy match; -1 disables fuzzy matching")
+    parser.add_argument('--output', help="output CSV, '-' for stdout (default: the launches_reconciled artifact)")
+    args = parser.parse_args(argv)
+
+    api = pd.read_csv(args.api) if args.api else read_artifact('dataset_part_1')
+    wiki = pd.read_csv(args.wiki) if args.wiki else read_artifact('spacex_web_scraped')
+    result = reconcile(api, wiki, None if args.tolerance < 0 else args.tolerance)
+
+    summary = result['match'].value_counts()
+    print(', '.join(f"{match}: {count}" for match, count in summary.items()), file=sys.stderr)
+    print(f"{int((result['conflicts'] > 0).sum())} matched launches with conflicts", file=sys.stderr)
+    if args.output:
+        result.to_csv(sys.stdout if args.output == '-' else args.output, index=False)
+    else:
+        write_artifact(result, 'launches_reconciled')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,77 +1,108 @@
 # Import required libraries
-import pandas as pd
+import os
 import dash
 from dash import html
 from dash import dcc
 from dash.dependencies import Input, Output
 import plotly.express as px
+from launch_cube import WatchedCube, read_shared
+from figure_cache import cache_from_env, quantize_range
+
+# Read the launch data
+# The callbacks answer from precomputed aggregates, rebuilt when the CSV changes
+# The table is memory-mapped from an Arrow copy, shared by all server workers
+launch_cube = WatchedCube(os.environ.get('SPACEX_DASH_DATA', "spacex_launch_dash.csv"), read=read_shared)
+payload_step = 100
+
+# Figures are memoized per dataset version, in memory or in a file shared by all workers
+figure_cache = cache_from_env()
+
+
+def dataset_version():
+    return launch_cube.get().version
 
-# Read the spacex_df data into pandas dataframe
-spacex_df = pd.read_csv("spacex_launch_dash.csv")
-max_payload = spacex_df['Payload Mass (kg)'].max()
-min_payload = spacex_df['Payload Mass (kg)'].min()
 
 # Create a dash application
 app = dash.Dash(__name__)
 
 # Create an app layout
-app.layout = html.Div(children=[html.H1('SpaceX Launch Records Dashboard',
-                                        style={'textAlign': 'center', 'color': '#503D36',
-                                               'font-size': 40}),
-                                # Add a dropdown list to enable Launch Site selection
-                                # The default select value is for ALL sites
-                                # dcc.Dropdown(id='site-dropdown',...)
-                                html.Div(dcc.Dropdown(id='site-dropdown',
-                                                        options=[
-                                                            {'label': 'All Sites', 'value': 'ALL'},
-                                                            {'label': 'CCAFS LC-40', 'value': 'CCAFS LC-40'},
-                                                            {'label': 'VAFB SLC-4E', 'value': 'VAFB SLC-4E'},
-                                                            {'label': 'KSC LC-39A', 'value': 'KSC LC-39A'},
-                                                            {'label': 'CCAFS SLC-40', 'value': 'CCAFS SLC-40'}
-                                                        ],
-                                                        value='ALL',
-                                                        placeholder='Select a Launch Site here',
-                                                        searchable=True
-                                )),
-                                html.Br(),
-
-                                # Add a pie chart to show the total successful launches count for all sites
-                                # If a specific launch site was selected, show the Success vs. Failed counts for the site
-                                html.Div(dcc.Graph(id='success-pie-chart')),
-                                html.Br(),
-
-                                html.P("Payload range (Kg):"),
-                                # Add a slider to select payload range
-                                dcc.RangeSlider(id='payload-slider',
-                                                min=int(min_payload),
-                                                max=int(max_payload),
-                                                step=100,
-                                                value=[int(min_payload), int(max_payload)],
-                                                marks={
-                                                    int(min_payload): str(int(min_payload)),
-                                                    int(max_payload): str(int(max_payload))
-                                                }),
-
-                                # Add a scatter chart to show the correlation between payload and launch success
-                                html.Div(dcc.Graph(id='success-payload-scatter-chart'))
-                                ])
+# Built from the launch index: one dropdown option per site in the data and slider
+# marks at the payload quantiles. Dash calls serve_layout() on every page load; the
+# layout is built once per dataset version and reused
+def build_layout(cube):
+    low, high = int(cube.min_payload), int(cube.max_payload)
+    marks = {low: str(low), high: str(high)}
+    for payload in cube.payload_quantiles.values():
+        # On the slider grid
+        payload = low + (int(payload) - low) // payload_step * payload_step
+        marks.setdefault(payload, str(payload))
+    return html.Div(children=[html.H1('SpaceX Launch Records Dashboard',
+                                      style={'textAlign': 'center', 'color': '#503D36',
+                                             'font-size': 40}),
+                              # Add a dropdown list to enable Launch Site selection
+                              # The default select value is for ALL sites
+                              html.Div(dcc.Dropdown(id='site-dropdown',
+                                                    options=[{'label': f"All Sites ({len(cube.df)})", 'value': 'ALL'}] +
+                                                            [{'label': f"{site} ({count})", 'value': site}
+                                                             for site, count in cube.site_counts.items()],
+                                                    value='ALL',
+                                                    placeholder='Select a Launch Site here',
+                                                    searchable=True
+                              )),
+                              html.Br(),
+
+                              # Add a pie chart to show the total successful launches count for all sites
+                              # If a specific launch site was selected, show the Success vs. Failed counts for the site
+                              html.Div(dcc.Graph(id='success-pie-chart')),
+                              html.Br(),
+
+                              html.P("Payload range (Kg):"),
+                              # Add a slider to select payload range
+                              dcc.RangeSlider(id='payload-slider',
+                                              min=low,
+                                              max=high,
+                                              step=payload_step,
+                                              value=[low, high],
+                                              marks=dict(sorted(marks.items()))),
+
+                              # Add a scatter chart to show the correlation between payload and launch success
+                              html.Div(dcc.Graph(id='success-payload-scatter-chart'))
+                              ])
+
+
+# version -> layout of the current dataset
+layouts = {}
+
+
+def serve_layout():
+    cube = launch_cube.get()
+    layout = layouts.get(cube.version)
+    if layout is None:
+        layout = build_layout(cube)
+        layouts.clear()
+        layouts[cube.version] = layout
+    return layout
+
+
+app.layout = serve_layout
 
 # Pie Chart:
 # Add a callback function for `site-dropdown` as input, `success-pie-chart` as output
 # Function decorator to specify function input and output
 @app.callback(Output(component_id='success-pie-chart', component_property='figure'),
               Input(component_id='site-dropdown', component_property='value'))
+@figure_cache.memoize(dataset_version)
 def get_pie_chart(entered_site):
+    cube = launch_cube.get()
     # If ALL sites selected, show total successful launches by site
     if entered_site == 'ALL':
-        fig_df = spacex_df.groupby('Launch Site')['class'].sum().reset_index()
+        fig_df = cube.success_counts.reset_index()
         fig = px.pie(fig_df, values='class', names='Launch Site',
                      title='Total Successful Launches by Site')
         return fig
     else:
         # For a specific site, show success vs failure counts
-        filtered_df = spacex_df[spacex_df['Launch Site'] == entered_site]
-        outcomes = filtered_df.groupby('class').size().reset_index(name='count')
+        outcomes = cube.class_histogram(entered_site).rename_axis('class').reset_index(name='count')
         # map class values to readable labels if present as 0/1
         outcomes['class'] = outcomes['class'].map({1: 'Success', 0: 'Failure'}).fillna(outcomes['class'])
         fig = px.pie(outcomes, values='count', names='class',
@@ -84,13 +115,17 @@ def get_pie_chart(entered_site):
               Input(component_id='site-dropdown', component_property='value'),
               Input(component_id='payload-slider', component_property='value'))
 def get_scatter_chart(entered_site, payload_range):
-    low, high = payload_range
-    mask = (spacex_df['Payload Mass (kg)'] >= low) & (spacex_df['Payload Mass (kg)'] <= high)
-    filtered_df = spacex_df[mask]
-    if entered_site != 'ALL':
-        filtered_df = filtered_df[filtered_df['Launch Site'] == entered_site]
+    low, high = quantize_range(*payload_range, payload_step, int(launch_cube.get().min_payload))
+    return get_scatter_figure(entered_site, low, high)
+
+
+@figure_cache.memoize(dataset_version)
+def get_scatter_figure(entered_site, low, high):
+    cube = launch_cube.get()
+    # Launches of the site (or of all sites) in the payload range, by binary search
+    filtered_df = cube.payload_frame(entered_site, low, high)
     # create scatter plot: payload vs outcome, colored by booster version category if available
-    color_col = 'Booster Version Category' if 'Booster Version Category' in spacex_df.columns else None
+    color_col = 'Booster Version Category' if 'Booster Version Category' in cube.df.columns else None
     fig = px.scatter(filtered_df, x='Payload Mass (kg)', y='class',
                      color=color_col,
                      title='Payload vs. Launch Outcome',
@@ -98,6 +133,8 @@ def get_scatter_chart(entered_site, payload_range):
     return fig
 
 
-# Run the app
+# Run the app (development server; see wsgi.py for production)
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(host=os.environ.get('SPACEX_DASH_HOST', '127.0.0.1'),
+            port=int(os.environ.get('SPACEX_DASH_PORT', 8050)),
+            debug=os.environ.get('SPACEX_DASH_DEBUG', '') not in ('', '0'))
\ No newline at end of file
@@ -0,0 +1,187 @@
+# Helpers for enriching SpaceX API v4 launch records with rocket, launchpad,
+# payload and core details.
+#
+# Instead of one blocking request per launch row, the unique IDs of every
+# resource type are collected first, fetched concurrently over one pooled
+# session and then joined back onto the launch rows in bulk.
+
+import requests
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+SPACEX_API_URL = "https://api.spacexdata.com/v4"
+
+# Number of requests kept in flight at the same time
+DEFAULT_MAX_WORKERS = 16
+
+# For each resource type: the launch column holding its ID and the fields we
+# copy from the fetched document, keyed by the dataset_part_1.csv column name
+RESOURCE_FIELDS = {
+    'rockets': ('rocket', {'BoosterVersion': 'name'}),
+    'launchpads': ('launchpad', {'LaunchSite': 'name',
+                                 'Longitude': 'longitude',
+                                 'Latitude': 'latitude'}),
+    'payloads': ('payloads', {'PayloadMass': 'mass_kg',
+                              'Orbit': 'orbit'}),
+    'cores': ('core', {'Block': 'block',
+                       'ReusedCount': 'reuse_count',
+                       'Serial': 'serial'}),
+}
+
+# Path of each resource inside a launch document, for server-side populate
+POPULATE_PATHS = {'rockets': 'rocket',
+                  'launchpads': 'launchpad',
+                  'payloads': 'payloads',
+                  'cores': 'cores.core'}
+
+# Column order of the launch dataframe written to dataset_part_1.csv
+LAUNCH_COLUMNS = ['FlightNumber', 'Date', 'BoosterVersion', 'PayloadMass', 'Orbit',
+                  'LaunchSite', 'Outcome', 'Flights', 'GridFins', 'Reused', 'Legs',
+                  'LandingPad', 'Block', 'ReusedCount', 'Serial', 'Longitude', 'Latitude']
+
+
+# Create a requests session whose connection pool is large enough for the workers
+def make_session(pool_size=DEFAULT_MAX_WORKERS):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Fetch a single resource document, e.g. /rockets/<id>
+def fetch_resource(session, resource, resource_id, base_url=SPACEX_API_URL):
+    response = session.get(f"{base_url}/{resource}/{resource_id}", timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+# Fetch every unique ID of every resource type concurrently
+# ids_by_resource maps a resource name ('rockets', 'cores', ...) to an iterable of IDs
+# Returns {resource: {id: document}}
+def fetch_resources(ids_by_resource, session=None, base_url=SPACEX_API_URL,
+                    max_workers=DEFAULT_MAX_WORKERS):
+    session = session or make_session(max_workers)
+
+    # Drop empty IDs and duplicates while keeping the first-seen order
+    unique_ids = {resource: list(dict.fromkeys(i for i in ids if pd.notna(i) and i))
+                  for resource, ids in ids_by_resource.items()}
+
+    # One shared pool, so the four resource types are fetched side by side
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {resource: {resource_id: executor.submit(fetch_resource, session, resource,
+                                                           resource_id, base_url)
+                              for resource_id in resource_ids}
+                   for resource, resource_ids in unique_ids.items()}
+        return {resource: {resource_id: future.result() for resource_id, future in pending.items()}
+                for resource, pending in futures.items()}
+
+
+# Build the launch dataframe from launch rows whose IDs can be resolved by `resolve`
+# resolve(column, field) returns the field of the document referenced by each row
+def build_launch_frame(data, resolve):
+    launch_df = pd.DataFrame({'FlightNumber': data['flight_number'],
+                              'Date': data['date_utc']})
+
+    for column, fields in RESOURCE_FIELDS.values():
+        for name, field in fields.items():
+            launch_df[name] = resolve(column, field)
+
+    # The remaining core information comes from the launch record itself
+    cores = pd.DataFrame(list(data['cores']), index=data.index,
+                         columns=['flight', 'gridfins', 'reused', 'legs', 'landpad'])
+    launch_df['Outcome'] = data['cores'].map(lambda core: str(core['landing_success']) + ' ' +
+                                                       str(core['landing_type']))
+    launch_df['Flights'] = cores['flight']
+    launch_df['GridFins'] = cores['gridfins']
+    launch_df['Reused'] = cores['reused']
+    launch_df['Legs'] = cores['legs']
+    launch_df['LandingPad'] = cores['landpad']
+
+    return launch_df[LAUNCH_COLUMNS].reset_index(drop=True)
+
+
+# Build the launch dataframe from the filtered launch rows
+# `data` must hold one core dict per row in `cores` and one payload ID per row in `payloads`
+def enrich_launches(data, session=None, base_url=SPACEX_API_URL,
+                    max_workers=DEFAULT_MAX_WORKERS):
+    id_columns = {'rocket': data['rocket'],
+                  'launchpad': data['launchpad'],
+                  'payloads': data['payloads'],
+                  'core': data['cores'].map(lambda core: core['core'])}
+
+    documents = fetch_resources({resource: id_columns[column]
+                                 for resource, (column, _) in RESOURCE_FIELDS.items()},
+                                session=session, base_url=base_url, max_workers=max_workers)
+
+    # Join the fetched documents back onto the launch rows, one column at a time
+    columns_to_resource = {column: resource for resource, (column, _) in RESOURCE_FIELDS.items()}
+
+    def resolve(column, field):
+        docs = documents[columns_to_resource[column]]
+        return id_columns[column].map({i: doc[field] for i, doc in docs.items()})
+
+    return build_launch_frame(data, resolve)
+
+
+# Body of a /launches/query request that does the filtering of datacollection_part1.py
+# on the server: past launches up to `cutoff` with exactly one core and one payload,
+# with the rocket, launchpad, payload and core documents populated in the same response
+# `after_flight_number` restricts the query to launches newer than an earlier run
+def build_launch_query(cutoff=None, after_flight_number=None, page=1, limit=100):
+    query = {'upcoming': False,
+             'cores': {'$size': 1},
+             'payloads': {'$size': 1}}
+    if cutoff is not None:
+        query['date_utc'] = {'$lte': f"{cutoff.isoformat()}T23:59:59.999Z"}
+    if after_flight_number is not None:
+        query['flight_number'] = {'$gt': int(after_flight_number)}
+
+    populate = [{'path': path, 'select': {field: 1 for field in RESOURCE_FIELDS[resource][1].values()}}
+                for resource, path in POPULATE_PATHS.items()]
+
+    return {'query': query,
+            'options': {'select': ['flight_number', 'date_utc', 'rocket', 'launchpad', 'payloads', 'cores'],
+                        'populate': populate,
+                        'sort': {'flight_number': 'asc'},
+                        'page': page,
+                        'limit': limit}}
+
+
+# Run a launch query page by page and return the matching launch documents
+def query_launch_docs(session=None, base_url=SPACEX_API_URL, page_size=100, **query):
+    session = session or make_session()
+    docs = []
+    page = 1
+    while page:
+        body = build_launch_query(page=page, limit=page_size, **query)
+        response = session.post(f"{base_url}/launches/query", json=body, timeout=30)
+        response.raise_for_status()
+        result = response.json()
+        docs.extend(result['docs'])
+        page = result.get('nextPage') if result.get('hasNextPage') else None
+    return docs
+
+
+# Collect the launch dataframe with the query endpoint instead of one lookup per ID
+def query_launches(session=None, base_url=SPACEX_API_URL, cutoff=None,
+                   after_flight_number=None, page_size=100):
+    docs = query_launch_docs(session=session, base_url=base_url, page_size=page_size,
+                             cutoff=cutoff, after_flight_number=after_flight_number)
+
+    data = pd.DataFrame(docs, columns=['flight_number', 'date_utc', 'rocket', 'launchpad', 'payloads', 'cores'])
+    data['payloads'] = data['payloads'].map(lambda x: x[0])
+    data['cores'] = data['cores'].map(lambda x: x[0])
+    data['date_utc'] = pd.to_datetime(data['date_utc']).dt.date
+
+    # Populated documents are embedded in the rows, so resolving is a plain lookup
+    populated = {'rocket': data['rocket'],
+                 'launchpad': data['launchpad'],
+                 'payloads': data['payloads'],
+                 'core': data['cores'].map(lambda core: core['core'])}
+
+    def resolve(column, field):
+        return populated[column].map(lambda doc: doc.get(field) if isinstance(doc, dict) else None)
+
+    return build_launch_frame(data, resolve)
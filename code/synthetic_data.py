@@ -0,0 +1,253 @@
+# Synthetic launch datasets of any size, for load and scale testing.
+#
+# The generator learns from the shipped datasets - dataset_part_2.csv,
+# spacex_launch_geo.csv and Spacex.csv - and emits tables with exactly their
+# columns and dtypes, from a few thousand to tens of millions of rows:
+#
+#   dataset_part_1      dataset_part_2 without the Class label
+#   dataset_part_2      API launches with the Class label
+#   spacex_launch_geo   launches with site coordinates
+#   spacex_launch_dash  the dashboard columns of spacex_launch_geo
+#   Spacex              the SQL dataset
+#
+# Every synthetic row copies the categorical fields of a real launch drawn from
+# the same part of the launch history (the source rows are split into time bins),
+# so the joint distribution of orbit, site, landing pad, block, outcome and class,
+# and the way it drifts over time, is kept. Payload masses are jittered. Flight
+# numbers and dates are regenerated to span the original date range, and core
+# serials are rebuilt as reuse chains: a first flight starts a new booster, a
+# reflight reuses an active booster of the same block or version, and a booster
+# retires after a lifetime drawn from the real ones.
+#
+# Rows are produced in chunks with a seeded generator, so a given seed and chunk
+# size always give the same data and memory stays flat whatever the size.
+#
+# Usage:
+#   python synthetic_data.py --rows 1000000 --output-dir synthetic/
+#   python synthetic_data.py --rows 10000000 --datasets dataset_part_2 --format parquet --seed 7
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'datasets')
+
+DEFAULT_CHUNK_SIZE = 100000
+DEFAULT_BINS = 10
+
+DATASETS = ['dataset_part_1', 'dataset_part_2', 'spacex_launch_geo', 'spacex_launch_dash', 'Spacex']
+
+# Booster version prefix and core serial (with an optional flight suffix) in "F9 B5 B1049.4"
+VERSION_PATTERN = r'^(F9\s+(?:v\d\.\d|FT|B\d))'
+SERIAL_PATTERN = r'B(\d{4})(?:\.(\d+))?'
+
+
+# A source table ready to sample from
+class Template:
+
+    def __init__(self, df, era, first_flight, lifetime, bins=DEFAULT_BINS, prefix=None):
+        self.df = df.reset_index(drop=True)
+        # Booster version up to the core serial ("F9 B5 "), for tables that embed the serial
+        self.prefix = None if prefix is None else np.asarray(prefix, dtype=object)
+        self.era = np.asarray(era, dtype=object)
+        self.first_flight = np.asarray(first_flight, dtype=bool)
+        self.lifetime = np.asarray(lifetime, dtype='int64')
+        # Rows are in launch order; bin b holds the rows of the b-th slice of the history
+        self.bins = np.array_split(np.arange(len(self.df)), bins)
+
+    # Source row for every relative position (0 = first launch, 1 = last) in the history
+    def sample(self, positions, rng):
+        bins = np.minimum((positions * len(self.bins)).astype('int64'), len(self.bins) - 1)
+        starts = np.array([b[0] for b in self.bins])
+        sizes = np.array([len(b) for b in self.bins])
+        return starts[bins] + (rng.random(len(positions)) * sizes[bins]).astype('int64')
+
+
+def _part_2_template(directory, bins):
+    df = pd.read_csv(os.path.join(directory, 'dataset_part_2.csv'))
+    lifetime = np.maximum(df['ReusedCount'] + 1, df['Flights'])
+    return Template(df, df['Block'], df['Flights'] == 1, lifetime, bins)
+
+
+def _versioned_template(df, column, bins):
+    serial = df[column].str.extract(SERIAL_PATTERN)
+    flight = pd.to_numeric(serial[1], errors='coerce')
+    # Lifetime of a core: its highest flight suffix in the source
+    lifetime = flight.groupby(serial[0]).transform('max').fillna(1)
+    # Versions without a serial ("F9 v1.1") are copied unchanged, so they never start a chain
+    era = df[column].str.extract(VERSION_PATTERN)[0].where(serial[0].notna())
+    prefix = df[column].str.extract(r'^(.*?)B\d{4}')[0]
+    return Template(df, era, flight.isna() | (flight == 1), lifetime, bins, prefix)
+
+
+def load_templates(directory=DATASETS_DIR, bins=DEFAULT_BINS):
+    geo = pd.read_csv(os.path.join(directory, 'spacex_launch_geo.csv'))
+    sql = pd.read_csv(os.path.join(directory, 'Spacex.csv'))
+    return {'dataset_part_2': _part_2_template(directory, bins),
+            'spacex_launch_geo': _versioned_template(geo, 'Booster Version', bins),
+            'Spacex': _versioned_template(sql, 'Booster_Version', bins)}
+
+
+# Core serial reuse chains, carried over from chunk to chunk
+class BoosterChains:
+
+    def __init__(self, first_serial=1000):
+        self.next_serial = first_serial
+        # era -> list of [serial, flights so far, lifetime]
+        self.active = {}
+
+    # Serial and flight count of every row; rows with a missing era get (-1, 0)
+    def assign(self, era, first_flight, lifetime, rng):
+        serials = np.full(len(era), -1, dtype='int64')
+        flights = np.zeros(len(era), dtype='int64')
+        lifetimes = np.zeros(len(era), dtype='int64')
+        picks = rng.random(len(era))
+        for i in np.flatnonzero(pd.notna(era)):
+            active = self.active.setdefault(era[i], [])
+            if first_flight[i] or not active:
+                active.append([self.next_serial, 0, max(1, int(lifetime[i]))])
+                self.next_serial += 1
+                j = len(active) - 1
+            else:
+                j = int(picks[i] * len(active))
+            booster = active[j]
+            booster[1] += 1
+            serials[i], flights[i], lifetimes[i] = booster
+            if booster[1] >= booster[2]:
+                # Swap with the last booster so retiring one stays O(1)
+                active[j] = active[-1]
+                active.pop()
+        return serials, flights, lifetimes
+
+
+# Dates spread evenly over the source date range, as YYYY-MM-DD strings
+def _dates(source_dates, positions):
+    dates = pd.to_datetime(source_dates)
+    first = dates.min().to_datetime64().astype('datetime64[D]')
+    span = (dates.max() - dates.min()).days
+    return (first + (positions * span).astype('int64')).astype(str)
+
+
+# Multiplicative noise that keeps zero masses at zero
+def _jitter(values, rng, scale=0.1):
+    return values * np.exp(rng.normal(0, scale, len(values)))
+
+
+# Booster versions like "F9 B5 B1049.4" with the chained core serial and flight
+def _booster_versions(versions, prefix, serials, flights):
+    chained = serials >= 0
+    versions = versions.to_numpy(dtype=object, copy=True)
+    versions[chained] = prefix[chained] + 'B' + serials[chained].astype(str).astype(object) + '.' \
+        + flights[chained].astype(str).astype(object)
+    return versions
+
+
+# Yield synthetic rows of one source table in chunks
+def _table_chunks(template, name, rows, chunk_size, rng):
+    chains = BoosterChains()
+    source = template.df
+    for start in range(0, rows, chunk_size):
+        positions = (np.arange(start, min(start + chunk_size, rows)) + 0.5) / rows
+        index = template.sample(positions, rng)
+        chunk = source.iloc[index].reset_index(drop=True)
+        serials, flights, lifetimes = chains.assign(template.era[index], template.first_flight[index],
+                                                    template.lifetime[index], rng)
+        numbers = np.arange(start + 1, start + len(chunk) + 1)
+
+        if name == 'dataset_part_2':
+            chunk['FlightNumber'] = numbers
+            chunk['Date'] = _dates(source['Date'], positions)
+            chunk['PayloadMass'] = _jitter(chunk['PayloadMass'].to_numpy(), rng)
+            chunk['Serial'] = [f"B{serial:04d}" for serial in serials]
+            chunk['Flights'] = flights
+            chunk['Reused'] = flights > 1
+            chunk['ReusedCount'] = lifetimes - 1
+        elif name == 'spacex_launch_geo':
+            chunk['Flight Number'] = numbers
+            chunk['Date'] = _dates(source['Date'], positions)
+            chunk['Payload Mass (kg)'] = _jitter(chunk['Payload Mass (kg)'].to_numpy(), rng).round(1)
+            chunk['Booster Version'] = _booster_versions(chunk['Booster Version'], template.prefix[index],
+                                                              serials, flights)
+        else:
+            chunk['Date'] = _dates(source['Date'], positions)
+            chunk['PAYLOAD_MASS__KG_'] = _jitter(chunk['PAYLOAD_MASS__KG_'].to_numpy(), rng).round().astype('int64')
+            chunk['Booster_Version'] = _booster_versions(chunk['Booster_Version'], template.prefix[index],
+                                                              serials, flights)
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        yield chunk[source.columns]
+
+
+# Yield one dataset of `rows` rows in chunks of at most `chunk_size` rows
+def generate(name, rows, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, templates=None):
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset {name!r}, expected one of {DATASETS}")
+    templates = templates or load_templates()
+    # The derived datasets use the same stream as their source, so they agree row by row
+    source = {'dataset_part_1': 'dataset_part_2', 'spacex_launch_dash': 'spacex_launch_geo'}.get(name, name)
+    rng = np.random.default_rng([seed, DATASETS.index(source)])
+    for chunk in _table_chunks(templates[source], source, rows, chunk_size, rng):
+        if name == 'dataset_part_1':
+            chunk = chunk.drop(columns=['Class'])
+        elif name == 'spacex_launch_dash':
+            chunk = chunk[['Flight Number', 'Launch Site', 'class', 'Payload Mass (kg)', 'Booster Version']].assign(
+                **{'Booster Version Category': chunk['Booster Version'].str.extract(VERSION_PATTERN)[0]
+                   .str.replace('F9 ', '', regex=False)})
+        yield chunk
+
+
+# Write chunks to a CSV or Parquet file without holding the whole dataset
+# The dash dataset keeps its unnamed index column, like the shipped CSV
+def write_chunks(chunks, path, index=False):
+    writer = None
+    try:
+        for i, chunk in enumerate(chunks):
+            if path.endswith('.parquet'):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pq.ParquetWriter(path, table.schema, compression='zstd')
+                writer.write_table(table)
+            else:
+                chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=index)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def write_datasets(directory, rows, seed=0, datasets=DATASETS, fmt='csv', chunk_size=DEFAULT_CHUNK_SIZE):
+    if fmt == 'parquet' and pa is None:
+        raise ImportError("pyarrow is required to write parquet datasets")
+    os.makedirs(directory, exist_ok=True)
+    templates = load_templates()
+    paths = []
+    for name in datasets:
+        # The dashboard reads its CSV directly
+        extension = 'csv' if name == 'spacex_launch_dash' else fmt
+        path = os.path.join(directory, f"{name}.{extension}")
+        paths.append(write_chunks(generate(name, rows, seed, chunk_size, templates), path,
+                                  index=name == 'spacex_launch_dash'))
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic SpaceX launch datasets")
+    parser.add_argument('--rows', type=int, required=True, help="rows per dataset")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--datasets', nargs='+', default=DATASETS, choices=DATASETS)
+    parser.add_argument('--output-dir', default='synthetic')
+    parser.add_argument('--format', default='csv', choices=['csv', 'parquet'])
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    for path in write_datasets(args.output_dir, args.rows, args.seed, args.datasets, args.format, args.chunk_size):
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
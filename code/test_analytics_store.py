@@ -0,0 +1,56 @@
+# Tests of analytics_store.py: the scraped launch table in both of its schemas, and
+# reloading a source.
+#
+# Usage:
+#   python -m pytest test_analytics_store.py
+
+import os
+import pandas as pd
+from analytics_store import AnalyticsStore, api_launches
+from artifacts import read_artifact, write_artifact
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'datasets')
+
+COLUMNS = ['Flight_Number', 'Date', 'Time (UTC)', 'Serial', 'Booster_Version', 'Booster_Version_Category',
+           'Launch_Site', 'Launch_Area', 'PAYLOAD_MASS__KG_', 'Orbit', 'Mission_Outcome', 'Landing_Outcome']
+
+
+def load_wiki(tmp_path, df, fmt):
+    directory = tmp_path / fmt
+    directory.mkdir()
+    write_artifact(df, 'spacex_web_scraped', fmt=fmt, directory=str(directory))
+    with AnalyticsStore(str(directory / 'launches.db')) as store:
+        assert store.load(['wiki'], directory=str(directory)) == {'wiki': len(df)}
+        return store.launches(source='wiki', columns=COLUMNS)
+
+
+def test_wiki_source_reads_the_normalized_artifact(tmp_path, launch_frame):
+    launches = load_wiki(tmp_path, launch_frame(), 'parquet')
+
+    assert launches['Date'].tolist() == ['2010-06-04', '2012-10-08', '2013-09-29', '2013-12-03', '2014-01-06']
+    assert launches['Time (UTC)'].tolist() == ['18:45:00', '00:35:00', '16:00:00', '22:41:00', '22:06:00']
+    assert launches['Serial'].fillna('-').tolist() == ['B0003', 'B0004', 'B1003', '-', '-']
+    assert launches['Booster_Version_Category'].fillna('-').tolist() == ['v1.0', 'v1.0', 'v1.1', '-', '-']
+    assert launches['Launch_Area'].tolist() == ['CCAFS', 'CCAFS', 'VAFB', 'CCAFS', 'CCAFS']
+    assert launches['PAYLOAD_MASS__KG_'].isna().tolist() == [True, False, False, False, False]
+    assert launches['Landing_Outcome'].tolist() == ['Failure', 'No attempt', 'Uncontrolled (ocean)', 'No attempt',
+                                                    'No attempt']
+
+def test_wiki_source_reads_a_raw_scrape(tmp_path, launch_frame):
+    normalized = load_wiki(tmp_path, launch_frame(), 'parquet')
+    raw = load_wiki(tmp_path, launch_frame(raw=True), 'csv')
+
+    pd.testing.assert_frame_equal(raw, normalized)
+
+
+def test_reloading_a_source_replaces_stale_rates(tmp_path):
+    df = read_artifact('dataset_part_2', directory=DATASETS_DIR)
+    with AnalyticsStore(str(tmp_path / 'launches.db')) as store:
+        store.load_frame('api', api_launches(df.assign(Class=1 - df['Class'])))
+        store.load_frame('api', api_launches(df))
+        rates = store.success_rates('Orbit').set_index('Orbit')['success_rate']
+        yearly = store.yearly_success_rates().set_index('Year')['success_rate']
+
+    pd.testing.assert_series_equal(rates, df.groupby('Orbit')['Class'].mean(), check_names=False)
+    pd.testing.assert_series_equal(yearly, df.groupby(pd.to_datetime(df['Date']).dt.year)['Class'].mean(), check_names=False,
+                                   check_index_type=False)
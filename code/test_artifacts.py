@@ -0,0 +1,23 @@
+# Tests of artifacts.py: which stored copy of an artifact is read.
+#
+# Usage:
+#   python -m pytest test_artifacts.py
+
+import pandas as pd
+import artifacts
+from artifacts import artifact_paths, read_artifact, write_artifact
+
+
+def test_read_the_configured_format_after_switching(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    monkeypatch.setattr(artifacts, 'DEFAULT_FORMAT', 'parquet')
+    write_artifact(pd.DataFrame({'a': [1]}), 'stage', directory=directory)
+
+    monkeypatch.setattr(artifacts, 'DEFAULT_FORMAT', 'csv')
+    write_artifact(pd.DataFrame({'a': [2]}), 'stage', directory=directory)
+    assert [fmt for fmt, _ in artifact_paths('stage', directory)] == ['csv', 'parquet']
+    assert read_artifact('stage', directory=directory)['a'].tolist() == [2]
+
+    monkeypatch.setattr(artifacts, 'DEFAULT_FORMAT', 'arrow')
+    assert [fmt for fmt, _ in artifact_paths('stage', directory)] == ['parquet', 'csv']
+    assert read_artifact('stage', directory=directory)['a'].tolist() == [1]
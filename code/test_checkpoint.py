@@ -0,0 +1,36 @@
+# Tests of the incremental append of checkpoint.py.
+#
+# Usage:
+#   python -m pytest test_checkpoint.py
+
+import numpy as np
+import pandas as pd
+from checkpoint import append_falcon9_launches
+
+
+def launches(flight_numbers, masses):
+    return pd.DataFrame({'FlightNumber': flight_numbers,
+                         'Date': [f'2020-01-{n:02d}' for n in flight_numbers],
+                         'BoosterVersion': ['Falcon 9'] * len(flight_numbers),
+                         'PayloadMass': masses})
+
+
+def test_incremental_append_matches_full_rebuild():
+    full = launches([3, 4, 6, 8], [100.0, np.nan, 300.0, np.nan])
+    rebuilt, _ = append_falcon9_launches(full)
+
+    first, state = append_falcon9_launches(full.iloc[:2])
+    appended, _ = append_falcon9_launches(full.iloc[2:], first, state)
+
+    pd.testing.assert_frame_equal(appended, rebuilt)
+    assert rebuilt['FlightNumber'].tolist() == [1, 2, 3, 4]
+    assert rebuilt['PayloadMass'].tolist() == [100.0, 200.0, 300.0, 200.0]
+
+
+def test_run_without_new_launches_keeps_integer_flight_numbers():
+    previous, state = append_falcon9_launches(launches([1, 2], [100.0, np.nan]))
+    combined, new_state = append_falcon9_launches(launches([], []), previous, state)
+
+    assert combined['FlightNumber'].dtype == 'int64'
+    pd.testing.assert_frame_equal(combined, previous)
+    assert new_state['flight_number'] == state['flight_number']
@@ -0,0 +1,154 @@
+# Tests of http_cache.py against a local stub server that answers conditional
+# requests: TTL expiry, ETag / Last-Modified revalidation, LRU eviction and
+# the offline mode.
+#
+# Usage:
+#   python -m pytest test_http_cache.py
+
+import json
+import hashlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import http_cache
+from http_cache import CacheMiss, CachedSession
+
+LAST_MODIFIED = 'Wed, 01 Jan 2025 00:00:00 GMT'
+
+
+# Serves `documents` with an ETag (a hash of the body) and a Last-Modified date
+# and records the status of every answer per path
+class StubServer(ThreadingHTTPServer):
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.documents = {'/v4/cores/c1': {'serial': 'B0003'}, '/v4/cores/c2': {'serial': 'B1049'},
+                          '/v4/cores/c3': {'serial': 'B1060'}}
+        self.answers = Counter()
+        self.conditional = []
+        self.lock = threading.Lock()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        body = json.dumps(self.server.documents[self.path]).encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        status = 304 if self.headers.get('If-None-Match') == etag else 200
+        with self.server.lock:
+            self.server.answers[self.path, status] += 1
+            if 'If-None-Match' in self.headers:
+                self.server.conditional.append((self.headers['If-None-Match'], self.headers['If-Modified-Since']))
+        self.send_response(status)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.send_header('Content-Length', '0' if status == 304 else str(len(body)))
+        self.end_headers()
+        if status == 200:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# Stands in for the time module of http_cache.py, so entries age on demand
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(http_cache, 'time', clock)
+    return clock
+
+
+def make_cache(tmp_path, **kwargs):
+    kwargs.setdefault('offline', False)
+    return CachedSession(str(tmp_path / 'cache.sqlite'), ttls=[('/v4/cores/', 60)], **kwargs)
+
+
+def test_fresh_entries_are_served_from_the_cache(tmp_path, stub_server, clock):
+    cache = make_cache(tmp_path)
+    first = cache.get(stub_server.url('/v4/cores/c1'))
+    clock.now += 59
+    second = cache.get(stub_server.url('/v4/cores/c1'))
+
+    assert first.from_cache is False and second.from_cache is True
+    assert second.json() == {'serial': 'B0003'}
+    assert cache.network_calls == 1
+    assert stub_server.answers == Counter({('/v4/cores/c1', 200): 1})
+
+
+def test_stale_entries_are_revalidated(tmp_path, stub_server, clock):
+    cache = make_cache(tmp_path)
+    etag = cache.get(stub_server.url('/v4/cores/c1')).headers['ETag']
+
+    # Unchanged: a 304, answered with the cached body
+    clock.now += 61
+    unchanged = cache.get(stub_server.url('/v4/cores/c1'))
+    assert unchanged.from_cache is True
+    assert unchanged.json() == {'serial': 'B0003'}
+    assert stub_server.conditional == [(etag, LAST_MODIFIED)]
+
+    # The 304 renewed the entry
+    clock.now += 59
+    cache.get(stub_server.url('/v4/cores/c1'))
+    assert cache.network_calls == 2
+
+    # Changed: the new body replaces the cached one
+    stub_server.documents['/v4/cores/c1'] = {'serial': 'B0003', 'reuse_count': 1}
+    clock.now += 61
+    changed = cache.get(stub_server.url('/v4/cores/c1'))
+    assert changed.from_cache is False
+    assert cache.get(stub_server.url('/v4/cores/c1')).json() == {'serial': 'B0003', 'reuse_count': 1}
+    assert stub_server.answers == Counter({('/v4/cores/c1', 200): 2, ('/v4/cores/c1', 304): 1})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, stub_server, clock):
+    # Room for two of the three documents
+    cache = make_cache(tmp_path, max_bytes=2 * len(json.dumps({'serial': 'B0003'})))
+    for path in ('/v4/cores/c1', '/v4/cores/c2'):
+        cache.get(stub_server.url(path))
+        clock.now += 1
+    # Reading c1 makes c2 the least recently used entry
+    cache.get(stub_server.url('/v4/cores/c1'))
+    clock.now += 1
+    cache.get(stub_server.url('/v4/cores/c3'))
+
+    assert cache.network_calls == 3
+    for path in ('/v4/cores/c1', '/v4/cores/c3', '/v4/cores/c2'):
+        cache.get(stub_server.url(path))
+    assert cache.network_calls == 4
+    assert stub_server.answers[('/v4/cores/c2', 200)] == 2
+
+
+def test_offline_mode_serves_only_the_cache(tmp_path, stub_server, clock):
+    make_cache(tmp_path).get(stub_server.url('/v4/cores/c1'))
+    offline = make_cache(tmp_path, offline=True)
+
+    # Stale entries are still served
+    clock.now += 3600
+    assert offline.get(stub_server.url('/v4/cores/c1')).json() == {'serial': 'B0003'}
+    with pytest.raises(CacheMiss):
+        offline.get(stub_server.url('/v4/cores/c2'))
+    assert offline.network_calls == 0
+    assert sum(stub_server.answers.values()) == 1
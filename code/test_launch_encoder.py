@@ -0,0 +1,38 @@
+# Tests of launch_encoder.py: the sparse encoding and its dense view.
+#
+# Usage:
+#   python -m pytest test_launch_encoder.py
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from launch_encoder import LaunchEncoder
+
+LAUNCHES = pd.DataFrame({'FlightNumber': [1, 2, 3, 4], 'PayloadMass': [500.0, 0.0, 3170.0, 3325.0],
+                         'Flights': [1, 1, 2, 1], 'GridFins': [False, True, True, False],
+                         'Reused': [False, False, True, False], 'Legs': [False, True, True, True],
+                         'Block': [1.0, 1.0, 2.0, 3.0], 'ReusedCount': [0, 0, 1, 0],
+                         'Orbit': ['LEO', 'GTO', 'GTO', 'ISS'], 'LaunchSite': ['CCAFS SLC 40'] * 4,
+                         'LandingPad': [None, 'OCISLY', 'OCISLY', None], 'Serial': ['B0003', 'B1003', 'B1003', 'B1004']})
+
+
+def test_transform_is_sparse_and_matches_the_dense_view():
+    encoder = LaunchEncoder().fit(LAUNCHES)
+    matrix = encoder.transform(LAUNCHES)
+
+    assert sparse.isspmatrix_csr(matrix)
+    assert matrix.shape == (4, len(encoder.feature_names()))
+    np.testing.assert_array_equal(matrix.toarray(), encoder.transform_frame(LAUNCHES).to_numpy())
+    # The one-hot block holds one entry per launch and present category
+    assert matrix[:, 8:].nnz == 4 * 4 - 2
+
+
+def test_unknown_categories_and_chunks():
+    encoder = LaunchEncoder().fit(LAUNCHES.iloc[:3])
+    chunks = sparse.vstack(list(encoder.transform_chunks([LAUNCHES.iloc[:2], LAUNCHES.iloc[2:]])))
+    frame = encoder.transform_frame(LAUNCHES)
+
+    np.testing.assert_array_equal(chunks.toarray(), frame.to_numpy())
+    assert frame.loc[3, encoder.unknown_names()].tolist() == [1.0, 0.0, 0.0, 1.0]
+    assert frame.drop(columns=encoder.unknown_names()).columns.tolist() == \
+        list(pd.get_dummies(LAUNCHES.iloc[:3], columns=['Orbit', 'LaunchSite', 'LandingPad', 'Serial']).columns)
@@ -0,0 +1,26 @@
+# Tests of model_selection.py: the budgets of the random and Bayesian searches.
+#
+# Usage:
+#   python -m pytest test_model_selection.py
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from model_selection import RandomStrategy, SearchResult, SearchSpec, run_searches
+
+X = np.random.default_rng(0).normal(size=(40, 3))
+Y = (X[:, 0] > 0).astype(int)
+SPEC = SearchSpec('logreg', LogisticRegression(), {'C': [0.01, 0.1, 1, 10]})
+
+
+def test_zero_time_budget_still_evaluates_one_batch(tmp_path):
+    searches = run_searches([SPEC], X, Y, cv=3, n_jobs=1, cache_dir=str(tmp_path),
+                            strategy=RandomStrategy(time_budget=0, batch_size=2))
+
+    assert len(searches['logreg'].cv_results_['params']) == 2
+    assert searches['logreg'].best_estimator_ is not None
+
+
+def test_no_evaluated_candidate_names_the_budget():
+    with pytest.raises(ValueError, match='SPACEX_SEARCH_TIME_BUDGET'):
+        SearchResult('logreg', LogisticRegression(), [], [])
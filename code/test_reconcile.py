@@ -0,0 +1,34 @@
+# Tests of reconcile.py on the scraped launch table, in both of its schemas.
+#
+# Usage:
+#   python -m pytest test_reconcile.py
+
+import pandas as pd
+from reconcile import reconcile
+
+API = pd.DataFrame({'FlightNumber': [1, 2, 3, 4],
+                    'Date': ['2010-06-04', '2013-09-29', '2013-12-04', '2014-03-01'],
+                    'LaunchSite': ['CCSFS SLC 40', 'VAFB SLC 4E', 'CCSFS SLC 40', 'CCSFS SLC 40'],
+                    'Serial': ['B0003', 'B1003', 'B1004', 'B1006'],
+                    'Orbit': ['LEO', 'PO', 'GTO', 'GTO'],
+                    'PayloadMass': [None, 500.0, 4000.0, 3325.0],
+                    'Outcome': ['False Ocean', 'False Ocean', 'None None', 'None None']})
+
+
+def test_reconcile_the_normalized_artifact(launch_frame):
+    result = reconcile(API, launch_frame())
+
+    assert result['match'].tolist() == ['serial', 'wiki_only', 'serial', 'fuzzy', 'wiki_only', 'api_only']
+    assert result['api_row'].fillna(-1).tolist() == [0, -1, 1, 2, -1, 3]
+    assert result['wiki_row'].fillna(-1).tolist() == [0, 1, 2, 3, 4, -1]
+    assert result['mass_conflict'].tolist() == [False, False, False, True, False, False]
+    assert result['date_conflict'].tolist() == [False, False, False, True, False, False]
+    assert result['landing_conflict'].sum() == 0
+    assert result['orbit_conflict'].sum() == 0
+
+
+def test_reconcile_a_raw_scrape(launch_frame):
+    normalized = reconcile(API, launch_frame())
+    raw = reconcile(API, launch_frame(raw=True))
+
+    pd.testing.assert_frame_equal(raw, normalized)
@@ -0,0 +1,181 @@
+# Tests of spacex_api.py against a local stub of the SpaceX API: the resource
+# endpoints used by enrich_launches() and a fake of the /launches/query endpoint.
+#
+# Usage:
+#   python -m pytest test_spacex_api.py
+
+import json
+import datetime
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import requests
+import pytest
+from spacex_api import enrich_launches, make_session, query_launches
+
+DOCUMENTS = {
+    '/rockets/falcon9': {'name': 'Falcon 9'},
+    '/launchpads/slc40': {'name': 'CCSFS SLC 40', 'longitude': -80.577366, 'latitude': 28.5618571},
+    '/launchpads/lc39a': {'name': 'KSC LC 39A', 'longitude': -80.6039558, 'latitude': 28.6080585},
+    '/payloads/p1': {'mass_kg': 525.0, 'orbit': 'LEO'},
+    '/payloads/p2': {'mass_kg': None, 'orbit': 'GTO'},
+    '/payloads/p3': {'mass_kg': 3700.0, 'orbit': 'ISS'},
+    '/cores/c1': {'block': 1, 'reuse_count': 0, 'serial': 'B0003'},
+    '/cores/c2': {'block': 5, 'reuse_count': 3, 'serial': 'B1049'},
+}
+
+
+def core(core_id, landing_success=True, landing_type='ASDS'):
+    return {'core': core_id, 'flight': 1, 'gridfins': True, 'reused': False, 'legs': True,
+            'landpad': None, 'landing_success': landing_success, 'landing_type': landing_type}
+
+
+# Launch documents of the fake query endpoint, with their references populated
+def launch_doc(flight_number, date_utc, launchpad, payloads, cores, upcoming=False):
+    return {'flight_number': flight_number, 'date_utc': date_utc, 'upcoming': upcoming,
+            'rocket': DOCUMENTS['/rockets/falcon9'], 'launchpad': DOCUMENTS[f'/launchpads/{launchpad}'],
+            'payloads': [DOCUMENTS[f'/payloads/{p}'] for p in payloads],
+            'cores': [dict(core, core=DOCUMENTS[f"/cores/{core['core']}"]) for core in cores]}
+
+
+LAUNCH_DOCS = [
+    launch_doc(1, '2010-06-04T18:45:00.000Z', 'slc40', ['p1'], [core('c1', None, None)]),
+    launch_doc(2, '2012-05-22T07:44:00.000Z', 'slc40', ['p2'], [core('c1')]),
+    launch_doc(3, '2014-01-06T22:06:00.000Z', 'slc40', ['p1', 'p2'], [core('c1')]),
+    launch_doc(4, '2018-02-06T20:45:00.000Z', 'lc39a', ['p3'], [core('c2'), core('c1'), core('c1')]),
+    launch_doc(5, '2018-07-25T11:39:00.000Z', 'lc39a', ['p3'], [core('c2')]),
+    launch_doc(6, '2020-11-16T00:27:00.000Z', 'lc39a', ['p3'], [core('c2')]),
+    launch_doc(7, '2022-01-01T00:00:00.000Z', 'lc39a', ['p3'], [core('c2')], upcoming=True),
+]
+
+
+# Supports the parts of the query language build_launch_query() uses
+def matches(doc, query):
+    for field, condition in query.items():
+        value = doc[field]
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+        elif '$size' in condition and len(value) != condition['$size']:
+            return False
+        elif '$lte' in condition and not value <= condition['$lte']:
+            return False
+        elif '$gt' in condition and not value > condition['$gt']:
+            return False
+    return True
+
+
+# Serves DOCUMENTS and LAUNCH_DOCS and counts the requests per path
+class StubAPI(ThreadingHTTPServer):
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.hits = Counter()
+        self.queries = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.hits[self.path] += 1
+        document = DOCUMENTS.get(self.path)
+        body = json.dumps(document if document is not None else {'error': 'Not Found'}).encode()
+        self.send_response(200 if document is not None else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with self.server.lock:
+            self.server.hits[self.path] += 1
+            self.server.queries.append(body)
+        options = body['options']
+        docs = sorted((doc for doc in LAUNCH_DOCS if matches(doc, body['query'])),
+                      key=lambda doc: doc['flight_number'])
+        start = (options['page'] - 1) * options['limit']
+        has_next = start + options['limit'] < len(docs)
+        page = [{field: doc[field] for field in options['select']} for doc in docs[start:start + options['limit']]]
+        payload = json.dumps({'docs': page, 'page': options['page'], 'hasNextPage': has_next,
+                              'nextPage': options['page'] + 1 if has_next else None}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api():
+    server = StubAPI()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def launches():
+    return pd.DataFrame({'flight_number': [1, 2, 3, 4],
+                         'date_utc': ['2010-06-04', '2012-05-22', '2018-07-25', '2019-01-11'],
+                         'rocket': ['falcon9'] * 4,
+                         'launchpad': ['slc40', 'slc40', 'lc39a', 'slc40'],
+                         'payloads': ['p1', 'p2', 'p3', 'p1'],
+                         'cores': [core('c1', None, None), core('c1'), core('c2'), core('c2', False)]})
+
+
+def test_enrich_launches_fetches_each_id_once(stub_api):
+    launch_df = enrich_launches(launches(), session=make_session(4), base_url=stub_api.url, max_workers=4)
+
+    assert set(stub_api.hits) == {'/rockets/falcon9', '/launchpads/slc40', '/launchpads/lc39a',
+                                  '/payloads/p1', '/payloads/p2', '/payloads/p3', '/cores/c1', '/cores/c2'}
+    assert set(stub_api.hits.values()) == {1}
+    assert launch_df['FlightNumber'].tolist() == [1, 2, 3, 4]
+    assert launch_df['BoosterVersion'].tolist() == ['Falcon 9'] * 4
+    assert launch_df['LaunchSite'].tolist() == ['CCSFS SLC 40', 'CCSFS SLC 40', 'KSC LC 39A', 'CCSFS SLC 40']
+    assert launch_df['Serial'].tolist() == ['B0003', 'B0003', 'B1049', 'B1049']
+    assert launch_df['Orbit'].tolist() == ['LEO', 'GTO', 'ISS', 'LEO']
+    assert launch_df['PayloadMass'].isna().tolist() == [False, True, False, False]
+    assert launch_df['Outcome'].tolist() == ['None None', 'True ASDS', 'True ASDS', 'False ASDS']
+
+
+def test_enrich_launches_raises_on_unknown_id(stub_api):
+    data = launches()
+    data.loc[0, 'rocket'] = 'missing'
+    with pytest.raises(requests.HTTPError):
+        enrich_launches(data, session=make_session(4), base_url=stub_api.url, max_workers=4)
+
+
+def test_query_launches_filters_on_the_server(stub_api):
+    launch_df = query_launches(session=make_session(), base_url=stub_api.url,
+                               cutoff=datetime.date(2020, 11, 13), page_size=2)
+
+    # Multi-payload, multi-core, upcoming and late launches are dropped by the query
+    assert launch_df['FlightNumber'].tolist() == [1, 2, 5]
+    assert launch_df['LaunchSite'].tolist() == ['CCSFS SLC 40', 'CCSFS SLC 40', 'KSC LC 39A']
+    assert launch_df['Serial'].tolist() == ['B0003', 'B0003', 'B1049']
+    assert launch_df['Outcome'].tolist() == ['None None', 'True ASDS', 'True ASDS']
+    # Two pages of two launches, no per-ID lookups
+    assert stub_api.hits == Counter({'/launches/query': 2})
+    assert [query['options']['page'] for query in stub_api.queries] == [1, 2]
+    assert {path['path'] for path in stub_api.queries[0]['options']['populate']} == \
+        {'rocket', 'launchpad', 'payloads', 'cores.core'}
+
+
+def test_query_launches_after_flight_number(stub_api):
+    launch_df = query_launches(session=make_session(), base_url=stub_api.url,
+                               cutoff=datetime.date(2020, 11, 13), after_flight_number=1)
+
+    assert launch_df['FlightNumber'].tolist() == [2, 5]
+    assert stub_api.queries[0]['query']['flight_number'] == {'$gt': 1}
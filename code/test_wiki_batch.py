@@ -0,0 +1,55 @@
+# Tests of wiki_batch.py on saved pages of the Wikipedia launch list.
+#
+# fixtures/wiki/<revision>.html are trimmed copies of the page layout: launch
+# tables (`wikitable plainrowheaders collapsible`) between other tables that
+# must be ignored. Revision 1002 corrects the payload mass of flight 2, adds
+# flight 3 and lists flight 3 twice.
+#
+# Usage:
+#   python -m pytest test_wiki_batch.py
+
+import os
+from wiki_batch import parse_revision, revision_url, scrape_revisions
+from wiki_scrape import LAUNCH_COLUMNS
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'wiki')
+
+
+def read_fixture(revision):
+    with open(os.path.join(FIXTURES, f"{revision}.html"), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_parse_revision_reads_only_launch_tables():
+    df = parse_revision('1001', read_fixture('1001'))
+
+    assert list(df.columns) == LAUNCH_COLUMNS + ['Revision']
+    assert df['Flight No.'].tolist() == ['1', '2']
+    assert df['Date'].tolist() == ['4 June 2010', '8 December 2010']
+    assert df['Time'].tolist() == ['18:45', '15:43']
+    assert df['Version Booster'].tolist() == ['F9 v1.0', 'F9 v1.0']
+    assert df['Launch site'].tolist() == ['CCAFS', 'CCAFS']
+    assert df['Payload mass'].tolist() == [0, '0 kg']
+    assert df['Booster landing'].tolist() == ['Failure', 'Failure']
+    assert set(df['Revision']) == {'1001'}
+
+
+def test_scrape_revisions_is_keyed_by_flight_and_revision():
+    launches = scrape_revisions(['1001', '1002', '1001'], html_dir=FIXTURES, fetch_workers=2, parse_workers=2)
+
+    assert launches[['Revision', 'Flight No.']].values.tolist() == \
+        [['1001', '1'], ['1001', '2'], ['1002', '1'], ['1002', '2'], ['1002', '3']]
+    # Drift of one launch between revisions
+    flight_2 = launches[launches['Flight No.'] == '2'].set_index('Revision')['Payload mass']
+    assert flight_2.to_dict() == {'1001': '0 kg', '1002': '~600 kg'}
+
+
+def test_scrape_revisions_without_revisions():
+    launches = scrape_revisions([], html_dir=FIXTURES)
+    assert launches.empty
+    assert list(launches.columns) == LAUNCH_COLUMNS + ['Revision']
+
+
+def test_revision_url():
+    assert revision_url(1027686922).endswith('title=List_of_Falcon_9_and_Falcon_Heavy_launches&oldid=1027686922')
+    assert revision_url('List of Falcon 9 first-stage boosters').endswith('title=List_of_Falcon_9_first-stage_boosters')
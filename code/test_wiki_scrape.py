@@ -0,0 +1,30 @@
+# Tests of the launch frame normalization of wiki_scrape.py.
+#
+# Usage:
+#   python -m pytest test_wiki_scrape.py
+
+import pandas as pd
+from wiki_scrape import CATEGORICAL_COLUMNS, concat_launch_frames
+
+def test_normalize_launch_frame(launch_frame):
+    df = launch_frame()
+
+    assert df['Flight No.'].tolist() == [1, 2, 6, 7, 8]
+    assert df['Launch datetime'].tolist()[:3] == [pd.Timestamp('2010-06-04 18:45'), pd.Timestamp('2012-10-08 00:35'),
+                                                  pd.Timestamp('2013-09-29 16:00')]
+    assert df['Booster serial'].fillna('-').tolist() == ['B0003', 'B0004', 'B1003', '-', '-']
+    assert df['Version Booster'].tolist() == ['F9 v1.0', 'F9 v1.0', 'F9 v1.1', 'F9 v1.1', 'F9 v1.1']
+    assert df['Payload mass (kg)'].isna().tolist() == [True, False, False, False, False]
+    assert df['Payload mass (kg)'].iloc[1:].tolist() == [4700.0, 500.0, 3170.0, 3325.0]
+    assert all(isinstance(df[column].dtype, pd.CategoricalDtype) for column in CATEGORICAL_COLUMNS)
+
+
+def test_concat_launch_frames_keeps_categories(wiki_records, launch_frame):
+    full = launch_frame()
+    stored = launch_frame(wiki_records[:2])
+    new = launch_frame(wiki_records[2:])
+
+    combined = concat_launch_frames([stored, new])
+
+    pd.testing.assert_frame_equal(combined, full)
+    assert combined['Orbit'].cat.categories.tolist() == ['GTO', 'LEO', 'Polar orbit']
@@ -0,0 +1,117 @@
+# Scrape the launch tables of many Wikipedia revisions in one go.
+#
+# Pages are downloaded concurrently over one pooled (and cached) session and
+# parsed in parallel across cores with a process pool, reusing the per-row
+# helpers of wiki_scrape.py. The result is one launch table keyed by
+# `Flight No.` and `Revision`, which makes it possible to follow how the
+# launch history on the page drifted between revisions.
+#
+# Usage:
+#   python wiki_batch.py 1027686922 1036720340 --output spacex_web_revisions.csv
+#   python wiki_batch.py --revisions-file oldids.txt --html-dir fixtures/   # offline
+
+import os
+import argparse
+import logging
+import pandas as pd
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from spacex_api import make_session
+from http_cache import CachedSession
+from wiki_scrape import launch_tables, launch_column_names, iter_launch_rows, build_launch_frame
+
+logger = logging.getLogger(__name__)
+
+WIKI_INDEX_URL = "https://en.wikipedia.org/w/index.php"
+DEFAULT_TITLE = "List_of_Falcon_9_and_Falcon_Heavy_launches"
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/91.0.4472.124 Safari/537.36"
+}
+
+DEFAULT_FETCH_WORKERS = 8
+
+
+# A revision is either a numeric oldid of the launch list page or a page title
+def revision_url(revision, title=DEFAULT_TITLE):
+    revision = str(revision)
+    if revision.isdigit():
+        return f"{WIKI_INDEX_URL}?title={title}&oldid={revision}"
+    return f"{WIKI_INDEX_URL}?title={quote(revision.replace(' ', '_'))}"
+
+
+# Download the HTML of every revision concurrently
+# With `html_dir`, the pages are read from saved <revision>.html files instead
+def fetch_revisions(revisions, session=None, html_dir=None, max_workers=DEFAULT_FETCH_WORKERS):
+    if html_dir is not None:
+        def fetch(revision):
+            with open(os.path.join(html_dir, f"{revision}.html"), encoding='utf-8') as f:
+                return f.read()
+    else:
+        session = session or CachedSession(session=make_session(max_workers))
+
+        def fetch(revision):
+            response = session.get(revision_url(revision), headers=HEADERS, timeout=60)
+            response.raise_for_status()
+            return response.text
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from zip(revisions, executor.map(fetch, revisions))
+
+
+# Parse the launch tables of one revision (runs in a worker process)
+def parse_revision(revision, html):
+    tables = launch_tables(html)
+    if tables:
+        # Same header pass as datacollection_part2.py, which also cleans up the first table
+        launch_column_names(tables[0])
+    df = build_launch_frame(iter_launch_rows(tables))
+    df['Revision'] = str(revision)
+    return df
+
+
+# Scrape every revision and return one de-duplicated launch table
+def scrape_revisions(revisions, session=None, html_dir=None,
+                     fetch_workers=DEFAULT_FETCH_WORKERS, parse_workers=None):
+    revisions = list(dict.fromkeys(str(r) for r in revisions))
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        # Pages are handed to the parser processes as soon as they are downloaded
+        futures = [pool.submit(parse_revision, revision, html)
+                   for revision, html in fetch_revisions(revisions, session, html_dir, fetch_workers)]
+        frames = [future.result() for future in futures]
+        logger.info("Parsed %d revisions", len(frames))
+
+    if not frames:
+        return build_launch_frame([]).assign(Revision=pd.Series(dtype=str))
+    launches = pd.concat(frames, ignore_index=True)
+    return launches.drop_duplicates(subset=['Flight No.', 'Revision'], keep='first').reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape the launch tables of many Wikipedia revisions")
+    parser.add_argument('revisions', nargs='*', help="revision IDs (oldid) or page titles")
+    parser.add_argument('--revisions-file', help="file with one revision ID or page title per line")
+    parser.add_argument('--html-dir', help="read <revision>.html files from this directory instead of downloading")
+    parser.add_argument('--output', default='spacex_web_revisions.csv')
+    parser.add_argument('--fetch-workers', type=int, default=DEFAULT_FETCH_WORKERS)
+    parser.add_argument('--parse-workers', type=int, default=None, help="defaults to the number of cores")
+    args = parser.parse_args(argv)
+
+    revisions = list(args.revisions)
+    if args.revisions_file:
+        with open(args.revisions_file) as f:
+            revisions += [line.strip() for line in f if line.strip()]
+    if not revisions:
+        parser.error("no revisions given")
+
+    logging.basicConfig(level=logging.INFO)
+    launches = scrape_revisions(revisions, html_dir=args.html_dir, fetch_workers=args.fetch_workers,
+                                parse_workers=args.parse_workers)
+    launches.to_csv(args.output, index=False)
+    logger.info("Wrote %d launches from %d revisions to %s", len(launches), launches['Revision'].nunique(), args.output)
+
+
+if __name__ == '__main__':
+    main()
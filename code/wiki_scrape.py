@@ -0,0 +1,196 @@
+# Parsing of the Falcon 9 launch tables on the Wikipedia launch list page.
+#
+# Only the `wikitable plainrowheaders collapsible` tables are built into a tree:
+# the page is tokenized with lxml (html.parser when lxml is not installed) and a
+# SoupStrainer drops everything else, so the navigation, references and other
+# tables of the page never reach memory. Rows are yielded one at a time and each
+# table is released as soon as its rows are consumed.
+
+import logging
+import unicodedata
+import pandas as pd
+from pandas.api.types import union_categoricals
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_TABLE_CLASS = "wikitable plainrowheaders collapsible"
+
+# Columns of spacex_web_scraped.csv
+LAUNCH_COLUMNS = ['Flight No.', 'Launch site', 'Payload', 'Payload mass', 'Orbit', 'Customer',
+                  'Launch outcome', 'Version Booster', 'Booster landing', 'Date', 'Time']
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+# Helper functions to process HTML data
+
+# Function to return the date and time from the HTML table cells
+def date_time(table_cells):
+    return [date_time.strip() for date_time in list(table_cells.strings)][0:2]
+
+# Function to the return the booster version from the HTML table cells
+def booster_version(table_cells):
+    out = ''.join([booster_version for i, booster_version in enumerate(table_cells.strings) if i%2 == 0][0:-1])
+    return out
+
+# Function to return the landing status from the HTML table cells
+def landing_status(table_cells):
+    out = [i for i in table_cells.strings][0]
+    return out
+
+def get_mass(table_cells):
+    mass=unicodedata.normalize("NFKD", table_cells.text).strip()
+    if mass:
+        mass.find("kg")
+        new_mass = mass[0:mass.find("kg")+2]
+    else:
+        new_mass = 0
+    return new_mass
+
+def extra_column_from_header(row):
+    if(row.br):
+        row.br.extract()
+    if row.a:
+        row.a.extract()
+    if row.sup:
+        row.sup.extract()
+
+    column_name = ' '.join(row.contents)
+
+    # filter the digit and empty names
+    if not(column_name.strip().isdigit()):
+        column_name = column_name.strip()
+        return column_name
+
+
+# Build only the launch tables of a page
+def launch_tables(html, parser=DEFAULT_PARSER):
+    strainer = SoupStrainer('table', attrs={'class': LAUNCH_TABLE_CLASS})
+    soup = BeautifulSoup(html, parser, parse_only=strainer)
+    return soup.find_all('table', LAUNCH_TABLE_CLASS)
+
+
+# Apply extra_column_from_header() to every <th> of a table and keep the non-empty names
+def launch_column_names(table):
+    column_names = []
+    for th in table.find_all('th'):
+        name = extra_column_from_header(th)
+        if name and len(name) > 0:
+            column_names.append(name)
+    return column_names
+
+
+# Extract one launch record from the <td> cells of a table row
+def parse_launch_row(flight_number, row):
+    datatimelist = date_time(row[0])
+
+    bv = booster_version(row[1])
+    if not(bv):
+        bv = row[1].a.string
+
+    if row[6].a:
+        customer = row[6].a.string
+    else:
+        customer = row[6].string.strip()  # fallback if no <a> tag
+
+    return {'Flight No.': flight_number,
+            'Launch site': row[2].a.string,
+            'Payload': row[3].a.string,
+            'Payload mass': get_mass(row[4]),
+            'Orbit': row[5].a.string,
+            'Customer': customer,
+            'Launch outcome': list(row[7].strings)[0],
+            'Version Booster': bv,
+            'Booster landing': landing_status(row[8]),
+            'Date': datatimelist[0].strip(','),
+            'Time': datatimelist[1]}
+
+
+# Yield one record per launch row of the given tables (or of a page's HTML)
+# Rows up to `after_flight_no` are skipped without parsing their cells
+def iter_launch_rows(tables, after_flight_no=0):
+    if isinstance(tables, (str, bytes)):
+        tables = launch_tables(tables)
+
+    for table in tables:
+        for rows in table.find_all("tr"):
+            # check to see if first table heading is as number corresponding to launch a number
+            flag = False
+            if rows.th and rows.th.string:
+                flight_number = rows.th.string.strip()
+                flag = flight_number.isdigit() and int(flight_number) > after_flight_no
+            if flag:
+                record = parse_launch_row(flight_number, rows.find_all('td'))
+                logger.debug("Parsed launch %s", record)
+                yield record
+        # Nothing refers to the table any more, free its tree before parsing the next one
+        table.decompose()
+
+
+# Build the launch dataframe from launch records
+def build_launch_frame(records):
+    return pd.DataFrame.from_records(list(records), columns=LAUNCH_COLUMNS)
+
+
+# Columns of the normalized launch dataframe
+NORMALIZED_COLUMNS = ['Flight No.', 'Launch datetime', 'Version Booster', 'Booster serial', 'Launch site',
+                      'Payload', 'Payload mass (kg)', 'Orbit', 'Customer', 'Launch outcome', 'Booster landing']
+
+CATEGORICAL_COLUMNS = ['Version Booster', 'Launch site', 'Orbit', 'Launch outcome', 'Booster landing']
+
+
+# Turn the scraped strings into typed columns with vectorized string operations
+# - Flight No.          -> integer
+# - Date + Time         -> one datetime64 `Launch datetime` (NaT when unparseable)
+# - Payload mass        -> float `Payload mass (kg)`; "~15,440 kg" becomes 15440.0 and
+#                          empty cells (scraped as 0) become NaN
+# - Version Booster     -> booster version ("F9 v1.0", "F9 FT", "F9 B5", ...) with the
+#                          core serial ("B1049") split out into `Booster serial`
+# - site, orbit, outcome and landing strings -> categoricals
+def normalize_launch_frame(df):
+    def clean(column):
+        return df[column].astype(str).str.normalize('NFKD').str.strip()
+
+    normalized = pd.DataFrame(index=df.index)
+    normalized['Flight No.'] = pd.to_numeric(df['Flight No.'], errors='coerce').astype('Int64')
+    # Times come as HH:MM or HH:MM:SS
+    time = clean('Time')
+    time = time.where(time.str.count(':') == 2, time + ':00')
+    normalized['Launch datetime'] = (pd.to_datetime(clean('Date'), format='%d %B %Y', errors='coerce')
+                                     + pd.to_timedelta(time, errors='coerce'))
+
+    version = clean('Version Booster')
+    normalized['Version Booster'] = version.str.extract(r'^(F9\s+(?:v\d\.\d|FT|B\d)|Falcon Heavy)', expand=False)
+    normalized['Booster serial'] = version.str.extract(r'(B\d{4})', expand=False)
+
+    normalized['Launch site'] = clean('Launch site')
+    normalized['Payload'] = df['Payload']
+
+    mass = clean('Payload mass').str.replace(',', '', regex=False)
+    normalized['Payload mass (kg)'] = pd.to_numeric(mass.str.extract(r'([\d.]+)\s*kg', expand=False),
+                                                    errors='coerce')
+
+    normalized['Orbit'] = clean('Orbit')
+    normalized['Customer'] = df['Customer']
+    normalized['Launch outcome'] = clean('Launch outcome')
+    normalized['Booster landing'] = clean('Booster landing')
+
+    for column in CATEGORICAL_COLUMNS:
+        normalized[column] = normalized[column].astype('category')
+    return normalized[NORMALIZED_COLUMNS]
+
+
+# Concatenate normalized launch frames, such as the stored rows and the rows of an
+# incremental run: the categorical columns get the union of the categories, so the
+# dtypes are the ones of a full scrape (pd.concat falls back to object otherwise)
+def concat_launch_frames(frames):
+    frames = list(frames)
+    combined = pd.concat(frames, ignore_index=True)
+    for column in CATEGORICAL_COLUMNS:
+        combined[column] = union_categoricals([frame[column].astype('category') for frame in frames],
+                                              sort_categories=True)
+    return combined
@@ -0,0 +1,50 @@
+# Production entry point of the dashboard (spacex-dash-app.py).
+#
+# Exposes the Flask server of the Dash app for a multi-worker WSGI server, plus:
+#
+#   GET /healthz   the process is up
+#   GET /readyz    the launch dataset is loaded; 503 while it cannot be read
+#
+# With --preload the dataset is loaded once, before the workers fork. Either
+# way every worker maps the same Arrow copy of it (see launch_cube.read_shared).
+#
+# Configuration (environment):
+#   SPACEX_DASH_DATA          launch CSV (default: spacex_launch_dash.csv)
+#   SPACEX_DASH_CACHE_DIR     directory of its Arrow copy (default: .dash_cache)
+#   SPACEX_FIGURE_CACHE       SQLite file shared by the workers' figure caches (see figure_cache.py)
+#   SPACEX_DASH_DEBUG         set to 1 for Dash debug mode (default: off)
+#
+# Usage:
+#   export SPACEX_DASH_DATA=$PWD/datasets/spacex_launch_dash.csv SPACEX_FIGURE_CACHE=/tmp/figures.sqlite
+#   gunicorn --chdir code --preload -w 4 --threads 4 -b 0.0.0.0:8050 wsgi:server
+
+import os
+import importlib.util
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spacex-dash-app.py')
+
+# The app file name is not a valid module name, so it is loaded from its path
+_spec = importlib.util.spec_from_file_location('spacex_dash_app', APP_FILE)
+dash_app = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(dash_app)
+
+app = dash_app.app
+if os.environ.get('SPACEX_DASH_DEBUG', '') not in ('', '0'):
+    app.enable_dev_tools(debug=True)
+server = app.server
+
+
+@server.route('/healthz')
+def healthz():
+    return {'status': 'ok'}
+
+
+@server.route('/readyz')
+def readyz():
+    try:
+        cube = dash_app.launch_cube.get()
+    except (OSError, ValueError) as error:
+        return {'status': 'unavailable', 'error': str(error)}, 503
+    if cube.df.empty:
+        return {'status': 'unavailable', 'error': 'the launch dataset is empty'}, 503
+    return {'status': 'ready', 'launches': len(cube.df), 'sites': len(cube.sites), 'version': list(cube.version)}